@@ -0,0 +1,76 @@
+# backend/actores.py
+# Vínculos N-N entre casos de uso y actores (tabla casos_uso_actores). La columna
+# CasoUso.actores se conserva como texto separado por comas para la API y los
+# documentos, pero las consultas usan la tabla de vínculos. sincronizar() la
+# reconstruye a partir de ese texto con unas pocas sentencias por lote de casos de
+# uso; los actores que aún no existen en el proyecto se crean en él, copiando el
+# tipo y la descripción del actor global con el mismo nombre si lo hay.
+from sqlalchemy import delete, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from .models import Actor, CasoUso, casos_uso_actores
+
+TIPO_POR_DEFECTO = "Humano"
+
+
+def nombres_actores(texto):
+    # "Cliente, PasarelaPago,,Cliente" -> ["Cliente", "PasarelaPago"]
+    nombres = []
+    for nombre in (texto or "").split(","):
+        nombre = nombre.strip()
+        if nombre and nombre not in nombres:
+            nombres.append(nombre)
+    return nombres
+
+
+def sincronizar(db: Session, caso_uso_ids):
+    caso_uso_ids = list(caso_uso_ids)
+    if not caso_uso_ids:
+        return
+    casos = db.execute(
+        select(CasoUso.id, CasoUso.proyecto_id, CasoUso.actores).where(CasoUso.id.in_(caso_uso_ids))
+    ).all()
+    buscados = {(caso.proyecto_id, nombre) for caso in casos if caso.proyecto_id is not None
+                for nombre in nombres_actores(caso.actores)}
+
+    ids = {}
+    if buscados:
+        ids = {(a.proyecto_id, a.nombre): a.id for a in db.execute(
+            select(Actor.id, Actor.proyecto_id, Actor.nombre)
+            .where(tuple_(Actor.proyecto_id, Actor.nombre).in_(buscados))
+        )}
+    nuevos = sorted(buscados - ids.keys())
+    if nuevos:
+        globales = {a.nombre: a for a in db.execute(
+            select(Actor.nombre, Actor.tipo, Actor.descripcion)
+            .where(Actor.proyecto_id.is_(None), Actor.nombre.in_({nombre for _, nombre in nuevos}))
+            .order_by(Actor.id.desc())
+        )}
+        tabla = Actor.__table__
+        # Como en la importación, los ids devueltos por el INSERT multi-VALUES siguen el orden de las filas
+        creados = sorted(db.scalars(insert(tabla).returning(tabla.c.id), [{
+            "nombre": nombre,
+            "tipo": globales[nombre].tipo if nombre in globales else TIPO_POR_DEFECTO,
+            "descripcion": globales[nombre].descripcion if nombre in globales else None,
+            "proyecto_id": proyecto_id,
+        } for proyecto_id, nombre in nuevos]).all())
+        ids.update(zip(nuevos, creados))
+
+    db.execute(delete(casos_uso_actores).where(casos_uso_actores.c.caso_uso_id.in_(caso_uso_ids)))
+    vinculos = [{"caso_uso_id": caso.id, "actor_id": ids[caso.proyecto_id, nombre]}
+                for caso in casos if caso.proyecto_id is not None for nombre in nombres_actores(caso.actores)]
+    if vinculos:
+        db.execute(insert(casos_uso_actores), vinculos)
+
+
+def renombrar_en_casos(db: Session, actor_id: int, anterior: str, nuevo=None):
+    # Mantiene el texto de los casos de uso vinculados al renombrar (o borrar, sin
+    # `nuevo`) un actor, para que una sincronización posterior no lo resucite
+    casos = db.scalars(
+        select(CasoUso).join(casos_uso_actores, casos_uso_actores.c.caso_uso_id == CasoUso.id)
+        .where(casos_uso_actores.c.actor_id == actor_id)
+    ).all()
+    for caso in casos:
+        nombres = [nuevo if n == anterior else n for n in nombres_actores(caso.actores)]
+        caso.actores = ",".join(n for n in nombres if n) or None
+    return {caso.proyecto_id for caso in casos}
@@ -0,0 +1,69 @@
+# backend/almacenamiento.py
+# Perfiles de almacenamiento de SQLite. Cada conexión nueva recibe los PRAGMA del
+# perfil elegido (SQLITE_PERFIL); los valores sueltos se pueden ajustar con
+# SQLITE_MMAP_MB, SQLITE_CACHE_MB y SQLITE_BUSY_TIMEOUT_MS.
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+
+PERFILES = {
+    # Comportamiento original: journal de rollback y valores por defecto de SQLite
+    "clasico": {},
+    # WAL: los lectores no bloquean al escritor ni al revés; synchronous=NORMAL
+    # es seguro en WAL (solo se puede perder la última transacción ante un corte de luz)
+    "wal": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64 * 1024,   # negativo = KiB, es decir 64 MiB
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+}
+
+PERFIL_POR_DEFECTO = "wal"
+TAM_POOL = int(os.getenv("SQLITE_POOL", "10"))
+
+
+def pragmas_del_perfil(nombre: str) -> dict:
+    if nombre not in PERFILES:
+        raise ValueError(f"Perfil de SQLite desconocido: {nombre} (opciones: {', '.join(PERFILES)})")
+    pragmas = dict(PERFILES[nombre])
+    if nombre != "clasico":
+        if os.getenv("SQLITE_MMAP_MB"):
+            pragmas["mmap_size"] = int(os.getenv("SQLITE_MMAP_MB")) * 1024 * 1024
+        if os.getenv("SQLITE_CACHE_MB"):
+            pragmas["cache_size"] = -int(os.getenv("SQLITE_CACHE_MB")) * 1024
+        if os.getenv("SQLITE_BUSY_TIMEOUT_MS"):
+            pragmas["busy_timeout"] = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS"))
+    return pragmas
+
+
+def aplicar_perfil(engine, pragmas: dict):
+    # Sirve tanto para motores síncronos como para engine.sync_engine de uno asíncrono
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _configurar_conexion(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for nombre, valor in pragmas.items():
+            cursor.execute(f"PRAGMA {nombre}={valor}")
+        cursor.close()
+
+
+def es_memoria(url: str) -> bool:
+    return url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in url
+
+
+def crear_motor(url: str, perfil: str = PERFIL_POR_DEFECTO):
+    pragmas = pragmas_del_perfil(perfil)
+    opciones = {"connect_args": {"check_same_thread": False}}
+    if pragmas.get("journal_mode") == "WAL" and not es_memoria(url):
+        # En WAL las conexiones de lectura trabajan en paralelo, así que conviene
+        # mantener un pool de conexiones abiertas (cada una con su caché de páginas)
+        opciones.update(poolclass=QueuePool, pool_size=TAM_POOL, max_overflow=TAM_POOL * 2)
+    engine = create_engine(url, **opciones)
+    aplicar_perfil(engine, pragmas)
+    return engine
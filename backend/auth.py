@@ -1,22 +1,42 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
-from . import models, schemas, security
+from starlette.concurrency import run_in_threadpool
+from . import models, schemas, security, contrasenas
 from .routers.dependencies import get_db
-from jose import JWTError, jwt
 
 router = APIRouter()
+# Las rutas son asíncronas: el hash se hace en el pool de procesos (contrasenas.py) y
+# mientras tanto no ocupan hilo; las consultas, cortas, sí van al threadpool. Tras
+# cada consulta se cierra la transacción para que la sesión no retenga una conexión
+# del pool de SQLAlchemy mientras espera al hash.
 
-@router.post("/register", response_model=schemas.UsuarioResponse)
-def register_user(user: schemas.UsuarioCreate, db: Session = Depends(get_db)):
-    # Verificar si el usuario o el email ya existen
-    existing_user = db.query(models.Usuario).filter(
-        (models.Usuario.username == user.username) | (models.Usuario.email == user.email)
+
+async def _en_pool(funcion, *args):
+    try:
+        return await funcion(*args)
+    except contrasenas.PoolSaturado:
+        raise HTTPException(status_code=503, detail="Servidor ocupado, inténtalo de nuevo en unos segundos",
+                            headers={"Retry-After": "1"})
+
+
+def _usuario_existente(db: Session, username: str, email: str):
+    existente = db.query(models.Usuario.id).filter(
+        (models.Usuario.username == username) | (models.Usuario.email == email)
     ).first()
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Usuario o email ya existe")
+    db.rollback()
+    return existente
+
+
+def _usuario_por_nombre(db: Session, username: str):
+    user = db.query(models.Usuario.id, models.Usuario.username, models.Usuario.hashed_password).filter(
+        models.Usuario.username == username
+    ).first()
+    db.rollback()
+    return user
+
 
-    hashed_password = security.hash_password(user.password)
+def _crear_usuario(db: Session, user: schemas.UsuarioCreate, hashed_password: str):
     nuevo_usuario = models.Usuario(
         username=user.username,
         email=user.email,
@@ -27,11 +47,35 @@ def register_user(user: schemas.UsuarioCreate, db: Session = Depends(get_db)):
     db.refresh(nuevo_usuario)
     return nuevo_usuario
 
+
+def _actualizar_hash(db: Session, user, hashed_password: str):
+    # Solo si la contraseña no ha cambiado entretanto
+    db.query(models.Usuario).filter(
+        models.Usuario.id == user.id, models.Usuario.hashed_password == user.hashed_password
+    ).update({models.Usuario.hashed_password: hashed_password}, synchronize_session=False)
+    db.commit()
+
+
+@router.post("/register", response_model=schemas.UsuarioResponse)
+async def register_user(user: schemas.UsuarioCreate, db: Session = Depends(get_db)):
+    # Verificar si el usuario o el email ya existen
+    if await run_in_threadpool(_usuario_existente, db, user.username, user.email):
+        raise HTTPException(status_code=400, detail="Usuario o email ya existe")
+
+    hashed_password = await _en_pool(contrasenas.hash_password, user.password)
+    return await run_in_threadpool(_crear_usuario, db, user, hashed_password)
+
 @router.post("/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(models.Usuario).filter(models.Usuario.username == form_data.username).first()
-    if not user or not security.verify_password(form_data.password, user.hashed_password):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+    user = await run_in_threadpool(_usuario_por_nombre, db, form_data.username)
+    if not user:
+        raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+    valida, nuevo_hash = await _en_pool(contrasenas.verify_and_update, form_data.password, user.hashed_password)
+    if not valida:
         raise HTTPException(status_code=401, detail="Credenciales incorrectas")
+    if nuevo_hash:
+        # Hash con un coste inferior al configurado: se guarda el rehecho
+        await run_in_threadpool(_actualizar_hash, db, user, nuevo_hash)
 
     access_token = security.create_access_token({"sub": user.username})
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    return {"access_token": access_token, "token_type": "bearer"}
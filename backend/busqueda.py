@@ -0,0 +1,117 @@
+# backend/busqueda.py
+# Búsqueda de texto completo con una tabla virtual FTS5 (`busqueda`) que indexa los
+# textos de requisitos, casos de uso y escenarios. Cada fila guarda el título y el
+# resto de campos concatenados en `cuerpo`; el rowid codifica la entidad y su id
+# (id * 4 + código), así que los triggers que la mantienen al día actualizan por
+# rowid sin recorrer el índice. proyecto_id se guarda sin indexar y se filtra sobre
+# las coincidencias del MATCH (indexarlo como término obliga a leer la lista entera
+# del proyecto y hace más lentas las búsquedas selectivas, que son las habituales).
+#
+# Las bases nuevas la crean con create_all (ver models.py) y las existentes con la
+# migración 0005; `python -m backend.gestion reindexar-busqueda` la reconstruye.
+import re
+
+from sqlalchemy import bindparam, text
+
+TABLA = "busqueda"
+# entidad -> (código en el rowid, tabla, columna de título, columnas del cuerpo, proyecto)
+FUENTES = {
+    "requisito": (1, "requisitos", "nombre", ("descripcion", "observaciones"), "{fila}.proyecto_id"),
+    "caso_uso": (2, "casos_uso", "titulo",
+                 ("descripcion", "precondiciones", "postcondiciones", "flujo_normal", "flujo_alternativo"),
+                 "{fila}.proyecto_id"),
+    "escenario": (3, "escenarios", "nombre", ("descripcion", "resultado_esperado"),
+                  "(SELECT proyecto_id FROM casos_uso WHERE id = {fila}.caso_uso_id)"),
+}
+ENTIDADES = {codigo: entidad for entidad, (codigo, *_) in FUENTES.items()}
+# Peso de cada columna en BM25 (proyecto_id, titulo, cuerpo): un acierto en el título pesa más
+PESOS = (0.0, 10.0, 1.0)
+MARCA_INICIO, MARCA_FIN = "**", "**"
+PALABRAS_FRAGMENTO = 16
+
+
+def _valores(entidad, fila):
+    codigo, _, titulo, cuerpo, proyecto = FUENTES[entidad]
+    texto = " || char(10) || ".join(f"coalesce({fila}.{columna}, '')" for columna in cuerpo)
+    return f"{fila}.id * 4 + {codigo}, {proyecto.format(fila=fila)}, {fila}.{titulo}, {texto}"
+
+
+def sentencias_ddl():
+    yield (f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA} USING fts5("
+           "proyecto_id UNINDEXED, titulo, cuerpo, "
+           "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')")
+    columnas = f"{TABLA}(rowid, proyecto_id, titulo, cuerpo)"
+    for entidad, (codigo, tabla, titulo, cuerpo, proyecto) in FUENTES.items():
+        vigiladas = ", ".join((titulo, *cuerpo, "caso_uso_id" if entidad == "escenario" else "proyecto_id"))
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ai AFTER INSERT ON {tabla} BEGIN "
+               f"INSERT INTO {columnas} VALUES ({_valores(entidad, 'new')}); END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_au AFTER UPDATE OF {vigiladas} ON {tabla} BEGIN "
+               f"DELETE FROM {TABLA} WHERE rowid = old.id * 4 + {codigo}; "
+               f"INSERT INTO {columnas} VALUES ({_valores(entidad, 'new')}); END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_busqueda_ad AFTER DELETE ON {tabla} BEGIN "
+               f"DELETE FROM {TABLA} WHERE rowid = old.id * 4 + {codigo}; END")
+    # Los escenarios toman el proyecto de su caso de uso (p. ej. al desvincularlo en una purga)
+    codigo = FUENTES["escenario"][0]
+    yield ("CREATE TRIGGER IF NOT EXISTS casos_uso_busqueda_proyecto AFTER UPDATE OF proyecto_id ON casos_uso BEGIN "
+           f"UPDATE {TABLA} SET proyecto_id = new.proyecto_id "
+           f"WHERE rowid IN (SELECT id * 4 + {codigo} FROM escenarios WHERE caso_uso_id = new.id); END")
+
+
+def crear_indice(conexion):
+    if conexion.dialect.name != "sqlite":
+        return
+    for sentencia in sentencias_ddl():
+        conexion.exec_driver_sql(sentencia)
+
+
+def crear_indice_tras_create_all(target, conexion, **kw):
+    crear_indice(conexion)
+
+
+def reconstruir(conexion):
+    # Vuelve a indexar todas las filas (datos anteriores al índice o índice dañado)
+    conexion.exec_driver_sql(f"DELETE FROM {TABLA}")
+    for entidad, (_, tabla, *_) in FUENTES.items():
+        conexion.exec_driver_sql(
+            f"INSERT INTO {TABLA}(rowid, proyecto_id, titulo, cuerpo) SELECT {_valores(entidad, tabla)} FROM {tabla}"
+        )
+    conexion.exec_driver_sql(f"INSERT INTO {TABLA}({TABLA}) VALUES ('optimize')")
+
+
+def consulta_fts(q: str):
+    # Texto libre -> consulta FTS5 segura: cada palabra entre comillas (sin operadores)
+    # y la última como prefijo para buscar mientras se escribe
+    palabras = re.findall(r"\w+", q)
+    if not palabras:
+        return None
+    return " ".join(f'"{p}"' for p in palabras) + "*"
+
+
+def consulta_busqueda(fts: str, proyecto_ids, entidad=None, limite=20):
+    # Las palabras solo se buscan en título y cuerpo; proyecto_id se compara aparte
+    parametros = {"fts": f"{{titulo cuerpo}} : ({fts})", "limite": limite}
+    filtro = ""
+    if entidad is not None:
+        filtro = f"AND {TABLA}.rowid % 4 = :codigo "
+        parametros["codigo"] = FUENTES[entidad][0]
+    pesos = ", ".join(str(p) for p in PESOS)
+    return text(
+        f"SELECT {TABLA}.rowid AS clave, {TABLA}.proyecto_id AS proyecto_id, "
+        f"highlight({TABLA}, 1, :inicio, :fin) AS titulo, "
+        f"snippet({TABLA}, 2, :inicio, :fin, '…', {PALABRAS_FRAGMENTO}) AS fragmento, "
+        f"bm25({TABLA}, {pesos}) AS rango "
+        f"FROM {TABLA} WHERE {TABLA} MATCH :fts AND {TABLA}.proyecto_id IN :proyectos {filtro}"
+        f"ORDER BY rango LIMIT :limite"
+    ).bindparams(bindparam("proyectos", list(proyecto_ids), expanding=True),
+                 inicio=MARCA_INICIO, fin=MARCA_FIN, **parametros)
+
+
+def resultados(filas):
+    return [{
+        "entidad": ENTIDADES[fila.clave % 4],
+        "id": fila.clave // 4,
+        "proyecto_id": fila.proyecto_id,
+        "titulo": fila.titulo,
+        "fragmento": fila.fragmento,
+        "puntuacion": round(-fila.rango, 4),
+    } for fila in filas]
@@ -0,0 +1,244 @@
+# backend/cache_documentos.py
+# Caché de documentos exportados direccionada por contenido. La clave (que también
+# sirve de ETag) se deriva de la versión del proyecto: su version_contenido, que
+# incrementa cada escritura (ver versiones.py), la fecha_actualizacion más reciente y
+# el número de filas de requisitos, casos de uso y escenarios, y el último seq del
+# registro de cambios (AUTOINCREMENT: no se repite aunque se reutilice el id de un
+# proyecto borrado).
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import DateTime, func, null, select, union_all
+from sqlalchemy.orm import Session
+
+from .models import Proyecto, Requisito, CasoUso, Escenario, RegistroCambio
+
+# Se incrementa cuando cambia el formato de los documentos generados
+VERSION_RENDER = "1"
+
+CACHE_DIR = os.getenv("CACHE_DOCUMENTOS_DIR", "./.cache_documentos")
+MAX_MEMORIA = int(os.getenv("CACHE_DOCUMENTOS_MEMORIA_MB", "32")) * 1024 * 1024
+MAX_DISCO = int(os.getenv("CACHE_DOCUMENTOS_DISCO_MB", "512")) * 1024 * 1024
+# Los documentos más grandes que esto solo se guardan en disco
+MAX_ENTRADA_MEMORIA = 1024 * 1024
+TAM_BLOQUE_LECTURA = 64 * 1024
+
+
+def consulta_estado(proyecto_id: int, usuario_id: Optional[int] = None):
+    # Una sola consulta con una fila por tabla: (max(fecha_actualizacion), count),
+    # (None, version_contenido) del proyecto y (None, último seq) del registro de
+    # cambios. Con usuario_id, la fila del proyecto cuenta 0 si el proyecto no es suyo
+    proyecto = select(func.max(Proyecto.fecha_actualizacion), func.count(Proyecto.id)).where(Proyecto.id == proyecto_id)
+    if usuario_id is not None:
+        proyecto = proyecto.where(Proyecto.usuario_id == usuario_id)
+    return union_all(
+        proyecto,
+        select(func.max(Requisito.fecha_actualizacion), func.count(Requisito.id))
+        .where(Requisito.proyecto_id == proyecto_id),
+        select(func.max(CasoUso.fecha_actualizacion), func.count(CasoUso.id))
+        .where(CasoUso.proyecto_id == proyecto_id),
+        select(func.max(Escenario.fecha_actualizacion), func.count(Escenario.id))
+        .join(CasoUso, Escenario.caso_uso_id == CasoUso.id)
+        .where(CasoUso.proyecto_id == proyecto_id),
+        # La versión cambia con cada escritura o borrado aunque caiga en el mismo
+        # segundo, también si la hace otro proceso
+        select(null().cast(DateTime), func.max(Proyecto.version_contenido)).where(Proyecto.id == proyecto_id),
+        select(null().cast(DateTime), func.max(RegistroCambio.seq))
+        .where(RegistroCambio.proyecto_id == proyecto_id),
+    )
+
+
+def estado_proyecto(db: Session, proyecto_id: int, usuario_id: Optional[int] = None):
+    return db.execute(consulta_estado(proyecto_id, usuario_id)).all()
+
+
+def version_proyecto(db: Session, proyecto_id: int, filas=None) -> str:
+    if filas is None:
+        filas = estado_proyecto(db, proyecto_id)
+    return f"{proyecto_id}|" + "|".join(f"{fecha}:{total}" for fecha, total in filas)
+
+
+def calcular_etag(version: str, formato: str) -> str:
+    resumen = hashlib.sha256(f"{VERSION_RENDER}|{formato}|{version}".encode()).hexdigest()[:32]
+    return f'"{resumen}"'
+
+
+def etag_coincide(if_none_match, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidatos = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidatos or any((c[2:] if c.startswith("W/") else c) == etag for c in candidatos)
+
+
+class CacheDocumentos:
+    def __init__(self, directorio: str, max_memoria: int, max_disco: int):
+        self.directorio = directorio
+        self.max_memoria = max_memoria
+        self.max_disco = max_disco
+        self._lock = threading.Lock()
+        self._memoria = OrderedDict()   # clave -> bytes
+        self._disco = OrderedDict()     # clave -> (ruta, tamaño)
+        self._por_proyecto = {}         # proyecto_id -> {claves}
+        self._generacion = {}           # proyecto_id -> nº de invalidaciones
+        self._bytes_memoria = 0
+        self._bytes_disco = 0
+        self._cargar_indice()
+
+    @staticmethod
+    def _nombre_fichero(proyecto_id, clave):
+        return f"{proyecto_id}_{clave.strip(chr(34))}.doc"
+
+    def _cargar_indice(self):
+        # Reconstruye el LRU de disco a partir de los ficheros existentes (más antiguo primero)
+        if not os.path.isdir(self.directorio):
+            return
+        entradas = []
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            if nombre.endswith(".tmp"):
+                os.unlink(ruta)
+                continue
+            if not nombre.endswith(".doc") or "_" not in nombre:
+                continue
+            stat = os.stat(ruta)
+            entradas.append((stat.st_mtime, nombre, ruta, stat.st_size))
+        for _, nombre, ruta, tam in sorted(entradas):
+            proyecto, resumen = nombre[:-len(".doc")].split("_", 1)
+            clave = f'"{resumen}"'
+            self._disco[clave] = (ruta, tam)
+            self._bytes_disco += tam
+            self._por_proyecto.setdefault(int(proyecto), set()).add(clave)
+        self._recortar_disco()
+
+    def _recortar_memoria(self):
+        while self._bytes_memoria > self.max_memoria and self._memoria:
+            _, datos = self._memoria.popitem(last=False)
+            self._bytes_memoria -= len(datos)
+
+    def _recortar_disco(self):
+        while self._bytes_disco > self.max_disco and self._disco:
+            clave, (ruta, tam) = self._disco.popitem(last=False)
+            self._bytes_disco -= tam
+            self._descartar_fichero(ruta)
+
+    @staticmethod
+    def _descartar_fichero(ruta):
+        try:
+            os.unlink(ruta)
+        except FileNotFoundError:
+            pass
+
+    def _guardar_en_memoria(self, clave, datos):
+        if len(datos) > MAX_ENTRADA_MEMORIA or clave in self._memoria:
+            return
+        self._memoria[clave] = datos
+        self._bytes_memoria += len(datos)
+        self._recortar_memoria()
+
+    def obtener(self, clave):
+        # Devuelve bytes (memoria), un fichero abierto (disco) o None
+        with self._lock:
+            if clave in self._memoria:
+                self._memoria.move_to_end(clave)
+                return self._memoria[clave]
+            if clave not in self._disco:
+                return None
+            self._disco.move_to_end(clave)
+            ruta, tam = self._disco[clave]
+            try:
+                # El descriptor abierto sobrevive a una expulsión concurrente del fichero
+                fichero = open(ruta, "rb")
+                os.utime(ruta)
+            except FileNotFoundError:
+                del self._disco[clave]
+                self._bytes_disco -= tam
+                return None
+            if tam <= MAX_ENTRADA_MEMORIA:
+                datos = fichero.read()
+                fichero.close()
+                self._guardar_en_memoria(clave, datos)
+                return datos
+            return fichero
+
+    def guardar_en_streaming(self, clave, proyecto_id, trozos):
+        # Reenvía los trozos al cliente mientras los escribe en un temporal;
+        # solo se registra en la caché si el documento se generó completo.
+        os.makedirs(self.directorio, exist_ok=True)
+        with self._lock:
+            generacion = self._generacion.get(proyecto_id, 0)
+        fd, temporal = tempfile.mkstemp(dir=self.directorio, suffix=".tmp")
+        completo = False
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for trozo in trozos:
+                    f.write(trozo)
+                    yield trozo
+            completo = True
+        finally:
+            if completo:
+                self._registrar(clave, proyecto_id, temporal, generacion)
+            else:
+                self._descartar_fichero(temporal)
+
+    def _registrar(self, clave, proyecto_id, temporal, generacion):
+        tam = os.path.getsize(temporal)
+        with self._lock:
+            if self._generacion.get(proyecto_id, 0) != generacion or tam > self.max_disco:
+                # El proyecto cambió mientras se generaba: el documento puede estar mezclado
+                self._descartar_fichero(temporal)
+                return
+            ruta = os.path.join(self.directorio, self._nombre_fichero(proyecto_id, clave))
+            os.replace(temporal, ruta)
+            if clave in self._disco:
+                self._bytes_disco -= self._disco.pop(clave)[1]
+            self._disco[clave] = (ruta, tam)
+            self._bytes_disco += tam
+            self._por_proyecto.setdefault(proyecto_id, set()).add(clave)
+            self._recortar_disco()
+            if tam <= MAX_ENTRADA_MEMORIA:
+                with open(ruta, "rb") as f:
+                    self._guardar_en_memoria(clave, f.read())
+
+    def invalidar_proyecto(self, proyecto_id: int):
+        with self._lock:
+            self._generacion[proyecto_id] = self._generacion.get(proyecto_id, 0) + 1
+            for clave in self._por_proyecto.pop(proyecto_id, set()):
+                datos = self._memoria.pop(clave, None)
+                if datos is not None:
+                    self._bytes_memoria -= len(datos)
+                entrada = self._disco.pop(clave, None)
+                if entrada is not None:
+                    self._bytes_disco -= entrada[1]
+                    self._descartar_fichero(entrada[0])
+
+
+def leer_fichero(fichero):
+    with fichero:
+        while True:
+            bloque = fichero.read(TAM_BLOQUE_LECTURA)
+            if not bloque:
+                return
+            yield bloque
+
+
+cache = CacheDocumentos(CACHE_DIR, MAX_MEMORIA, MAX_DISCO)
+
+
+# Otras cachés derivadas de los datos de un proyecto (p. ej. la matriz de trazabilidad)
+# se registran aquí para invalidarse en las mismas escrituras que los documentos
+_al_invalidar = []
+
+
+def al_invalidar(funcion):
+    _al_invalidar.append(funcion)
+    return funcion
+
+
+def invalidar_proyecto(proyecto_id: int):
+    cache.invalidar_proyecto(proyecto_id)
+    for funcion in _al_invalidar:
+        funcion(proyecto_id)
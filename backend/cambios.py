@@ -0,0 +1,117 @@
+# backend/cambios.py
+# Registro de cambios por proyecto para la sincronización incremental
+# (GET /projects/{id}/changes?since=). Cada requisito, caso de uso o escenario tiene
+# como mucho una fila en registro_cambios por proyecto: (seq, proyecto_id, entidad,
+# entidad_id, borrado). Al crear o modificar la fila se reescribe con un seq nuevo y
+# al borrarla (o al salir del proyecto) queda como lápida con borrado = 1, así que el
+# registro no crece con las ediciones sino con las filas.
+#
+# seq es la clave AUTOINCREMENT: SQLite nunca reutiliza un valor, ni siquiera el del
+# último registro borrado, y como solo hay una transacción de escritura a la vez los
+# seq se hacen visibles en orden. Un cliente que guarda el último seq visto y pide
+# los posteriores no se salta ningún cambio.
+#
+# Igual que las estadísticas, el registro lo mantienen triggers de SQLite en la misma
+# transacción que la escritura: cubren los routers, la importación y la purga (que
+# desvincula del proyecto las ramas de requisitos antes de borrarlas). Las bases
+# nuevas los crean con create_all (ver models.py) y las existentes con la migración 0007.
+from sqlalchemy import select, func
+
+from .estadisticas import PROYECTO
+
+TABLA = "registro_cambios"
+ENTIDADES = ("requisitos", "casos_uso", "escenarios")
+DISPARADORES = [f"{tabla}_cambios_{sufijo}" for tabla in ENTIDADES for sufijo in ("ai", "au", "ad")] + [
+    "casos_uso_cambios_proyecto", "proyectos_cambios_ad"]
+
+
+def _anotar(tabla, proyecto, entidad_id, borrado, condicion="1"):
+    # Reescribe la fila de la entidad con un seq nuevo. Las lápidas de un proyecto ya
+    # borrado (la purga elimina sus filas después) no se anotan
+    if borrado:
+        condicion += f" AND EXISTS (SELECT 1 FROM proyectos WHERE id = {proyecto})"
+    return (f"DELETE FROM {TABLA} WHERE proyecto_id = {proyecto} AND entidad = '{tabla}' "
+            f"AND entidad_id = {entidad_id}; "
+            f"INSERT INTO {TABLA}(proyecto_id, entidad, entidad_id, borrado) "
+            f"SELECT {proyecto}, '{tabla}', {entidad_id}, {borrado} "
+            f"WHERE {proyecto} IS NOT NULL AND {condicion}; ")
+
+
+def sentencias_ddl():
+    for tabla in ENTIDADES:
+        nuevo, viejo = PROYECTO[tabla].format(fila="new"), PROYECTO[tabla].format(fila="old")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_cambios_ai AFTER INSERT ON {tabla} BEGIN "
+               f"{_anotar(tabla, nuevo, 'new.id', 0)}END")
+        # Si la fila cambia de proyecto, el anterior recibe una lápida
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_cambios_au AFTER UPDATE ON {tabla} BEGIN "
+               f"{_anotar(tabla, viejo, 'old.id', 1, f'{viejo} IS NOT {nuevo}')}"
+               f"{_anotar(tabla, nuevo, 'new.id', 0)}END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_cambios_ad AFTER DELETE ON {tabla} BEGIN "
+               f"{_anotar(tabla, viejo, 'old.id', 1)}END")
+    # Un caso de uso que cambia de proyecto (o se desvincula en una purga) se lleva sus escenarios
+    escenarios = "SELECT id FROM escenarios WHERE caso_uso_id = new.id"
+    yield ("CREATE TRIGGER IF NOT EXISTS casos_uso_cambios_proyecto AFTER UPDATE OF proyecto_id ON casos_uso "
+           "WHEN old.proyecto_id IS NOT new.proyecto_id BEGIN "
+           f"DELETE FROM {TABLA} WHERE entidad = 'escenarios' AND entidad_id IN ({escenarios}) "
+           "AND proyecto_id IN (old.proyecto_id, new.proyecto_id); "
+           f"INSERT INTO {TABLA}(proyecto_id, entidad, entidad_id, borrado) "
+           f"SELECT old.proyecto_id, 'escenarios', id, 1 FROM escenarios WHERE caso_uso_id = new.id "
+           "AND EXISTS (SELECT 1 FROM proyectos WHERE id = old.proyecto_id); "
+           f"INSERT INTO {TABLA}(proyecto_id, entidad, entidad_id, borrado) "
+           f"SELECT new.proyecto_id, 'escenarios', id, 0 FROM escenarios WHERE caso_uso_id = new.id "
+           "AND new.proyecto_id IS NOT NULL; END")
+    # Al borrar el proyecto su registro sobra
+    yield (f"CREATE TRIGGER IF NOT EXISTS proyectos_cambios_ad AFTER DELETE ON proyectos BEGIN "
+           f"DELETE FROM {TABLA} WHERE proyecto_id = old.id; END")
+
+
+def crear_triggers(conexion):
+    if conexion.dialect.name != "sqlite":
+        return
+    for sentencia in sentencias_ddl():
+        conexion.exec_driver_sql(sentencia)
+
+
+def crear_triggers_tras_create_all(target, conexion, **kw):
+    crear_triggers(conexion)
+
+
+def registrar_existentes(conexion):
+    # Anota las filas que ya existían (en orden de actualización) para que since=0
+    # devuelva el proyecto completo
+    for tabla in ENTIDADES:
+        proyecto = PROYECTO[tabla].format(fila=tabla)
+        conexion.exec_driver_sql(
+            f"INSERT INTO {TABLA}(proyecto_id, entidad, entidad_id, borrado) "
+            f"SELECT {proyecto}, '{tabla}', {tabla}.id, 0 FROM {tabla} "
+            f"WHERE {proyecto} IN (SELECT id FROM proyectos) "
+            f"AND NOT EXISTS (SELECT 1 FROM {TABLA} r WHERE r.proyecto_id = {proyecto} "
+            f"AND r.entidad = '{tabla}' AND r.entidad_id = {tabla}.id) "
+            f"ORDER BY {tabla}.fecha_actualizacion, {tabla}.id"
+        )
+
+
+def ultimo(db, proyecto_id: int) -> int:
+    from .models import RegistroCambio
+    return db.execute(
+        select(func.max(RegistroCambio.seq)).where(RegistroCambio.proyecto_id == proyecto_id)
+    ).scalar() or 0
+
+
+def leer(db, proyecto_id: int, desde: int, limite: int):
+    # Entradas posteriores a `desde` en orden de seq. Devuelve el nuevo cursor, si
+    # quedan más entradas y, por entidad, los ids vivos y los borrados
+    from .models import RegistroCambio
+    filas = db.execute(
+        select(RegistroCambio.seq, RegistroCambio.entidad, RegistroCambio.entidad_id, RegistroCambio.borrado)
+        .where(RegistroCambio.proyecto_id == proyecto_id, RegistroCambio.seq > desde)
+        .order_by(RegistroCambio.seq)
+        .limit(limite + 1)
+    ).all()
+    mas = len(filas) > limite
+    filas = filas[:limite]
+    vivos = {entidad: [] for entidad in ENTIDADES}
+    borrados = {entidad: [] for entidad in ENTIDADES}
+    for fila in filas:
+        (borrados if fila.borrado else vivos)[fila.entidad].append(fila.entidad_id)
+    return (filas[-1].seq if filas else desde), mas, vivos, borrados
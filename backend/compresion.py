@@ -0,0 +1,134 @@
+# backend/compresion.py
+# Middleware ASGI de compresión de respuestas: brotli si el cliente lo acepta y el
+# paquete `brotli` está instalado, gzip en otro caso. Solo se comprimen los tipos de
+# texto (JSON, NDJSON, HTML, Markdown...) a partir de TAM_MINIMO bytes; los JSON con
+# campos de texto largos (descripcion, flujo_normal) se reducen mucho, mientras que
+# los docx y pdf exportados ya van comprimidos y se envían tal cual. Las respuestas en
+# streaming se comprimen trozo a trozo.
+import os
+import zlib
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+TAM_MINIMO = int(os.getenv("COMPRESION_TAM_MINIMO", "1024"))
+NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+CALIDAD_BROTLI = int(os.getenv("COMPRESION_CALIDAD_BROTLI", "5"))
+# Los trozos más grandes se comprimen en un hilo para no bloquear el bucle de eventos
+TAM_HILO = 256 * 1024
+TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/x-ndjson", "application/javascript",
+                      "application/xml", "image/svg+xml")
+# Los eventos (SSE) se envían según se producen, sin compresión
+EXCLUIDOS = ("text/event-stream",)
+SIN_CUERPO = {204, 206, 304}
+
+
+class _Gzip:
+    def __init__(self, nivel: int):
+        self._compresor = zlib.compressobj(nivel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        return self._compresor.compress(datos) + self._compresor.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class _Brotli:
+    def __init__(self, calidad: int):
+        self._compresor = brotli.Compressor(quality=calidad)
+
+    def comprimir(self, datos: bytes, final: bool) -> bytes:
+        salida = self._compresor.process(datos)
+        return salida + (self._compresor.finish() if final else self._compresor.flush())
+
+
+def _aceptadas(cabecera: str):
+    aceptadas = set()
+    for opcion in cabecera.split(","):
+        token, _, parametros = opcion.partition(";")
+        parametros = parametros.replace(" ", "")
+        if parametros.startswith("q=") and parametros[2:].strip("0.") == "":
+            continue  # q=0: el cliente la rechaza
+        aceptadas.add(token.strip().lower())
+    return aceptadas
+
+
+class Compresion:
+    def __init__(self, app, tam_minimo: int = TAM_MINIMO, nivel_gzip: int = NIVEL_GZIP,
+                 calidad_brotli: int = CALIDAD_BROTLI):
+        self.app = app
+        self.tam_minimo = tam_minimo
+        self.nivel_gzip = nivel_gzip
+        self.calidad_brotli = calidad_brotli
+
+    def _codificacion(self, scope):
+        aceptadas = _aceptadas(Headers(scope=scope).get("accept-encoding", ""))
+        if brotli is not None and "br" in aceptadas:
+            return "br"
+        if "gzip" in aceptadas:
+            return "gzip"
+        return None
+
+    def _compresor(self, codificacion):
+        return _Brotli(self.calidad_brotli) if codificacion == "br" else _Gzip(self.nivel_gzip)
+
+    async def __call__(self, scope, receive, send):
+        codificacion = self._codificacion(scope) if scope["type"] == "http" else None
+        if codificacion is None:
+            await self.app(scope, receive, send)
+            return
+
+        inicio = None
+        compresor = None
+
+        async def comprimir(datos, final):
+            if len(datos) >= TAM_HILO:
+                return await anyio.to_thread.run_sync(compresor.comprimir, datos, final)
+            return compresor.comprimir(datos, final)
+
+        async def enviar(mensaje):
+            nonlocal inicio, compresor
+            if mensaje["type"] == "http.response.start":
+                # Las cabeceras se retienen hasta ver el primer trozo del cuerpo
+                inicio = mensaje
+                return
+            if mensaje["type"] != "http.response.body":
+                if inicio is not None:
+                    await send(inicio)
+                    inicio = None
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+            if inicio is not None:
+                cabeceras = MutableHeaders(raw=inicio["headers"])
+                tipo = cabeceras.get("content-type", "").lower()
+                if ("content-encoding" not in cabeceras and inicio["status"] not in SIN_CUERPO
+                        and tipo.startswith(TIPOS_COMPRIMIBLES) and not tipo.startswith(EXCLUIDOS)
+                        and (mas or len(cuerpo) >= self.tam_minimo)):
+                    compresor = self._compresor(codificacion)
+                    cabeceras["Content-Encoding"] = codificacion
+                    cabeceras.add_vary_header("Accept-Encoding")
+                    if "content-length" in cabeceras:
+                        del cabeceras["Content-Length"]
+                    # El cuerpo comprimido es otra representación: un ETag fuerte pasa a débil
+                    etag = cabeceras.get("etag")
+                    if etag and not etag.startswith("W/"):
+                        cabeceras["ETag"] = f"W/{etag}"
+                    cuerpo = await comprimir(cuerpo, not mas)
+                    if not mas:
+                        cabeceras["Content-Length"] = str(len(cuerpo))
+                    mensaje = {"type": "http.response.body", "body": cuerpo, "more_body": mas}
+                await send(inicio)
+                inicio = None
+                await send(mensaje)
+                return
+            if compresor is not None:
+                mensaje = {"type": "http.response.body", "body": await comprimir(cuerpo, not mas), "more_body": mas}
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,145 @@
+# backend/condicional.py
+# GET condicionales (ETag / Last-Modified y 304) para las rutas de lectura. Los
+# validadores se calculan antes de ejecutar la ruta con una consulta barata, así que un
+# 304 no carga ni serializa nada:
+#   - bajo /projects/{project_id}, la misma que versiona la caché de exportaciones
+#     (version_contenido, fecha_actualizacion más reciente y número de filas de cada
+#     tabla del proyecto),
+#   - en el resto (/projects, /actores, /casos_uso/{id}/actores, /escenarios,
+#     /relaciones, /search y /stats), la fila de version_global, que cambia con
+#     cualquier escritura (ver versiones.py), junto con el usuario.
+#
+# El ETag sale solo de esas versiones, que mantienen triggers en la base de datos y por
+# tanto son las mismas en todos los procesos. fecha_actualizacion tiene resolución de
+# segundo, así que Last-Modified tiene en cuenta además la hora de la última escritura
+# vista por el proceso (la anota cada cache_documentos.invalidar_proyecto) y solo se
+# envía cuando ha pasado al menos un segundo desde ella: dentro del mismo segundo otra
+# escritura no lo cambiaría.
+# If-None-Match, cuando viene, tiene prioridad sobre If-Modified-Since.
+import hashlib
+import threading
+import time
+from datetime import timezone
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from . import cache_documentos
+from .database import get_db, get_async_db
+from .models import VersionGlobal
+from .routers.dependencies import get_current_user, get_current_user_async, Principal
+
+# Se incrementa cuando cambia el formato de las respuestas JSON
+VERSION_RESPUESTAS = "1"
+CACHE_CONTROL = "private, no-cache"
+
+
+class RegistroEscrituras:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._proyectos = {}  # proyecto_id -> hora de la última escritura
+        self._global = 0.0
+
+    def anotar(self, proyecto_id: int):
+        ahora = time.time()
+        with self._lock:
+            self._proyectos[proyecto_id] = ahora
+            self._global = ahora
+
+    def proyecto(self, proyecto_id: int):
+        with self._lock:
+            return self._proyectos.get(proyecto_id, 0.0)
+
+    def todas(self):
+        with self._lock:
+            return self._global
+
+
+escrituras = RegistroEscrituras()
+cache_documentos.al_invalidar(escrituras.anotar)
+
+
+def _marca(fecha):
+    # Las fechas se guardan en UTC (CURRENT_TIMESTAMP de SQLite)
+    return fecha.replace(tzinfo=timezone.utc).timestamp() if fecha is not None else 0.0
+
+
+def _no_modificado(request: Request, etag: str, ultima_modificacion):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return cache_documentos.etag_coincide(if_none_match, etag[2:])
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or ultima_modificacion is None:
+        return False
+    try:
+        fecha = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if fecha.tzinfo is None:
+        fecha = fecha.replace(tzinfo=timezone.utc)
+    return int(ultima_modificacion) <= fecha.timestamp()
+
+
+def _consulta_validadores(request: Request, current_user: Principal):
+    # (project_id, consulta) con la que se calculan los validadores, o None si la
+    # petición no admite GET condicional
+    if request.method != "GET":
+        return None
+    project_id = request.path_params.get("project_id")
+    if project_id is None:
+        return None, select(VersionGlobal.fecha_actualizacion, VersionGlobal.valor)
+    try:
+        project_id = int(project_id)
+    except ValueError:
+        return None
+    return project_id, cache_documentos.consulta_estado(project_id, current_user.id)
+
+
+def _validar(request: Request, response: Response, current_user: Principal, project_id, filas):
+    if project_id is None:
+        # La respuesta depende del usuario: su id va en la versión
+        version = f"u{current_user.id}|" + "|".join(f"{fecha}:{valor}" for fecha, valor in filas)
+        ultima_escritura = escrituras.todas()
+    else:
+        if not filas[0][1]:
+            return  # Proyecto inexistente o ajeno: la ruta responde 404
+        version = cache_documentos.version_proyecto(None, project_id, filas)
+        ultima_escritura = escrituras.proyecto(project_id)
+
+    recurso = f"{request.url.path}?{request.url.query}"
+    resumen = hashlib.sha256(f"{VERSION_RESPUESTAS}|{version}|{recurso}".encode()).hexdigest()[:32]
+    # Débil: la misma versión se sirve con o sin compresión
+    etag = f'W/"{resumen}"'
+    ultima_modificacion = max([_marca(fecha) for fecha, _ in filas] + [ultima_escritura])
+    if time.time() - ultima_modificacion < 1:
+        ultima_modificacion = None
+
+    cabeceras = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if ultima_modificacion is not None:
+        cabeceras["Last-Modified"] = formatdate(ultima_modificacion, usegmt=True)
+    if _no_modificado(request, etag, ultima_modificacion):
+        raise HTTPException(status_code=304, headers=cabeceras)
+    response.headers.update(cabeceras)
+
+
+def peticion_condicional(request: Request, response: Response,
+                         db: Session = Depends(get_db),
+                         current_user: Principal = Depends(get_current_user)):
+    consulta = _consulta_validadores(request, current_user)
+    if consulta is not None:
+        project_id, stmt = consulta
+        _validar(request, response, current_user, project_id, db.execute(stmt).all())
+
+
+# Para los routers de routers_async: comparte la AsyncSession de la ruta en lugar de
+# abrir una sesión síncrona en cada petición
+async def peticion_condicional_async(request: Request, response: Response,
+                                     db: AsyncSession = Depends(get_async_db),
+                                     current_user: Principal = Depends(get_current_user_async)):
+    consulta = _consulta_validadores(request, current_user)
+    if consulta is not None:
+        project_id, stmt = consulta
+        _validar(request, response, current_user, project_id, (await db.execute(stmt)).all())
@@ -0,0 +1,117 @@
+# backend/contrasenas.py
+# Hash y verificación de contraseñas fuera del threadpool de las peticiones. bcrypt
+# tarda cientos de milisegundos a propósito: una ráfaga de logins o registros
+# ejecutados en el threadpool lo ocupaba entero y el resto de rutas esperaban hilo.
+# Aquí se envían a un pool de procesos de tamaño fijo y la ruta espera sin ocupar
+# hilo. Las peticiones que pueden esperar turno están acotadas: por encima se
+# responde 503 al momento en vez de acumular esperas.
+#
+# Los procesos se crean con "spawn" (no heredan hilos ni conexiones del servidor) al
+# primer uso y con menos prioridad que el servidor, para que en máquinas con pocos
+# núcleos el CRUD no compita de igual a igual con bcrypt. HASH_PROCESOS=0 ejecuta el
+# hash en el threadpool como antes. Con "spawn" cada proceso vuelve a importar el
+# script principal: si la aplicación se arranca desde un script sin
+# `if __name__ == "__main__":` los procesos mueren al arrancar y, tras reintentar, el
+# pool pasa también al threadpool.
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from starlette.concurrency import run_in_threadpool
+
+from . import security
+
+logger = logging.getLogger(__name__)
+
+PROCESOS = int(os.getenv("HASH_PROCESOS", str(min(4, os.cpu_count() or 1))))
+# Peticiones que pueden esperar a que quede libre un proceso
+COLA_MAX = int(os.getenv("HASH_COLA_MAX", "32"))
+# Cuánto se rebaja la prioridad de los procesos (nice)
+PRIORIDAD = int(os.getenv("HASH_PRIORIDAD", "5"))
+
+
+class PoolSaturado(Exception):
+    pass
+
+
+def _iniciar_proceso(prioridad):
+    if prioridad and hasattr(os, "nice"):
+        os.nice(prioridad)
+
+
+class PoolContrasenas:
+    def __init__(self, procesos: int = PROCESOS, cola_max: int = COLA_MAX, prioridad: int = PRIORIDAD):
+        self.procesos = procesos
+        self.cola_max = cola_max
+        self.prioridad = prioridad
+        self._lock = threading.Lock()
+        self._en_curso = 0
+        self._ejecutor = None
+        self._en_hilos = procesos <= 0
+
+    @property
+    def en_curso(self):
+        return self._en_curso
+
+    def _obtener_ejecutor(self):
+        with self._lock:
+            if self._ejecutor is None:
+                self._ejecutor = ProcessPoolExecutor(
+                    max_workers=self.procesos, mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_iniciar_proceso, initargs=(self.prioridad,),
+                )
+            return self._ejecutor
+
+    def _descartar_ejecutor(self, ejecutor):
+        with self._lock:
+            if self._ejecutor is ejecutor:
+                self._ejecutor = None
+        ejecutor.shutdown(wait=False)
+
+    async def ejecutar(self, funcion, *args):
+        with self._lock:
+            if self._en_curso >= self.procesos + self.cola_max:
+                raise PoolSaturado()
+            self._en_curso += 1
+        try:
+            if self._en_hilos:
+                return await run_in_threadpool(funcion, *args)
+            ejecutor = self._obtener_ejecutor()
+            try:
+                return await asyncio.wrap_future(ejecutor.submit(funcion, *args))
+            except BrokenProcessPool:
+                # Un proceso murió (p. ej. por memoria): se recrea el pool y se reintenta una vez
+                self._descartar_ejecutor(ejecutor)
+            ejecutor = self._obtener_ejecutor()
+            try:
+                return await asyncio.wrap_future(ejecutor.submit(funcion, *args))
+            except BrokenProcessPool:
+                self._descartar_ejecutor(ejecutor)
+                if not self._en_hilos:
+                    self._en_hilos = True
+                    logger.warning("El pool de procesos de contraseñas no arranca; se usa el threadpool")
+                return await run_in_threadpool(funcion, *args)
+        finally:
+            with self._lock:
+                self._en_curso -= 1
+
+    def cerrar(self):
+        with self._lock:
+            ejecutor, self._ejecutor = self._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=True, cancel_futures=True)
+
+
+pool = PoolContrasenas()
+
+
+async def hash_password(password: str) -> str:
+    return await pool.ejecutar(security.hash_password, password)
+
+
+async def verify_and_update(plain_password: str, hashed_password: str):
+    return await pool.ejecutar(security.verify_and_update, plain_password, hashed_password)
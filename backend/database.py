@@ -1,12 +1,18 @@
-from sqlalchemy import create_engine
+import os
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from .almacenamiento import PERFIL_POR_DEFECTO, crear_motor, aplicar_perfil, pragmas_del_perfil
 
 
-DATABASE_URL = "sqlite:///./baseDatos.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./baseDatos.db")
+# Modo asíncrono opcional (DB_ASYNC=1): mismas tablas servidas a través de aiosqlite
+DB_ASYNC = os.getenv("DB_ASYNC", "0") == "1"
+ASYNC_DATABASE_URL = DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
+# Perfil de PRAGMA por conexión (ver almacenamiento.py): "wal" o "clasico"
+SQLITE_PERFIL = os.getenv("SQLITE_PERFIL", PERFIL_POR_DEFECTO)
 
 # Crear el motor de la base de datos con SQLite
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+engine = crear_motor(DATABASE_URL, SQLITE_PERFIL)
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -17,4 +23,19 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# aiosqlite solo es necesario si se activa el modo asíncrono
+async_engine = None
+AsyncSessionLocal = None
+if DB_ASYNC:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    async_engine = create_async_engine(ASYNC_DATABASE_URL)
+    aplicar_perfil(async_engine.sync_engine, pragmas_del_perfil(SQLITE_PERFIL))
+    # Sin expirar tras commit: en asíncrono no se puede recargar un atributo de forma perezosa
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 Base = declarative_base()
\ No newline at end of file
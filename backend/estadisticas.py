@@ -0,0 +1,158 @@
+# backend/estadisticas.py
+# Contadores materializados por proyecto para el dashboard: cuántos requisitos hay por
+# estado y por tipo, cuántos casos de uso por estado y por categoría y cuántos
+# escenarios por tipo. Cada contador es una fila (proyecto_id, dimension, valor, total)
+# de estadisticas_proyecto, así que las estadísticas de un proyecto se leen por su
+# clave primaria en lugar de recorrer sus tablas.
+#
+# Los contadores los mantienen triggers de SQLite en la misma transacción que la
+# escritura (+1/-1 por fila), de modo que cubren todas las rutas que escriben:
+# routers síncronos y asíncronos, importación, purga y datos mock. Si aun así se
+# desajustan (p. ej. datos editados a mano o triggers perdidos al recrear una tabla
+# en modo batch), `python -m backend.gestion reconciliar-estadisticas` los recalcula.
+#
+# Las bases nuevas crean los triggers con create_all (ver models.py) y las
+# existentes con la migración 0006.
+from sqlalchemy import text
+
+TABLA = "estadisticas_proyecto"
+# dimension -> (tabla, columna). Los valores se guardan tal cual están en la columna
+DIMENSIONES = {
+    "requisitos.estado": ("requisitos", "estado"),
+    "requisitos.tipo": ("requisitos", "tipo"),
+    "casos_uso.estado": ("casos_uso", "estado"),
+    "casos_uso.categoria": ("casos_uso", "categoria"),
+    "escenarios.tipo": ("escenarios", "tipo"),
+}
+# Cómo llega cada tabla a su proyecto
+PROYECTO = {
+    "requisitos": "{fila}.proyecto_id",
+    "casos_uso": "{fila}.proyecto_id",
+    "escenarios": "(SELECT proyecto_id FROM casos_uso WHERE id = {fila}.caso_uso_id)",
+}
+# Columnas de las que depende el proyecto de una fila
+ENLACE = {"requisitos": "proyecto_id", "casos_uso": "proyecto_id", "escenarios": "caso_uso_id"}
+DISPARADORES = [f"{tabla}_estadisticas_{sufijo}" for tabla in PROYECTO for sufijo in ("ai", "au", "ad")] + [
+    "casos_uso_estadisticas_proyecto", "proyectos_estadisticas_ad"]
+
+
+def _dimensiones(tabla):
+    return [(dimension, columna) for dimension, (t, columna) in DIMENSIONES.items() if t == tabla]
+
+
+def _sumar(tabla, fila):
+    proyecto = PROYECTO[tabla].format(fila=fila)
+    return "".join(
+        f"INSERT INTO {TABLA}(proyecto_id, dimension, valor, total) "
+        f"SELECT {proyecto}, '{dimension}', {fila}.{columna}, 1 WHERE {proyecto} IS NOT NULL "
+        f"ON CONFLICT(proyecto_id, dimension, valor) DO UPDATE SET total = total + 1; "
+        for dimension, columna in _dimensiones(tabla)
+    )
+
+
+def _restar(tabla, fila):
+    proyecto = PROYECTO[tabla].format(fila=fila)
+    return "".join(
+        f"UPDATE {TABLA} SET total = total - 1 "
+        f"WHERE proyecto_id = {proyecto} AND dimension = '{dimension}' AND valor = {fila}.{columna}; "
+        for dimension, columna in _dimensiones(tabla)
+    )
+
+
+def sentencias_ddl():
+    for tabla in PROYECTO:
+        columnas = [columna for _, columna in _dimensiones(tabla)] + [ENLACE[tabla]]
+        cambio = " OR ".join(f"old.{c} IS NOT new.{c}" for c in columnas)
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_estadisticas_ai AFTER INSERT ON {tabla} BEGIN "
+               f"{_sumar(tabla, 'new')}END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_estadisticas_au AFTER UPDATE OF {', '.join(columnas)} "
+               f"ON {tabla} WHEN {cambio} BEGIN {_restar(tabla, 'old')}{_sumar(tabla, 'new')}END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_estadisticas_ad AFTER DELETE ON {tabla} BEGIN "
+               f"{_restar(tabla, 'old')}END")
+    # Un caso de uso que cambia de proyecto (o se desvincula en una purga) se lleva sus escenarios
+    yield ("CREATE TRIGGER IF NOT EXISTS casos_uso_estadisticas_proyecto AFTER UPDATE OF proyecto_id ON casos_uso "
+           "WHEN old.proyecto_id IS NOT new.proyecto_id BEGIN "
+           f"UPDATE {TABLA} SET total = total - (SELECT count(*) FROM escenarios "
+           f"WHERE caso_uso_id = new.id AND tipo = {TABLA}.valor) "
+           f"WHERE proyecto_id = old.proyecto_id AND dimension = 'escenarios.tipo'; "
+           f"INSERT INTO {TABLA}(proyecto_id, dimension, valor, total) "
+           "SELECT new.proyecto_id, 'escenarios.tipo', tipo, count(*) FROM escenarios "
+           "WHERE caso_uso_id = new.id AND new.proyecto_id IS NOT NULL GROUP BY tipo "
+           "ON CONFLICT(proyecto_id, dimension, valor) DO UPDATE SET total = total + excluded.total; END")
+    # Al borrar el proyecto sus contadores sobran (la purga de sus filas ya no los toca)
+    yield (f"CREATE TRIGGER IF NOT EXISTS proyectos_estadisticas_ad AFTER DELETE ON proyectos BEGIN "
+           f"DELETE FROM {TABLA} WHERE proyecto_id = old.id; END")
+
+
+def crear_triggers(conexion):
+    if conexion.dialect.name != "sqlite":
+        return
+    for sentencia in sentencias_ddl():
+        conexion.exec_driver_sql(sentencia)
+
+
+def crear_triggers_tras_create_all(target, conexion, **kw):
+    crear_triggers(conexion)
+
+
+def _consulta_real():
+    # Contadores calculados desde las tablas (solo filas de proyectos que existen)
+    partes = []
+    for dimension, (tabla, columna) in DIMENSIONES.items():
+        proyecto = PROYECTO[tabla].format(fila=tabla)
+        partes.append(
+            f"SELECT {proyecto} AS proyecto_id, '{dimension}' AS dimension, {tabla}.{columna} AS valor, "
+            f"count(*) AS total FROM {tabla} WHERE {proyecto} IN (SELECT id FROM proyectos) "
+            f"GROUP BY 1, 3"
+        )
+    return " UNION ALL ".join(partes)
+
+
+def reconciliar(conexion):
+    # Recalcula todos los contadores y corrige los que se hayan desviado; devuelve las
+    # diferencias encontradas como (proyecto_id, dimension, valor, guardado, real).
+    # El primer DELETE toma el bloqueo de escritura, así que la lectura posterior no
+    # puede quedar desfasada por otra escritura antes de aplicar las correcciones.
+    conexion.exec_driver_sql(f"DELETE FROM {TABLA} WHERE proyecto_id NOT IN (SELECT id FROM proyectos)")
+    guardados = {(f.proyecto_id, f.dimension, f.valor): f.total for f in conexion.execute(
+        text(f"SELECT proyecto_id, dimension, valor, total FROM {TABLA}"))}
+    reales = {(f.proyecto_id, f.dimension, f.valor): f.total for f in conexion.execute(text(_consulta_real()))}
+    diferencias = [(*clave, guardados.get(clave, 0), reales.get(clave, 0))
+                   for clave in guardados.keys() | reales.keys()
+                   if guardados.get(clave, 0) != reales.get(clave, 0)]
+    if diferencias:
+        conexion.execute(text(
+            f"INSERT INTO {TABLA}(proyecto_id, dimension, valor, total) VALUES (:p, :d, :v, :t) "
+            f"ON CONFLICT(proyecto_id, dimension, valor) DO UPDATE SET total = excluded.total"
+        ), [{"p": p, "d": d, "v": v, "t": real} for p, d, v, _, real in diferencias])
+    return sorted(diferencias)
+
+
+def resumen(filas):
+    # Filas (dimension, valor, total) -> estadísticas por sección, con todos los valores
+    # posibles de cada enumerado (a 0 si no hay filas) y expresados como en la API
+    from .models import (EstadoRequisitoEnum, TipoRequisitoEnum, EstadoCasoUsoEnum,
+                         CategoriaCasoUsoEnum, TipoEscenarioEnum)
+    secciones = {
+        "requisitos": {"por_estado": ("requisitos.estado", EstadoRequisitoEnum),
+                       "por_tipo": ("requisitos.tipo", TipoRequisitoEnum)},
+        "casos_uso": {"por_estado": ("casos_uso.estado", EstadoCasoUsoEnum),
+                      "por_categoria": ("casos_uso.categoria", CategoriaCasoUsoEnum)},
+        "escenarios": {"por_tipo": ("escenarios.tipo", TipoEscenarioEnum)},
+    }
+    totales = {}
+    for fila in filas:
+        totales[fila.dimension, fila.valor] = totales.get((fila.dimension, fila.valor), 0) + fila.total
+    resultado = {}
+    for seccion, campos in secciones.items():
+        datos = {}
+        for campo, (dimension, enumerado) in campos.items():
+            conteo = dict.fromkeys((m.value for m in enumerado), 0)
+            for m in enumerado:
+                # Según la columna se guarda el nombre del miembro o su valor
+                for guardado in {m.name, m.value}:
+                    conteo[m.value] += totales.get((dimension, guardado), 0)
+            datos[campo] = conteo
+        datos["total"] = sum(next(iter(datos.values())).values())
+        resultado[seccion] = datos
+    return resultado
@@ -0,0 +1,144 @@
+# backend/eventos.py
+# Canal de eventos en vivo por proyecto (GET /projects/{id}/events, Server-Sent Events).
+# Las rutas de escritura de requisitos, casos de uso y escenarios publican un evento
+# compacto {"entidad", "id", "accion"} tras el commit y el broker lo reparte a las
+# conexiones abiertas de ese proyecto. El evento solo avisa: el cliente trae los datos
+# con el registro de cambios (GET /projects/{id}/changes?since=), cuyo cursor recibe
+# al conectarse, así que un evento perdido no deja al cliente desfasado.
+#
+# El broker vive en memoria del proceso (con varios workers cada uno ve solo sus
+# escrituras). Cada conexión es una corrutina esperando en su cola, sin hilos ni
+# temporizadores propios: un único latido común mantiene vivas las conexiones
+# inactivas. Las colas están acotadas; si un cliente no lee y la suya se llena se le
+# expulsa con un evento "expulsado" en lugar de acumular memoria o frenar a los demás.
+import asyncio
+import json
+import os
+
+TAM_COLA = int(os.getenv("EVENTOS_TAM_COLA", "64"))
+MAX_SUSCRIPCIONES = int(os.getenv("EVENTOS_MAX_SUSCRIPCIONES", "10000"))
+# Segundos entre comentarios de latido (los proxies suelen cortar a los 60 s sin datos)
+LATIDO = float(os.getenv("EVENTOS_LATIDO_S", "20"))
+# El navegador reintenta la conexión tras este tiempo (ms)
+REINTENTO_MS = 3000
+
+_LATIDO = b": latido\n\n"
+_FIN = None
+
+
+class Suscripcion:
+    __slots__ = ("proyecto_id", "cola")
+
+    def __init__(self, proyecto_id: int, tam_cola: int):
+        self.proyecto_id = proyecto_id
+        self.cola = asyncio.Queue(tam_cola)
+
+
+def formatear(evento: str, datos) -> bytes:
+    return f"event: {evento}\ndata: {json.dumps(datos, separators=(',', ':'))}\n\n".encode()
+
+
+class Broker:
+    def __init__(self, tam_cola: int = TAM_COLA, max_suscripciones: int = MAX_SUSCRIPCIONES,
+                 latido: float = LATIDO):
+        self.tam_cola = tam_cola
+        self.max_suscripciones = max_suscripciones
+        self.latido = latido
+        self._suscripciones = {}  # proyecto_id -> {Suscripcion}
+        self._total = 0
+        self._bucle = None
+        self._tarea_latido = None
+        self.expulsadas = 0
+
+    @property
+    def total(self):
+        return self._total
+
+    @property
+    def completo(self):
+        return self._total >= self.max_suscripciones
+
+    # --- Dentro del bucle de eventos ---
+    def suscribir(self, proyecto_id: int) -> Suscripcion:
+        self._bucle = asyncio.get_running_loop()
+        suscripcion = Suscripcion(proyecto_id, self.tam_cola)
+        self._suscripciones.setdefault(proyecto_id, set()).add(suscripcion)
+        self._total += 1
+        if self._tarea_latido is None or self._tarea_latido.done():
+            self._tarea_latido = self._bucle.create_task(self._latir())
+        return suscripcion
+
+    def cancelar(self, suscripcion: Suscripcion):
+        suscripciones = self._suscripciones.get(suscripcion.proyecto_id, set())
+        if suscripcion not in suscripciones:
+            return
+        suscripciones.discard(suscripcion)
+        if not suscripciones:
+            del self._suscripciones[suscripcion.proyecto_id]
+        self._total -= 1
+
+    def _expulsar(self, suscripcion: Suscripcion):
+        # Consumidor lento: se descarta lo pendiente y se le deja solo el aviso de cierre
+        self.cancelar(suscripcion)
+        self.expulsadas += 1
+        while not suscripcion.cola.empty():
+            suscripcion.cola.get_nowait()
+        suscripcion.cola.put_nowait(_FIN)
+
+    def _repartir(self, proyecto_id: int, mensaje: bytes):
+        for suscripcion in list(self._suscripciones.get(proyecto_id, ())):
+            try:
+                suscripcion.cola.put_nowait(mensaje)
+            except asyncio.QueueFull:
+                self._expulsar(suscripcion)
+
+    async def _latir(self):
+        while self._total:
+            await asyncio.sleep(self.latido)
+            for suscripciones in list(self._suscripciones.values()):
+                for suscripcion in list(suscripciones):
+                    # Si la cola ya tiene algo pendiente el latido sobra
+                    if suscripcion.cola.empty():
+                        suscripcion.cola.put_nowait(_LATIDO)
+
+    async def flujo(self, proyecto_id: int, inicial: bytes = b""):
+        # La suscripción se crea al empezar a enviar y se cancela al terminar el flujo
+        # (también cuando el cliente se desconecta: como muy tarde lo descubre el
+        # siguiente latido al fallar el envío)
+        suscripcion = self.suscribir(proyecto_id)
+        try:
+            yield f"retry: {REINTENTO_MS}\n\n".encode() + inicial
+            while True:
+                mensaje = await suscripcion.cola.get()
+                if mensaje is _FIN:
+                    yield formatear("expulsado", {"motivo": "cola llena"})
+                    return
+                yield mensaje
+        finally:
+            self.cancelar(suscripcion)
+
+    # --- Desde cualquier hilo ---
+    def publicar(self, proyecto_id: int, entidad: str, entidad_id: int, accion: str):
+        # Las rutas síncronas corren en el threadpool: el reparto se pasa al bucle
+        bucle = self._bucle
+        if bucle is None or proyecto_id not in self._suscripciones:
+            return
+        mensaje = formatear("cambio", {"entidad": entidad, "id": entidad_id, "accion": accion})
+        try:
+            en_bucle = asyncio.get_running_loop() is bucle
+        except RuntimeError:
+            en_bucle = False
+        if en_bucle:
+            self._repartir(proyecto_id, mensaje)
+        else:
+            try:
+                bucle.call_soon_threadsafe(self._repartir, proyecto_id, mensaje)
+            except RuntimeError:  # El bucle ya se cerró (apagado)
+                pass
+
+
+broker = Broker()
+
+
+def publicar(proyecto_id: int, entidad: str, entidad_id: int, accion: str):
+    broker.publicar(proyecto_id, entidad, entidad_id, accion)
@@ -0,0 +1,451 @@
+# backend/exportacion.py
+# Generación en streaming de las tablas de Durán y Bernárdez (Markdown, HTML, DOCX y PDF).
+# El proyecto se recorre por lotes (keyset sobre id) y cada lote se expulsa de la sesión
+# una vez renderizado, de modo que la memoria no crece con el tamaño del proyecto.
+import html
+import io
+import zipfile
+from xml.sax.saxutils import escape as xml_escape
+
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from .models import Proyecto, Requisito, CasoUso
+
+TAM_LOTE = 200
+
+FORMATOS = {
+    "md": ("text/markdown; charset=utf-8", "md"),
+    "html": ("text/html; charset=utf-8", "html"),
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+    "pdf": ("application/pdf", "pdf"),
+}
+
+
+def _valor(v):
+    if v is None:
+        return ""
+    if hasattr(v, "value"):  # Enumerados
+        return str(v.value)
+    return str(v)
+
+
+# --- Recorrido del proyecto ---
+def _lotes_requisitos(db: Session, proyecto_id: int):
+    ultimo_id = 0
+    while True:
+        lote = (
+            db.query(Requisito)
+            .options(joinedload(Requisito.padre))
+            .filter(Requisito.proyecto_id == proyecto_id, Requisito.id > ultimo_id)
+            .order_by(Requisito.id)
+            .limit(TAM_LOTE)
+            .all()
+        )
+        if not lote:
+            return
+        yield lote
+        ultimo_id = lote[-1].id
+        db.expunge_all()
+
+
+def _lotes_casos_uso(db: Session, proyecto_id: int):
+    ultimo_id = 0
+    while True:
+        lote = (
+            db.query(CasoUso)
+            .options(joinedload(CasoUso.requisito), selectinload(CasoUso.escenarios))
+            .filter(CasoUso.proyecto_id == proyecto_id, CasoUso.id > ultimo_id)
+            .order_by(CasoUso.id)
+            .limit(TAM_LOTE)
+            .all()
+        )
+        if not lote:
+            return
+        yield lote
+        ultimo_id = lote[-1].id
+        db.expunge_all()
+
+
+def tabla_requisito(req: Requisito):
+    padre = f"RF-{req.padre.id:04d} {req.padre.nombre}" if req.padre else ""
+    filas = [
+        ("Versión", _valor(req.version)),
+        ("Descripción", _valor(req.descripcion)),
+        ("Tipo", _valor(req.tipo)),
+        ("Prioridad", _valor(req.prioridad)),
+        ("Fuente", _valor(req.fuente)),
+        ("Estado", _valor(req.estado)),
+        ("Dependencias", padre),
+        ("Comentarios", _valor(req.observaciones)),
+    ]
+    return f"RF-{req.id:04d}", req.nombre, filas
+
+
+def tabla_caso_uso(cu: CasoUso):
+    dependencia = f"RF-{cu.requisito.id:04d} {cu.requisito.nombre}" if cu.requisito else ""
+    escenarios = "\n".join(
+        f"{_valor(e.tipo)} - {e.nombre}: {_valor(e.descripcion)}"
+        + (f" → {e.resultado_esperado}" if e.resultado_esperado else "")
+        for e in cu.escenarios
+    )
+    filas = [
+        ("Dependencias", dependencia),
+        ("Descripción", _valor(cu.descripcion)),
+        ("Actores", _valor(cu.actores)),
+        ("Precondición", _valor(cu.precondiciones)),
+        ("Secuencia normal", _valor(cu.flujo_normal)),
+        ("Postcondición", _valor(cu.postcondiciones)),
+        ("Excepciones", _valor(cu.flujo_alternativo)),
+        ("Escenarios", escenarios),
+        ("Categoría", _valor(cu.categoria)),
+        ("Estado", _valor(cu.estado)),
+    ]
+    return f"UC-{cu.id:04d}", cu.titulo, filas
+
+
+# --- Renderizadores ---
+class RenderizadorMarkdown:
+    def inicio(self, proyecto):
+        return (
+            f"# {proyecto.nombre}\n\n"
+            f"**Descripción:** {_valor(proyecto.descripcion) or 'N/A'}\n\n"
+            f"**Estado:** {_valor(proyecto.estado)}\n\n"
+        ).encode()
+
+    def seccion(self, titulo):
+        return f"## {titulo}\n\n".encode()
+
+    def tabla(self, identificador, titulo, filas):
+        def celda(texto):
+            return texto.replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+        lineas = [f"| {identificador} | {celda(titulo)} |", "| --- | --- |"]
+        lineas += [f"| **{campo}** | {celda(valor)} |" for campo, valor in filas]
+        return ("\n".join(lineas) + "\n\n").encode()
+
+    def fin(self):
+        return b""
+
+
+class RenderizadorHTML:
+    def inicio(self, proyecto):
+        nombre = html.escape(proyecto.nombre)
+        return (
+            "<!DOCTYPE html><html lang=\"es\"><head><meta charset=\"utf-8\">"
+            f"<title>{nombre}</title><style>"
+            "body{font-family:Arial,sans-serif;font-size:10pt}"
+            "table{border-collapse:collapse;width:100%;margin-bottom:15px;page-break-inside:avoid}"
+            "th,td{border:1px solid #ccc;padding:5px;text-align:left;vertical-align:top;white-space:pre-wrap}"
+            "th{background-color:#e0e0e0}h1{color:#006bb3}h2{color:#004d80}"
+            "</style></head><body>"
+            f"<h1>{nombre}</h1>"
+            f"<p><b>Descripción:</b> {html.escape(_valor(proyecto.descripcion) or 'N/A')}</p>"
+            f"<p><b>Estado:</b> {html.escape(_valor(proyecto.estado))}</p>"
+        ).encode()
+
+    def seccion(self, titulo):
+        return f"<h2>{html.escape(titulo)}</h2>".encode()
+
+    def tabla(self, identificador, titulo, filas):
+        partes = [f"<table><tr><th>{identificador}</th><th>{html.escape(titulo)}</th></tr>"]
+        partes += [f"<tr><th>{campo}</th><td>{html.escape(valor)}</td></tr>" for campo, valor in filas]
+        partes.append("</table>")
+        return "".join(partes).encode()
+
+    def fin(self):
+        return b"</body></html>"
+
+
+class _Sumidero(io.RawIOBase):
+    # Flujo de solo escritura y sin seek: zipfile escribe descriptores de datos
+    # y nosotros vaciamos lo acumulado tras cada tabla.
+    def __init__(self):
+        self._partes = []
+        self._posicion = 0
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        self._posicion += len(datos)
+        return len(datos)
+
+    def tell(self):
+        return self._posicion
+
+    def vaciar(self):
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '<Override PartName="/word/styles.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.styles+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/></Relationships>'
+)
+_DOCX_DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+    'Target="styles.xml"/></Relationships>'
+)
+_DOCX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:styles xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:style w:type="paragraph" w:default="1" w:styleId="Normal"><w:name w:val="Normal"/>'
+    '<w:rPr><w:rFonts w:ascii="Arial" w:hAnsi="Arial"/><w:sz w:val="20"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Title"><w:name w:val="Title"/><w:basedOn w:val="Normal"/>'
+    '<w:rPr><w:b/><w:color w:val="006BB3"/><w:sz w:val="36"/></w:rPr></w:style>'
+    '<w:style w:type="paragraph" w:styleId="Heading1"><w:name w:val="heading 1"/><w:basedOn w:val="Normal"/>'
+    '<w:pPr><w:spacing w:before="240" w:after="120"/></w:pPr>'
+    '<w:rPr><w:b/><w:color w:val="004D80"/><w:sz w:val="28"/></w:rPr></w:style>'
+    '<w:style w:type="table" w:styleId="TableGrid"><w:name w:val="Table Grid"/><w:tblPr><w:tblBorders>'
+    '<w:top w:val="single" w:sz="4" w:color="999999"/><w:left w:val="single" w:sz="4" w:color="999999"/>'
+    '<w:bottom w:val="single" w:sz="4" w:color="999999"/><w:right w:val="single" w:sz="4" w:color="999999"/>'
+    '<w:insideH w:val="single" w:sz="4" w:color="999999"/><w:insideV w:val="single" w:sz="4" w:color="999999"/>'
+    '</w:tblBorders></w:tblPr></w:style>'
+    '</w:styles>'
+)
+
+
+class RenderizadorDOCX:
+    def __init__(self):
+        self._sumidero = _Sumidero()
+        self._zip = zipfile.ZipFile(self._sumidero, "w", compression=zipfile.ZIP_DEFLATED)
+        self._documento = None
+
+    @staticmethod
+    def _parrafo(texto, estilo=None, negrita=False):
+        ppr = f'<w:pPr><w:pStyle w:val="{estilo}"/></w:pPr>' if estilo else ""
+        rpr = "<w:rPr><w:b/></w:rPr>" if negrita else ""
+        lineas = texto.replace("\r", "").split("\n")
+        runs = "<w:br/>".join(f'<w:t xml:space="preserve">{xml_escape(l)}</w:t>' for l in lineas)
+        return f"<w:p>{ppr}<w:r>{rpr}{runs}</w:r></w:p>"
+
+    def _escribir(self, texto):
+        self._documento.write(texto.encode())
+        return self._sumidero.vaciar()
+
+    def inicio(self, proyecto):
+        self._zip.writestr("[Content_Types].xml", _DOCX_CONTENT_TYPES)
+        self._zip.writestr("_rels/.rels", _DOCX_RELS)
+        self._zip.writestr("word/_rels/document.xml.rels", _DOCX_DOCUMENT_RELS)
+        self._zip.writestr("word/styles.xml", _DOCX_STYLES)
+        self._documento = self._zip.open("word/document.xml", "w", force_zip64=True)
+        return self._escribir(
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+            + self._parrafo(proyecto.nombre, "Title")
+            + self._parrafo(f"Descripción: {_valor(proyecto.descripcion) or 'N/A'}")
+            + self._parrafo(f"Estado: {_valor(proyecto.estado)}")
+        )
+
+    def seccion(self, titulo):
+        return self._escribir(self._parrafo(titulo, "Heading1"))
+
+    def tabla(self, identificador, titulo, filas):
+        def fila(campo, valor, cabecera=False):
+            sombra = '<w:tcPr><w:shd w:val="clear" w:fill="E0E0E0"/></w:tcPr>'
+            return (
+                "<w:tr>"
+                f'<w:tc><w:tcPr><w:tcW w:w="2400" w:type="dxa"/><w:shd w:val="clear" w:fill="E0E0E0"/></w:tcPr>'
+                f"{self._parrafo(campo, negrita=True)}</w:tc>"
+                f"<w:tc>{sombra if cabecera else ''}{self._parrafo(valor, negrita=cabecera)}</w:tc>"
+                "</w:tr>"
+            )
+
+        xml = (
+            '<w:tbl><w:tblPr><w:tblStyle w:val="TableGrid"/><w:tblW w:w="5000" w:type="pct"/></w:tblPr>'
+            '<w:tblGrid><w:gridCol w:w="2400"/><w:gridCol w:w="6600"/></w:tblGrid>'
+            + fila(identificador, titulo, cabecera=True)
+            + "".join(fila(campo, valor) for campo, valor in filas)
+            + "</w:tbl>"
+            + self._parrafo("")
+        )
+        return self._escribir(xml)
+
+    def fin(self):
+        self._documento.write(b"<w:sectPr/></w:body></w:document>")
+        self._documento.close()
+        self._zip.close()
+        return self._sumidero.vaciar()
+
+
+class RenderizadorPDF:
+    # PDF mínimo escrito a mano: cada página se emite en cuanto se llena y solo se
+    # conservan en memoria los desplazamientos de los objetos para la tabla xref.
+    ANCHO, ALTO = 595, 842  # A4 en puntos
+    MARGEN = 40
+    TAM_FUENTE = 9
+    INTERLINEA = 12
+    ANCHO_CAMPO = 120
+
+    def __init__(self):
+        self._posicion = 0
+        self._desplazamientos = {}
+        self._siguiente_objeto = 5  # 1: catálogo, 2: páginas, 3-4: fuentes
+        self._paginas = []
+        self._contenido = []
+        self._y = 0
+
+    def _objeto(self, numero, cuerpo: bytes):
+        self._desplazamientos[numero] = self._posicion
+        datos = f"{numero} 0 obj\n".encode() + cuerpo + b"\nendobj\n"
+        self._posicion += len(datos)
+        return datos
+
+    def _nuevo_numero(self):
+        numero = self._siguiente_objeto
+        self._siguiente_objeto += 1
+        return numero
+
+    @staticmethod
+    def _texto_pdf(texto):
+        datos = texto.encode("cp1252", errors="replace")
+        return datos.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+    def _envolver(self, texto, ancho):
+        max_caracteres = max(1, int(ancho / (self.TAM_FUENTE * 0.5)))
+        lineas = []
+        for parrafo in texto.replace("\r", "").split("\n"):
+            while len(parrafo) > max_caracteres:
+                corte = parrafo.rfind(" ", 0, max_caracteres)
+                if corte <= 0:
+                    corte = max_caracteres
+                lineas.append(parrafo[:corte])
+                parrafo = parrafo[corte:].lstrip()
+            lineas.append(parrafo)
+        return lineas
+
+    def _cerrar_pagina(self):
+        if not self._contenido:
+            return b""
+        flujo = b"\n".join(self._contenido)
+        self._contenido = []
+        n_flujo = self._nuevo_numero()
+        n_pagina = self._nuevo_numero()
+        self._paginas.append(n_pagina)
+        return self._objeto(
+            n_flujo, f"<< /Length {len(flujo)} >>\nstream\n".encode() + flujo + b"\nendstream"
+        ) + self._objeto(
+            n_pagina,
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.ANCHO} {self.ALTO}] "
+            f"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents {n_flujo} 0 R >>".encode(),
+        )
+
+    def _espacio(self, alto):
+        # Devuelve los bytes de la página cerrada si no queda sitio para `alto` puntos
+        salida = b""
+        if not self._contenido or self._y - alto < self.MARGEN:
+            salida = self._cerrar_pagina()
+            self._y = self.ALTO - self.MARGEN
+            self._contenido.append(b"0.5 w")
+        return salida
+
+    def _linea(self, x, texto, fuente="F1", tam=None):
+        tam = tam or self.TAM_FUENTE
+        self._contenido.append(
+            b"BT /" + fuente.encode() + f" {tam} Tf {x} {self._y:.1f} Td (".encode()
+            + self._texto_pdf(texto) + b") Tj ET"
+        )
+
+    def _regla(self):
+        self._contenido.append(
+            f"{self.MARGEN} {self._y:.1f} m {self.ANCHO - self.MARGEN} {self._y:.1f} l S".encode()
+        )
+
+    def inicio(self, proyecto):
+        cabecera = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+        self._posicion = len(cabecera)
+        fuentes = self._objeto(
+            3, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"
+        ) + self._objeto(
+            4, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"
+        )
+        salida = self._espacio(60)
+        self._y -= 18
+        self._linea(self.MARGEN, proyecto.nombre, "F2", 16)
+        self._y -= 18
+        self._linea(self.MARGEN, f"Descripción: {_valor(proyecto.descripcion) or 'N/A'}")
+        self._y -= self.INTERLINEA
+        self._linea(self.MARGEN, f"Estado: {_valor(proyecto.estado)}")
+        self._y -= self.INTERLINEA
+        return cabecera + fuentes + salida
+
+    def seccion(self, titulo):
+        salida = self._espacio(40)
+        self._y -= 20
+        self._linea(self.MARGEN, titulo, "F2", 13)
+        self._y -= 8
+        return salida
+
+    def tabla(self, identificador, titulo, filas):
+        ancho_valor = self.ANCHO - 2 * self.MARGEN - self.ANCHO_CAMPO - 10
+        x_valor = self.MARGEN + self.ANCHO_CAMPO + 10
+        salida = self._espacio(3 * self.INTERLINEA)
+        self._regla()
+        for indice, (campo, valor) in enumerate([(identificador, titulo)] + filas):
+            fuente_valor = "F2" if indice == 0 else "F1"
+            for n, linea in enumerate(self._envolver(valor, ancho_valor) or [""]):
+                salida += self._espacio(self.INTERLINEA)
+                self._y -= self.INTERLINEA
+                if n == 0:
+                    self._linea(self.MARGEN + 2, campo, "F2")
+                self._linea(x_valor, linea, fuente_valor)
+            self._y -= 3
+            self._regla()
+        self._y -= self.INTERLINEA
+        return salida
+
+    def fin(self):
+        salida = self._cerrar_pagina()
+        kids = " ".join(f"{n} 0 R" for n in self._paginas)
+        salida += self._objeto(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        salida += self._objeto(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(self._paginas)} >>".encode())
+        inicio_xref = self._posicion
+        total = self._siguiente_objeto
+        xref = [f"xref\n0 {total}\n", "0000000000 65535 f \n"]
+        xref += [f"{self._desplazamientos[n]:010d} 00000 n \n" for n in range(1, total)]
+        xref.append(f"trailer\n<< /Size {total} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n")
+        return salida + "".join(xref).encode()
+
+
+RENDERIZADORES = {
+    "md": RenderizadorMarkdown,
+    "html": RenderizadorHTML,
+    "docx": RenderizadorDOCX,
+    "pdf": RenderizadorPDF,
+}
+
+
+def generar_documento(db: Session, proyecto_id: int, formato: str):
+    renderizador = RENDERIZADORES[formato]()
+    proyecto = db.query(Proyecto).filter(Proyecto.id == proyecto_id).first()
+    yield renderizador.inicio(proyecto)
+    db.expunge_all()
+
+    yield renderizador.seccion("Requisitos")
+    for lote in _lotes_requisitos(db, proyecto_id):
+        yield b"".join(renderizador.tabla(*tabla_requisito(req)) for req in lote)
+
+    yield renderizador.seccion("Casos de Uso")
+    for lote in _lotes_casos_uso(db, proyecto_id):
+        yield b"".join(renderizador.tabla(*tabla_caso_uso(cu)) for cu in lote)
+
+    yield renderizador.fin()
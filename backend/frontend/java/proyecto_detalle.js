@@ -33,7 +33,7 @@ document.addEventListener("DOMContentLoaded", async () => {
     EstadoCasoUsoEnum: ["Propuesto", "En Desarrollo", "Implementado", "Validado"]
   };
 
-  const authFetch = async (url, opts = {}) => {
+  const authFetch = async (url, opts = {}, conCursor = false) => {
     const headers = {
      
       ...opts.headers,
@@ -64,6 +64,7 @@ document.addEventListener("DOMContentLoaded", async () => {
         return null;
       }
       if (response.status === 204) return true; 
+      if (conCursor) return { data: await response.json(), cursor: response.headers.get("X-Next-Cursor") };
       return response.json();
     } catch (error) {
       console.error("Fetch Error:", error);
@@ -72,10 +73,31 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
   };
 
-  // 1) Cargar datos del proyecto
+  // Los listados están paginados: seguir X-Next-Cursor hasta la última página
+  const authFetchTodo = async (url) => {
+    let items = [];
+    let cursor = null;
+    do {
+      const sep = url.includes('?') ? '&' : '?';
+      const pagina = await authFetch(`${url}${sep}limit=500${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ''}`, {}, true);
+      if (!pagina) return null;
+      items = items.concat(pagina.data);
+      cursor = pagina.cursor;
+    } while (cursor);
+    return items;
+  };
+
+  // 1) Cargar el proyecto con todas sus secciones en una sola petición
   let proj = { nombre: "Cargando Proyecto...", estado: "Desconocido" }; 
+  let bundle = null;
+  // Posición en el registro de cambios: tras cada guardado solo se piden los cambios
+  // posteriores. Se toma antes del bundle para no perder lo que cambie entre medias
+  let cursorCambios = null;
   if (projectId !== "dummyProject123") { 
-      proj = await authFetch(`${baseUrl}/projects/${projectId}`) || proj;
+      const cambios = await authFetch(`${baseUrl}/projects/${projectId}/changes`);
+      cursorCambios = cambios ? cambios.cursor : null;
+      bundle = await authFetch(`${baseUrl}/projects/${projectId}/bundle`);
+      proj = (bundle && bundle.proyecto) || proj;
   } else {
       proj = { id: "dummyProject123", nombre: "Proyecto de Demostración", estado: "Activo", descripcion: "Un proyecto para pruebas."};
       console.log("Usando datos dummy para el proyecto.");
@@ -110,7 +132,8 @@ document.addEventListener("DOMContentLoaded", async () => {
     { 
       key: 'escenarios',  
       title: 'Escenarios',     
-      endpoint: `/escenarios`, 
+      endpoint: `/projects/${projectId}/escenarios`, 
+      crudEndpoint: `/escenarios`, // Alta, edición y borrado siguen en la ruta global
       fields: ['nombre', 'descripcion', 'tipo', 'resultado_esperado', 'caso_uso_id', 'fecha_creacion', 'fecha_actualizacion'], 
       displayFields: ['nombre', 'descripcion', 'tipo', 'resultado_esperado', 'caso_uso_id'],
       idField: 'id', 
@@ -178,13 +201,18 @@ document.addEventListener("DOMContentLoaded", async () => {
   const requisitosSectionDef = sections.find(s => s.key === 'requisitos');
   const casosUsoSectionDef = sections.find(s => s.key === 'casos_uso');
 
-  if (requisitosSectionDef) {
-    const el = document.createElement('div'); // Contenedor temporal para la carga
-    await loadItems(requisitosSectionDef, el, true); // Cargar silenciosamente
-  }
-  if (casosUsoSectionDef) {
-    const el = document.createElement('div'); 
-    await loadItems(casosUsoSectionDef, el, true); // Cargar silenciosamente
+  if (bundle) {
+    // El bundle ya trae todas las secciones
+    sections.forEach(sec => { sec.items = bundle[sec.key] || []; });
+  } else {
+    if (requisitosSectionDef) {
+      const el = document.createElement('div'); // Contenedor temporal para la carga
+      await loadItems(requisitosSectionDef, el, true); // Cargar silenciosamente
+    }
+    if (casosUsoSectionDef) {
+      const el = document.createElement('div'); 
+      await loadItems(casosUsoSectionDef, el, true); // Cargar silenciosamente
+    }
   }
 
 
@@ -199,7 +227,7 @@ document.addEventListener("DOMContentLoaded", async () => {
     
     container.appendChild(clone);
     // Si ya se cargaron silenciosamente, solo renderizar. Sino, cargar y renderizar.
-    if (sec.items && sec.items.length > 0 && (sec.key === 'requisitos' || sec.key === 'casos_uso')) {
+    if (bundle || (sec.items && sec.items.length > 0 && (sec.key === 'requisitos' || sec.key === 'casos_uso'))) {
         renderItems(sec, cardContainer);
     } else {
         await loadItems(sec, cardContainer);
@@ -207,6 +235,26 @@ document.addEventListener("DOMContentLoaded", async () => {
   }
 
 
+  // Cambios de otros usuarios en vivo: cada aviso del servidor dispara una sincronización.
+  // Al reconectar llega "conectado" y se recupera lo que se haya perdido entre medias
+  if (projectId !== "dummyProject123" && window.EventSource && cursorCambios !== null) {
+    let sincronizando = false;
+    let pendiente = false;
+    const sincronizarEnVivo = async () => {
+      if (sincronizando) { pendiente = true; return; }
+      sincronizando = true;
+      do {
+        pendiente = false;
+        await sincronizarCambios();
+      } while (pendiente);
+      sincronizando = false;
+    };
+    const fuente = new EventSource(`${baseUrl}/projects/${projectId}/events?access_token=${encodeURIComponent(token)}`);
+    fuente.addEventListener("conectado", sincronizarEnVivo);
+    fuente.addEventListener("cambio", sincronizarEnVivo);
+  }
+
+
   // 4) Cargar y mostrar datos
   async function loadItems(sec, el, silent = false) {
     if (!silent) el.innerHTML = '<p>Cargando...</p>';
@@ -226,23 +274,49 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
 
 
-    let data = await authFetch(dataUrl);
+    const data = await authFetchTodo(dataUrl);
 
     if (!data || !Array.isArray(data)) {
         if (!silent) el.innerHTML = `<p>No se pudieron cargar los datos para ${sec.title} o no hay elementos.</p>`;
         sec.items = [];
         return;
     }
-    
-    if (sec.key === 'escenarios' && casosUsoSectionDef) {
-      const idsCasosUsoProyecto = casosUsoSectionDef.items.map(c => c[casosUsoSectionDef.idField]);
-      data = data.filter(e => idsCasosUsoProyecto.includes(e.caso_uso_id));
-    }
 
     sec.items = data;
     if (!silent) renderItems(sec, el);
   }
 
+  // Aplica a requisitos, casos de uso y escenarios los cambios posteriores a cursorCambios
+  // y vuelve a pintar esas secciones. Devuelve false si no se pudo (se recarga entero)
+  async function sincronizarCambios() {
+    if (cursorCambios === null) return false;
+    let mas = true;
+    while (mas) {
+      const cambios = await authFetch(`${baseUrl}/projects/${projectId}/changes?since=${cursorCambios}`);
+      if (!cambios) return false;
+      sections.filter(sec => sec.key in cambios.borrados).forEach(sec => {
+        const nuevos = new Map(cambios[sec.key].map(it => [it.id, it]));
+        const borrados = new Set(cambios.borrados[sec.key]);
+        sec.items = sec.items
+          .filter(it => !borrados.has(it.id))
+          .map(it => {
+            const nuevo = nuevos.get(it.id);
+            nuevos.delete(it.id);
+            return nuevo || it;
+          })
+          .concat([...nuevos.values()]);
+      });
+      cursorCambios = cambios.cursor;
+      mas = cambios.mas;
+    }
+    // Se repintan las tres: las tarjetas muestran nombres de requisitos y casos de uso
+    ['requisitos', 'casos_uso', 'escenarios'].forEach(key => {
+      const el = container.querySelector(`.dynamic-section[data-section-key="${key}"] .card-container`);
+      if (el) renderItems(sections.find(sec => sec.key === key), el);
+    });
+    return true;
+  }
+
   function getDummyData(sectionKey) {
     const now = new Date().toISOString();
     switch(sectionKey) {
@@ -339,7 +413,7 @@ document.addEventListener("DOMContentLoaded", async () => {
             endpoint += `/${section.key}`;
         }
     } else { // Lógica de producción
-        endpoint += section.endpoint; // Ya tiene /projects/{projectId}/... o /global_path
+        endpoint += section.crudEndpoint || section.endpoint; // Ya tiene /projects/{projectId}/... o /global_path
     }
 
     if (itemId) endpoint += `/${itemId}`;
@@ -511,6 +585,7 @@ document.addEventListener("DOMContentLoaded", async () => {
 
     if (result) {
       genericModal.classList.remove("visible");
+      if (section.key !== 'actores' && await sincronizarCambios()) return;
       // Recargar silenciosamente las dependencias si es necesario
       if (section.key === 'requisitos') await loadItems(requisitosSectionDef, document.createElement('div'), true);
       if (section.key === 'casos_uso') await loadItems(casosUsoSectionDef, document.createElement('div'), true);
@@ -539,6 +614,7 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
 
     if (success) {
+      if (section.key !== 'actores' && await sincronizarCambios()) return;
       // Recargar silenciosamente las dependencias si es necesario
       if (section.key === 'requisitos') await loadItems(requisitosSectionDef, document.createElement('div'), true);
       if (section.key === 'casos_uso') await loadItems(casosUsoSectionDef, document.createElement('div'), true);
@@ -548,131 +624,38 @@ document.addEventListener("DOMContentLoaded", async () => {
     }
   }
 
-  // 5) Exportar PDF
-  document.getElementById("exportPdf").onclick = () => {
-    if (!proj) { alert("Datos del proyecto no cargados."); return; }
-    const { jsPDF } = window.jspdf;
-    const doc = new jsPDF({ orientation: 'p', unit: 'mm', format: 'a4' });
-    let y = 20;
-    doc.setFontSize(18); 
-    doc.text(proj.nombre, doc.internal.pageSize.getWidth() / 2, y, { align: 'center' }); y += 8;
-    doc.setFontSize(11);
-    doc.text(`Descripción: ${proj.descripcion || 'N/A'}`, 14, y); y += 7;
-    doc.text(`Estado: ${proj.estado}`, 14, y); y += 12;
-    
-    sections.forEach(sec => {
-      if (!sec.items || sec.items.length === 0) return;
-      doc.setFontSize(14);
-      doc.setTextColor(0, 107, 179); 
-      doc.text(sec.title, 14, y); y += 8;
-      doc.setTextColor(0,0,0); 
-
-      const head = [sec.fields // Usar todos los fields definidos en la sección para exportar
-        .map(f => f.replace(/_/g,' ').replace(/^\w/,c=>c.toUpperCase()))
-      ];
-      const body = sec.items.map(it =>
-        sec.fields
-          .map(f => {
-            let val = it[f];
-            if (f === 'caso_uso_id' && sec.key === 'escenarios') {
-                const casoUso = casosUsoSectionDef.items.find(cu => cu.id === it.caso_uso_id);
-                val = casoUso ? casoUso.titulo : `ID: ${it.caso_uso_id}`;
-            } else if (f === 'requisito_id' && sec.key === 'casos_uso') {
-                const requisito = requisitosSectionDef.items.find(r => r.id === it.requisito_id);
-                val = requisito ? requisito.nombre : `ID: ${it.requisito_id}`;
-            } else if (f === 'requisito_padre_id' && sec.key === 'requisitos') {
-                const padre = requisitosSectionDef.items.find(r => r.id === it.requisito_padre_id);
-                val = padre ? padre.nombre : (it.requisito_padre_id ? `ID: ${it.requisito_padre_id}` : 'Ninguno');
-            } else if (f.startsWith('fecha_')) {
-                val = formatDisplayDate(val);
-            }
-            return val !== null && typeof val !== 'undefined' ? String(val) : '';
-          })
-      );
-      doc.autoTable({ 
-        startY: y, 
-        head: head, 
-        body, 
-        theme: 'grid', 
-        styles: { fontSize: 8, cellPadding: 1.5, overflow: 'linebreak' },
-        headStyles: { fillColor: [0, 107, 179], textColor: 255, fontStyle: 'bold' },
-        alternateRowStyles: { fillColor: [240, 240, 240] },
-        columnStyles: { // Ajustar ancho de columnas si es necesario, ejemplo:
-            // 0: { cellWidth: 30 }, // Primera columna
-            // 1: { cellWidth: 'auto'} 
-        }
-      });
-      y = doc.lastAutoTable.finalY + 10;
-      if (y > doc.internal.pageSize.getHeight() - 20) { // Salto de página si no hay espacio
-          doc.addPage();
-          y = 20;
-      }
-    });
-    doc.save(`${proj.nombre.replace(/\s+/g,'_') || 'proyecto'}_detalle.pdf`);
-  };
-
-  // 6) Exportar Word
-  document.getElementById("exportWord").onclick = () => {
-    if (!proj) { alert("Datos del proyecto no cargados."); return; }
-    let html = `
-      <html xmlns:o="urn:schemas-microsoft-com:office:office"
-            xmlns:w="urn:schemas-microsoft-com:office:word"
-            xmlns="http://www.w3.org/TR/REC-html40">
-      <head><meta charset="utf-8"><title>Detalle ${proj.nombre}</title>
-      <style>
-        body { font-family: Arial, sans-serif; font-size: 10pt; }
-        table { border-collapse: collapse; width: 100%; margin-bottom: 15px; page-break-inside: avoid; }
-        th, td { border: 1px solid #ccc; padding: 5px; text-align: left; word-wrap: break-word; }
-        th { background-color: #e0e0e0; font-weight: bold; }
-        h1 { color: #006bb3; font-size: 16pt;}
-        h2 { color: #004d80; font-size: 13pt; border-bottom: 1px solid #ddd; padding-bottom: 4px; margin-top: 20px;}
-        p { margin-bottom: 8px; }
-      </style>
-      </head><body>
-      <h1>${proj.nombre}</h1>
-      <p><b>Descripción:</b> ${proj.descripcion || 'N/A'}</p>
-      <p><b>Estado:</b> ${proj.estado}</p>`;
-    sections.forEach(sec => {
-      if (!sec.items || sec.items.length === 0) return;
-      html += `<h2>${sec.title}</h2><table><thead><tr>`
-        + sec.fields // Usar todos los fields definidos en la sección para exportar
-            .map(f => `<th>${f.replace(/_/g,' ').replace(/^\w/,c=>c.toUpperCase())}</th>`).join('')
-        + `</tr></thead><tbody>`;
-      sec.items.forEach(it => {
-        html += `<tr>`
-          + sec.fields
-              .map(f => {
-                let val = it[f];
-                if (f === 'caso_uso_id' && sec.key === 'escenarios') {
-                    const casoUso = casosUsoSectionDef.items.find(cu => cu.id === it.caso_uso_id);
-                    val = casoUso ? casoUso.titulo : `ID: ${it.caso_uso_id}`;
-                } else if (f === 'requisito_id' && sec.key === 'casos_uso') {
-                    const requisito = requisitosSectionDef.items.find(r => r.id === it.requisito_id);
-                    val = requisito ? requisito.nombre : `ID: ${it.requisito_id}`;
-                } else if (f === 'requisito_padre_id' && sec.key === 'requisitos') {
-                    const padre = requisitosSectionDef.items.find(r => r.id === it.requisito_padre_id);
-                    val = padre ? padre.nombre : (it.requisito_padre_id ? `ID: ${it.requisito_padre_id}` : 'Ninguno');
-                } else if (f.startsWith('fecha_')) {
-                    val = formatDisplayDate(val);
-                }
-                return `<td>${val !== null && typeof val !== 'undefined' ? String(val).replace(/</g, "&lt;").replace(/>/g, "&gt;") : ''}</td>`;
-              }).join('')
-          + `</tr>`;
-      });
-      html += `</tbody></table>`;
-    });
-    html += `</body></html>`;
-    const blob = new Blob(["\ufeff", html], { type: 'application/msword' });
+  // 5) Exportar (el documento se genera en el servidor por streaming)
+  async function descargarExportacion(formato) {
+    if (!proj || projectId === "dummyProject123") { alert("Datos del proyecto no cargados."); return; }
+    const headers = token ? { "Authorization": `Bearer ${token}` } : {};
+    let response;
+    try {
+      response = await fetch(`${baseUrl}/projects/${projectId}/export?format=${formato}`, { headers });
+    } catch (error) {
+      console.error("Fetch Error:", error);
+      alert("Error de conexión. Por favor, intente de nuevo.");
+      return;
+    }
+    if (!response.ok) {
+      alert(`Error ${response.status}: no se pudo exportar el proyecto.`);
+      return;
+    }
+    const blob = await response.blob();
     const url  = URL.createObjectURL(blob);
     const a    = document.createElement("a"); a.href = url;
-    a.download = `${proj.nombre.replace(/\s+/g,'_') || 'proyecto'}_detalle.doc`;
+    a.download = `${proj.nombre.replace(/\s+/g,'_') || 'proyecto'}_detalle.${formato}`;
     document.body.appendChild(a);
-    a.click(); 
+    a.click();
     setTimeout(() => {
         document.body.removeChild(a);
         URL.revokeObjectURL(url);
     }, 100);
-  };
+  }
+
+  document.getElementById("exportPdf").onclick = () => descargarExportacion('pdf');
+
+  // 6) Exportar Word
+  document.getElementById("exportWord").onclick = () => descargarExportacion('docx');
 
   // 7) Logout
   document.getElementById("logoutLink").addEventListener("click", e => {
@@ -31,9 +31,15 @@ document.addEventListener("DOMContentLoaded", () => {
   // Carga inicial
   async function loadProjects() {
     try {
-      const res = await authFetch(`${baseUrl}/projects/`);
-      if (!res.ok) throw new Error(res.status);
-      projects = await res.json();
+      // Seguir X-Next-Cursor hasta haber recibido todas las páginas
+      projects = [];
+      let cursor = null;
+      do {
+        const res = await authFetch(`${baseUrl}/projects/?limit=500${cursor ? `&cursor=${encodeURIComponent(cursor)}` : ""}`);
+        if (!res.ok) throw new Error(res.status);
+        projects = projects.concat(await res.json());
+        cursor = res.headers.get("X-Next-Cursor");
+      } while (cursor);
       render();
     } catch (e) {
       projectsList.innerHTML = `<p class="error">Error al cargar proyectos.</p>`;
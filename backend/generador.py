@@ -0,0 +1,153 @@
+# backend/generador.py
+# Generador de datos sintéticos a escala de producción: N usuarios con M proyectos
+# cada uno, K requisitos por proyecto organizados en árboles, casos de uso por
+# requisito, escenarios y relaciones adicionales por caso de uso, y actores por
+# proyecto. Las filas se insertan con el Importador (por lotes, con los triggers de
+# estadísticas, búsqueda y registro de cambios), en una transacción por proyecto.
+#
+# El contenido es determinista: cada proyecto usa su propio generador aleatorio
+# sembrado con (semilla, usuario, proyecto), así que la misma semilla produce los
+# mismos datos y ampliar N o M no cambia los proyectos ya generados. Todos los
+# usuarios comparten la contraseña CONTRASENA (el hash se calcula una sola vez).
+#
+# Uso: python -m backend.generador [--usuarios N] [--proyectos M] [--requisitos K]
+#          [--casos-uso C] [--escenarios E] [--relaciones R] [--actores A]
+#          [--semilla S] [--prefijo P]
+import argparse
+import random
+import time
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from .importacion import Importador
+from .models import (
+    Usuario, EstadoProyectoEnum, TipoRequisitoEnum, EstadoRequisitoEnum, CategoriaCasoUsoEnum, EstadoCasoUsoEnum,
+    TipoEscenarioEnum,
+)
+
+CONTRASENA = "sintetico123"
+# Proporción de requisitos sin padre; el resto cuelga de un requisito anterior
+PROPORCION_RAICES = 0.2
+
+PALABRAS = (
+    "usuario sistema reserva pago factura cliente pedido informe catálogo producto búsqueda filtro "
+    "notificación correo registro sesión perfil permiso rol auditoría historial exportar importar "
+    "validar confirmar cancelar modificar consultar listar aprobar rechazar calcular enviar recibir "
+    "datos tiempo real seguro rápido disponible concurrente móvil web servicio externo pasarela "
+    "inventario almacén envío devolución tarifa descuento impuesto moneda idioma accesible"
+).split()
+ACTORES = ("Cliente", "Administrador", "Operador", "Soporte", "Auditor", "Proveedor", "PasarelaPago",
+           "Notificador", "ServicioCorreo", "SistemaContable", "Almacén", "Transportista")
+
+
+def _frase(rnd, minimo, maximo):
+    return " ".join(rnd.choice(PALABRAS) for _ in range(rnd.randint(minimo, maximo))).capitalize()
+
+
+def _pasos(rnd, maximo):
+    return "\n".join(f"{n}. {_frase(rnd, 4, 10)}" for n in range(1, rnd.randint(2, maximo) + 1))
+
+
+def filas_proyecto(semilla, usuario, proyecto, prefijo, requisitos, casos_uso, escenarios, relaciones, actores):
+    # Filas (linea, fila) en el formato de importación para un proyecto
+    rnd = random.Random(f"{semilla}-{usuario}-{proyecto}")
+    linea = 0
+
+    def fila(**campos):
+        nonlocal linea
+        linea += 1
+        return linea, campos
+
+    yield fila(entidad="proyecto", nombre=f"{prefijo} {usuario}-{proyecto}", descripcion=_frase(rnd, 8, 20),
+               estado=rnd.choice(list(EstadoProyectoEnum)).name)
+    nombres_actores = rnd.sample(ACTORES, min(actores, len(ACTORES)))
+    for nombre in nombres_actores:
+        yield fila(entidad="actor", nombre=nombre, tipo=rnd.choice(("Humano", "Sistema Externo")),
+                   descripcion=_frase(rnd, 3, 8))
+    for r in range(requisitos):
+        padre = f"R{rnd.randrange(r)}" if r and rnd.random() >= PROPORCION_RAICES else None
+        yield fila(entidad="requisito", clave=f"R{r}", padre=padre, nombre=f"R{r} {_frase(rnd, 2, 5)}",
+                   descripcion=_frase(rnd, 10, 40), tipo=rnd.choice(list(TipoRequisitoEnum)).name,
+                   prioridad=rnd.randint(1, 5), estado=rnd.choice(list(EstadoRequisitoEnum)).name,
+                   fuente=rnd.choice(("Cliente", "Normativa", "Equipo", None)), version=rnd.randint(1, 4))
+    c = 0
+    for r in range(requisitos):
+        for _ in range(casos_uso):
+            yield fila(entidad="caso_uso", clave=f"C{c}", requisito=f"R{r}", titulo=f"CU{c} {_frase(rnd, 2, 6)}",
+                       descripcion=_frase(rnd, 10, 30),
+                       actores=",".join(rnd.sample(nombres_actores, min(len(nombres_actores), rnd.randint(1, 3)))),
+                       precondiciones=_frase(rnd, 4, 12), postcondiciones=_frase(rnd, 4, 12),
+                       flujo_normal=_pasos(rnd, 8), flujo_alternativo=_pasos(rnd, 3),
+                       categoria=rnd.choice(list(CategoriaCasoUsoEnum)).name,
+                       estado=rnd.choice(list(EstadoCasoUsoEnum)).name)
+            for e in range(escenarios):
+                yield fila(entidad="escenario", caso_uso=f"C{c}", nombre=f"Escenario {e + 1} de CU{c}",
+                           descripcion=_frase(rnd, 8, 20), tipo=rnd.choice(list(TipoEscenarioEnum)).name,
+                           resultado_esperado=_frase(rnd, 4, 12))
+            for _ in range(relaciones):
+                yield fila(entidad="relacion", caso_uso=f"C{c}", requisito=f"R{rnd.randrange(requisitos)}")
+            c += 1
+
+
+def generar(db: Session, usuarios=10, proyectos=5, requisitos=200, casos_uso=1, escenarios=2, relaciones=1,
+            actores=6, semilla=0, prefijo="sintetico", progreso=None):
+    from .security import hash_password
+
+    if db.scalar(select(Usuario.id).where(Usuario.username.like(f"{prefijo}%")).limit(1)) is not None:
+        raise ValueError(f"Ya hay usuarios generados con el prefijo '{prefijo}'")
+    hashed = hash_password(CONTRASENA)
+    usuario_ids = db.scalars(insert(Usuario.__table__).returning(Usuario.id), [
+        {"username": f"{prefijo}{u}", "email": f"{prefijo}{u}@example.com", "hashed_password": hashed}
+        for u in range(usuarios)
+    ]).all()
+    db.commit()
+
+    totales = {}
+    for u, usuario_id in enumerate(sorted(usuario_ids)):
+        for p in range(proyectos):
+            importador = Importador(db, usuario_id=usuario_id)
+            importador.procesar(filas_proyecto(semilla, u, p, prefijo, requisitos, casos_uso, escenarios,
+                                               relaciones, actores))
+            if importador.total_errores:
+                db.rollback()
+                raise ValueError(f"Proyecto {u}-{p}: {importador.errores[0]}")
+            db.commit()
+            for entidad, total in importador.insertados.items():
+                totales[entidad] = totales.get(entidad, 0) + total
+        if progreso is not None:
+            progreso(u + 1, usuarios)
+    totales["usuario"] = usuarios
+    return totales
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera datos sintéticos deterministas")
+    parser.add_argument("--usuarios", type=int, default=10)
+    parser.add_argument("--proyectos", type=int, default=5, help="por usuario")
+    parser.add_argument("--requisitos", type=int, default=200, help="por proyecto")
+    parser.add_argument("--casos-uso", type=int, default=1, help="por requisito")
+    parser.add_argument("--escenarios", type=int, default=2, help="por caso de uso")
+    parser.add_argument("--relaciones", type=int, default=1, help="adicionales por caso de uso")
+    parser.add_argument("--actores", type=int, default=6, help="por proyecto")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--prefijo", default="sintetico", help="de los usuarios y proyectos generados")
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal
+    from .gestion import crear_tablas
+    crear_tablas()
+    inicio = time.perf_counter()
+    with SessionLocal() as db:
+        try:
+            totales = generar(db, args.usuarios, args.proyectos, args.requisitos, args.casos_uso, args.escenarios,
+                              args.relaciones, args.actores, args.semilla, args.prefijo,
+                              progreso=lambda hechos, total: print(f"\r{hechos}/{total} usuarios", end="", flush=True))
+        except ValueError as e:
+            parser.exit(1, f"{e}\n")
+    print(f"\n{', '.join(f'{total} {entidad}' for entidad, total in totales.items())} "
+          f"en {time.perf_counter() - inicio:.1f} s (contraseña: {CONTRASENA})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# backend/gestion.py
+# Tareas de inicialización de la base de datos, separadas del arranque de la API.
+#
+# Uso: python -m backend.gestion crear-tablas | datos-mock | iniciar | reindexar-busqueda
+#                                  | reconciliar-estadisticas
+# (en producción el esquema se gestiona con `alembic upgrade head`)
+import argparse
+
+from .database import Base, engine, SessionLocal
+
+
+def crear_tablas():
+    from . import models  # noqa: F401  (registra las tablas en Base.metadata)
+    Base.metadata.create_all(bind=engine)
+
+
+def cargar_datos_mock():
+    # Inserta datos de prueba (mock) solo si la base de datos está vacía
+    from .mock_data import insertar_datos_mock
+    with SessionLocal() as db:
+        insertar_datos_mock(db)
+
+
+def reindexar_busqueda():
+    # Crea el índice de búsqueda si falta y vuelve a indexar los datos existentes
+    from . import busqueda
+    with engine.begin() as conexion:
+        busqueda.crear_indice(conexion)
+        busqueda.reconstruir(conexion)
+
+
+def reconciliar_estadisticas():
+    # Corrige los contadores del dashboard que no coincidan con las tablas
+    from . import estadisticas
+    with engine.begin() as conexion:
+        estadisticas.crear_triggers(conexion)
+        diferencias = estadisticas.reconciliar(conexion)
+    for proyecto_id, dimension, valor, guardado, real in diferencias:
+        print(f"proyecto {proyecto_id} {dimension}={valor}: {guardado} -> {real}")
+    print(f"{len(diferencias)} contador(es) corregido(s)")
+
+
+TAREAS = {
+    "crear-tablas": [crear_tablas],
+    "datos-mock": [cargar_datos_mock],
+    "iniciar": [crear_tablas, cargar_datos_mock],
+    "reindexar-busqueda": [reindexar_busqueda],
+    "reconciliar-estadisticas": [reconciliar_estadisticas],
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inicialización de la base de datos")
+    parser.add_argument("tarea", choices=TAREAS)
+    args = parser.parse_args(argv)
+    for tarea in TAREAS[args.tarea]:
+        tarea()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,341 @@
+# backend/importacion.py
+# Importación masiva de requisitos, casos de uso y escenarios desde NDJSON o CSV.
+# Cada fila indica su `entidad` y puede llevar una `clave` propia del cliente; las
+# referencias (padre, requisito, caso_uso) se resuelven por esas claves o por el id
+# de una fila que ya exista en el proyecto. Las filas se insertan por lotes con
+# executemany (INSERT ... RETURNING id) dentro de una única transacción.
+#
+# Las referencias se resuelven al insertar el lote (las entidades de las que depende
+# se insertan antes). Un requisito puede referenciar a un padre que aparece más
+# adelante: se inserta sin padre y se enlaza después con un UPDATE por lotes. El resto
+# de referencias deben apuntar a filas anteriores.
+#
+# Los actores de cada caso de uso (texto separado por comas) se vinculan al insertar
+# su lote (actores.sincronizar); las filas `actor` previas permiten fijar su tipo y
+# descripción, y los que no aparezcan se crean en el proyecto con los valores por defecto.
+#
+# En la importación de un espacio de trabajo completo (el volcado de volcado.py) las
+# filas `proyecto` crean un proyecto nuevo y las filas siguientes se asignan a él.
+import csv
+import json
+
+from sqlalchemy import bindparam, insert, select, update
+from sqlalchemy.orm import Session
+
+from .actores import TIPO_POR_DEFECTO, sincronizar
+from .jerarquia import consulta_padre
+from .models import (
+    Proyecto, Requisito, CasoUso, Escenario, RelacionRequisito, Actor,
+    EstadoProyectoEnum, TipoRequisitoEnum, EstadoRequisitoEnum, CategoriaCasoUsoEnum, EstadoCasoUsoEnum, TipoEscenarioEnum,
+)
+
+TAM_LOTE = 1000
+MAX_ERRORES = 1000
+
+MODELOS = {"actor": Actor, "requisito": Requisito, "caso_uso": CasoUso, "escenario": Escenario,
+           "relacion": RelacionRequisito}
+# Entidades que deben estar insertadas antes de insertar un lote de cada tipo
+DEPENDENCIAS = {
+    "actor": (),
+    "requisito": (),
+    "caso_uso": ("requisito", "actor"),
+    "escenario": ("requisito", "caso_uso"),
+    "relacion": ("requisito", "caso_uso"),
+}
+# Columna de clave ajena -> entidad referenciada
+REFERENCIAS = {"requisito_padre_id": "requisito", "requisito_id": "requisito", "caso_uso_id": "caso_uso"}
+
+
+class ErrorFila(ValueError):
+    pass
+
+
+class _Pendiente:
+    # Referencia a una clave cuyo id se conocerá al insertar su lote
+    __slots__ = ("clave",)
+
+    def __init__(self, clave):
+        self.clave = clave
+
+
+# --- Lectura ---
+def leer_ndjson(fichero):
+    for linea, texto in enumerate(fichero, start=1):
+        if not texto.strip():
+            continue
+        try:
+            fila = json.loads(texto)
+        except ValueError as e:
+            yield linea, ErrorFila(f"JSON inválido: {e}")
+            continue
+        yield linea, fila if isinstance(fila, dict) else ErrorFila("Cada línea debe ser un objeto JSON")
+
+
+def leer_csv(fichero):
+    lector = csv.DictReader(fichero)
+    for fila in lector:
+        # Las celdas vacías equivalen a campos ausentes
+        yield lector.line_num, {k: v for k, v in fila.items() if k and v not in (None, "")}
+
+
+# --- Validación de campos ---
+def _texto(fila, campo, obligatorio=False):
+    valor = fila.get(campo)
+    if valor is None or (obligatorio and valor == ""):
+        if obligatorio:
+            raise ErrorFila(f"Falta el campo obligatorio '{campo}'")
+        return None
+    return str(valor)
+
+
+def _entero(fila, campo, por_defecto=None):
+    valor = fila.get(campo)
+    if valor is None or valor == "":
+        return por_defecto
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        raise ErrorFila(f"'{campo}' debe ser un entero")
+
+
+def _enum(enum_cls, fila, campo, por_defecto=None):
+    # Acepta tanto el nombre ('EN_DESARROLLO') como el valor ('En Desarrollo')
+    valor = fila.get(campo)
+    if valor is None or valor == "":
+        if por_defecto is None:
+            raise ErrorFila(f"Falta el campo obligatorio '{campo}'")
+        return por_defecto
+    for miembro in enum_cls:
+        if valor in (miembro.name, miembro.value):
+            return miembro
+    raise ErrorFila(f"Valor no válido para '{campo}': {valor}")
+
+
+class Importador:
+    # usuario_id solo se indica en la importación de un espacio de trabajo completo
+    def __init__(self, db: Session, proyecto_id=None, usuario_id=None):
+        self.db = db
+        self.proyecto_id = proyecto_id
+        self.usuario_id = usuario_id
+        self.claves = {"requisito": {}, "caso_uso": {}}         # clave del cliente -> id
+        self.claves_pendientes = {"requisito": set(), "caso_uso": set()}
+        self.pendientes = {entidad: [] for entidad in MODELOS}  # [(linea, clave, valores)]
+        self.insertados = dict.fromkeys(("proyecto", *MODELOS), 0)
+        self.errores = []
+        self.total_errores = 0
+        self._existentes = {}
+        self._padres_diferidos = []  # (linea, proyecto_id, id del requisito, clave del padre)
+        self._nombres_actores = {}   # proyecto_id -> nombres de actores ya existentes o en cola
+
+    def procesar(self, filas):
+        for linea, fila in filas:
+            try:
+                if isinstance(fila, ErrorFila):
+                    raise fila
+                self._agregar(linea, fila)
+            except ErrorFila as e:
+                self._error(linea, fila.get("clave") if isinstance(fila, dict) else None, e)
+        for entidad in MODELOS:
+            self._insertar_lote(entidad)
+        self._enlazar_padres_diferidos()
+
+    def resumen(self):
+        return {"insertados": self.insertados, "total_errores": self.total_errores, "errores": self.errores}
+
+    def _error(self, linea, clave, error):
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES:
+            self.errores.append({"linea": linea, "clave": clave, "error": str(error)})
+
+    def _agregar(self, linea, fila):
+        entidad = fila.get("entidad")
+        if entidad == "proyecto" and self.usuario_id is not None:
+            self._crear_proyecto(fila)
+            return
+        if entidad not in MODELOS:
+            raise ErrorFila(f"'entidad' debe ser uno de: {', '.join(MODELOS)}")
+        if self.proyecto_id is None:
+            raise ErrorFila("La fila no pertenece a ningún proyecto importado")
+        clave = _texto(fila, "clave") or None
+        if clave is not None and entidad in self.claves and (
+                clave in self.claves[entidad] or clave in self.claves_pendientes[entidad]):
+            raise ErrorFila(f"Clave duplicada: {clave}")
+
+        valores = getattr(self, f"_valores_{entidad}")(fila)
+        self.pendientes[entidad].append((linea, clave, valores))
+        if clave is not None and entidad in self.claves_pendientes:
+            self.claves_pendientes[entidad].add(clave)
+        if len(self.pendientes[entidad]) >= TAM_LOTE:
+            self._insertar_lote(entidad)
+
+    def _crear_proyecto(self, fila):
+        # Las filas siguientes no se importan si el proyecto falla
+        self.proyecto_id = None
+        nombre = _texto(fila, "nombre", obligatorio=True)
+        estado = _enum(EstadoProyectoEnum, fila, "estado", EstadoProyectoEnum.ACTIVO)
+        if self.db.scalar(select(Proyecto.id).where(Proyecto.nombre == nombre)) is not None:
+            raise ErrorFila(f"Ya existe un proyecto con el nombre '{nombre}'")
+        self.proyecto_id = self.db.scalar(insert(Proyecto.__table__).returning(Proyecto.id), {
+            "nombre": nombre,
+            "descripcion": _texto(fila, "descripcion"),
+            "estado": estado,
+            "usuario_id": self.usuario_id,
+        })
+        self.insertados["proyecto"] += 1
+
+    def _valores_actor(self, fila):
+        nombre = _texto(fila, "nombre", obligatorio=True)
+        if self.proyecto_id not in self._nombres_actores:
+            self._nombres_actores[self.proyecto_id] = set(self.db.scalars(
+                select(Actor.nombre).where(Actor.proyecto_id == self.proyecto_id)
+            ))
+        if nombre in self._nombres_actores[self.proyecto_id]:
+            raise ErrorFila(f"Ya existe un actor con el nombre '{nombre}' en el proyecto")
+        self._nombres_actores[self.proyecto_id].add(nombre)
+        return {
+            "nombre": nombre,
+            "tipo": _texto(fila, "tipo") or TIPO_POR_DEFECTO,
+            "descripcion": _texto(fila, "descripcion"),
+            "proyecto_id": self.proyecto_id,
+        }
+
+    def _valores_requisito(self, fila):
+        return {
+            "nombre": _texto(fila, "nombre", obligatorio=True),
+            "descripcion": _texto(fila, "descripcion", obligatorio=True),
+            "tipo": _enum(TipoRequisitoEnum, fila, "tipo"),
+            "prioridad": _entero(fila, "prioridad", 1),
+            "fuente": _texto(fila, "fuente"),
+            "observaciones": _texto(fila, "observaciones"),
+            "estado": _enum(EstadoRequisitoEnum, fila, "estado", EstadoRequisitoEnum.PROPUESTO),
+            "version": _entero(fila, "version", 1),
+            "requisito_padre_id": self._referencia("requisito", fila, "padre", "requisito_padre_id", adelantada=True),
+            "proyecto_id": self.proyecto_id,
+        }
+
+    def _valores_caso_uso(self, fila):
+        return {
+            "titulo": _texto(fila, "titulo", obligatorio=True),
+            "descripcion": _texto(fila, "descripcion"),
+            "actores": _texto(fila, "actores"),
+            "precondiciones": _texto(fila, "precondiciones"),
+            "postcondiciones": _texto(fila, "postcondiciones"),
+            "flujo_normal": _texto(fila, "flujo_normal"),
+            "flujo_alternativo": _texto(fila, "flujo_alternativo"),
+            "categoria": _enum(CategoriaCasoUsoEnum, fila, "categoria"),
+            "estado": _enum(EstadoCasoUsoEnum, fila, "estado", EstadoCasoUsoEnum.PROPUESTO),
+            "requisito_id": self._referencia("requisito", fila, "requisito", "requisito_id"),
+            "proyecto_id": self.proyecto_id,
+        }
+
+    def _valores_escenario(self, fila):
+        caso_uso_id = self._referencia("caso_uso", fila, "caso_uso", "caso_uso_id")
+        if caso_uso_id is None:
+            raise ErrorFila("El escenario necesita 'caso_uso' o 'caso_uso_id'")
+        return {
+            "nombre": _texto(fila, "nombre", obligatorio=True),
+            "descripcion": _texto(fila, "descripcion"),
+            "tipo": _enum(TipoEscenarioEnum, fila, "tipo"),
+            "resultado_esperado": _texto(fila, "resultado_esperado"),
+            "caso_uso_id": caso_uso_id,
+        }
+
+    def _valores_relacion(self, fila):
+        requisito_id = self._referencia("requisito", fila, "requisito", "requisito_id")
+        caso_uso_id = self._referencia("caso_uso", fila, "caso_uso", "caso_uso_id")
+        if requisito_id is None or caso_uso_id is None:
+            raise ErrorFila("La relación necesita un requisito y un caso de uso")
+        return {"requisito_id": requisito_id, "caso_uso_id": caso_uso_id}
+
+    def _referencia(self, entidad, fila, campo_clave, campo_id, adelantada=False):
+        clave = _texto(fila, campo_clave) or None
+        if clave is not None:
+            if clave in self.claves[entidad]:
+                return self.claves[entidad][clave]
+            if adelantada or clave in self.claves_pendientes[entidad]:
+                return _Pendiente(clave)
+            raise ErrorFila(f"'{campo_clave}' hace referencia a una clave desconocida: {clave}")
+        id_existente = _entero(fila, campo_id)
+        if id_existente is not None and id_existente not in self._ids_existentes(entidad):
+            raise ErrorFila(f"'{campo_id}' no existe en el proyecto: {id_existente}")
+        return id_existente
+
+    def _ids_existentes(self, entidad):
+        if (entidad, self.proyecto_id) not in self._existentes:
+            modelo = MODELOS[entidad]
+            self._existentes[entidad, self.proyecto_id] = set(self.db.scalars(
+                select(modelo.id).where(modelo.proyecto_id == self.proyecto_id)
+            ))
+        return self._existentes[entidad, self.proyecto_id]
+
+    def _insertar_lote(self, entidad):
+        lote = self.pendientes[entidad]
+        if not lote:
+            return
+        for dependencia in DEPENDENCIAS[entidad]:
+            self._insertar_lote(dependencia)
+        padres = []  # (posición en el lote, clave del padre) de requisitos aún sin id
+        for posicion, (_, _, valores) in enumerate(lote):
+            for campo, valor in valores.items():
+                if isinstance(valor, _Pendiente):
+                    referenciada = REFERENCIAS[campo]
+                    if referenciada == entidad:
+                        padres.append((posicion, valor.clave))
+                        valores[campo] = None
+                    else:
+                        valores[campo] = self.claves[referenciada][valor.clave]
+
+        tabla = MODELOS[entidad].__table__
+        # Con sort_by_parameter_order SQLAlchemy inserta fila a fila en SQLite. Sin él se
+        # usa un INSERT multi-VALUES; como el id (rowid) se asigna creciente en el orden
+        # de VALUES, ordenar los ids devueltos los alinea con las filas del lote.
+        ids = sorted(self.db.scalars(
+            insert(tabla).returning(tabla.c.id),
+            [valores for _, _, valores in lote],
+        ).all())
+        if entidad in self.claves:
+            for (_, clave, _), nuevo_id in zip(lote, ids):
+                if clave is not None:
+                    self.claves[entidad][clave] = nuevo_id
+            self.claves_pendientes[entidad].clear()
+        if entidad == "caso_uso":
+            sincronizar(self.db, ids)
+            # sincronizar puede haber creado actores nuevos en los proyectos
+            self._nombres_actores.clear()
+        self._padres_diferidos += [(lote[posicion][0], lote[posicion][2]["proyecto_id"], ids[posicion], clave)
+                                   for posicion, clave in padres]
+        if len(self._padres_diferidos) >= TAM_LOTE:
+            self._enlazar_padres_diferidos(solo_conocidos=True)
+        self.insertados[entidad] += len(lote)
+        lote.clear()
+
+    def _enlazar_padres_diferidos(self, solo_conocidos=False):
+        # Un ciclo siempre incluye algún enlace hacia un id mayor (padre insertado después
+        # que el hijo). Los enlaces hacia ids menores se aplican juntos y los demás uno a
+        # uno comprobando antes que no cierran un ciclo.
+        hacia_atras, hacia_delante, restantes = [], [], []
+        for linea, proyecto_id, requisito_id, clave in self._padres_diferidos:
+            if clave in self.claves["requisito"]:
+                padre_id = self.claves["requisito"][clave]
+                if padre_id < requisito_id:
+                    hacia_atras.append({"_id": requisito_id, "_padre": padre_id})
+                else:
+                    hacia_delante.append((linea, proyecto_id, requisito_id, padre_id))
+            elif solo_conocidos:
+                restantes.append((linea, proyecto_id, requisito_id, clave))
+            else:
+                self._error(linea, None, ErrorFila(f"'padre' hace referencia a una clave desconocida: {clave}"
+                                                   " (el requisito se importó sin padre)"))
+        self._padres_diferidos = restantes
+
+        tabla = Requisito.__table__
+        enlazar = update(tabla).where(tabla.c.id == bindparam("_id")).values(requisito_padre_id=bindparam("_padre"))
+        if hacia_atras:
+            self.db.execute(enlazar, hacia_atras)
+        for linea, proyecto_id, requisito_id, padre_id in hacia_delante:
+            encontrados, ciclo = self.db.execute(consulta_padre(proyecto_id, requisito_id, padre_id)).one()
+            if not encontrados or ciclo:
+                motivo = "crearía un ciclo" if ciclo else "no existe en el proyecto"
+                self._error(linea, None, ErrorFila(f"El requisito padre {motivo} (el requisito se importó sin padre)"))
+                continue
+            self.db.execute(enlazar, [{"_id": requisito_id, "_padre": padre_id}])
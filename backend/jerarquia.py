@@ -0,0 +1,64 @@
+# backend/jerarquia.py
+# Consultas sobre el árbol de requisitos (requisito_padre_id) con WITH RECURSIVE:
+# un único round trip para una rama entera, apoyado en ix_requisitos_requisito_padre_id.
+# Las funciones devuelven sentencias select() para usarlas con Session o AsyncSession.
+from sqlalchemy import case, func, literal, select
+from sqlalchemy.orm import aliased
+
+from .models import Requisito
+
+# Tope de niveles: acota el recorrido aunque queden ciclos de datos anteriores
+PROFUNDIDAD_MAXIMA = 10000
+
+
+def _recorrido(proyecto_id: int, requisito_id: int, profundidad_max: int, hacia_arriba: bool):
+    base = select(Requisito.id, Requisito.requisito_padre_id, literal(0).label("profundidad")).where(
+        Requisito.id == requisito_id, Requisito.proyecto_id == proyecto_id
+    )
+    arbol = base.cte("arbol", recursive=True)
+    siguiente = aliased(Requisito)
+    enlace = siguiente.id == arbol.c.requisito_padre_id if hacia_arriba else siguiente.requisito_padre_id == arbol.c.id
+    arbol = arbol.union_all(
+        select(siguiente.id, siguiente.requisito_padre_id, arbol.c.profundidad + 1)
+        .join(arbol, enlace)
+        .where(siguiente.proyecto_id == proyecto_id,
+               arbol.c.profundidad < min(profundidad_max, PROFUNDIDAD_MAXIMA))
+    )
+    # Con datos cíclicos un nodo puede repetirse: se queda el nivel más cercano
+    return (select(arbol.c.id, func.min(arbol.c.profundidad).label("profundidad"))
+            .group_by(arbol.c.id).subquery("niveles"))
+
+
+def consulta_subarbol(proyecto_id: int, requisito_id: int, profundidad_max: int = PROFUNDIDAD_MAXIMA):
+    # El propio requisito (profundidad 0) y todos sus descendientes
+    niveles = _recorrido(proyecto_id, requisito_id, profundidad_max, hacia_arriba=False)
+    return (select(Requisito, niveles.c.profundidad).join(niveles, Requisito.id == niveles.c.id)
+            .order_by(niveles.c.profundidad, Requisito.id))
+
+
+def consulta_ancestros(proyecto_id: int, requisito_id: int, profundidad_max: int = PROFUNDIDAD_MAXIMA):
+    # Del padre (profundidad 1) a la raíz
+    niveles = _recorrido(proyecto_id, requisito_id, profundidad_max, hacia_arriba=True)
+    return (select(Requisito, niveles.c.profundidad).join(niveles, Requisito.id == niveles.c.id)
+            .where(niveles.c.profundidad > 0).order_by(niveles.c.profundidad))
+
+
+def ids_subarbol(proyecto_id: int, requisito_id: int):
+    niveles = _recorrido(proyecto_id, requisito_id, PROFUNDIDAD_MAXIMA, hacia_arriba=False)
+    return select(niveles.c.id)
+
+
+def consulta_padre(proyecto_id: int, requisito_id, padre_id: int):
+    # (nº de ancestros del padre incluido él mismo, 1 si el requisito está entre ellos).
+    # 0 filas = el padre no existe en el proyecto; 1 en la segunda columna = ciclo.
+    niveles = _recorrido(proyecto_id, padre_id, PROFUNDIDAD_MAXIMA, hacia_arriba=True)
+    return select(func.count(), func.coalesce(func.max(case((niveles.c.id == requisito_id, 1), else_=0)), 0))
+
+
+def aplicar_profundidad(filas):
+    # Copia la profundidad en cada requisito para serializarlo con RequisitoNodoResponse
+    requisitos = []
+    for requisito, profundidad in filas:
+        requisito.profundidad = profundidad
+        requisitos.append(requisito)
+    return requisitos
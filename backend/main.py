@@ -1,39 +1,103 @@
 # backend/main.py
-from fastapi import FastAPI
-from .database import Base, engine , SessionLocal
-from . import models
-from .auth import router as auth_router
-from .crud import router as crud_router
-from .routers import proyectos, requisitos, casos_uso, actores,escenarios,relaciones
-from .mock_data import insertar_datos_mock
+import os
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from .database import DB_ASYNC
+
+# Inicialización opcional al arrancar (por defecto no se toca la base de datos):
+# DB_CREAR_TABLAS=1 ejecuta create_all y DB_DATOS_MOCK=1 inserta los datos de prueba.
+# Con varios workers es preferible hacerlo antes con `python -m backend.gestion iniciar`.
+CREAR_TABLAS = os.getenv("DB_CREAR_TABLAS", "0") == "1"
+DATOS_MOCK = os.getenv("DB_DATOS_MOCK", "0") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if CREAR_TABLAS or DATOS_MOCK:
+        from . import gestion
+        if CREAR_TABLAS:
+            gestion.crear_tablas()
+        if DATOS_MOCK:
+            gestion.cargar_datos_mock()
+    # Retoma las purgas que quedaron a medias en una ejecución anterior
+    from .purga import purgador
+    purgador.avisar()
+    yield
+    from .contrasenas import pool
+    pool.cerrar()
+
+
+def create_app() -> FastAPI:
+    from .auth import router as auth_router
+    from .compresion import Compresion
+    from .condicional import peticion_condicional, peticion_condicional_async
+    from . import metricas
+    from .routers import (proyectos, requisitos, casos_uso, actores, escenarios, relaciones, exportacion, importacion,
+                          busqueda, trazabilidad, estadisticas, cambios, eventos)
+    if DB_ASYNC:
+        # Modo asíncrono opcional: las rutas CRUD principales usan AsyncSession (aiosqlite)
+        from .routers_async import proyectos, requisitos, casos_uso, escenarios
+
+    app = FastAPI(title="API TFG", lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=["X-Next-Cursor", "ETag", "Last-Modified"],
+    )
+    app.add_middleware(Compresion)
+    if metricas.ACTIVAS:
+        # El último middleware añadido es el más externo: la latencia incluye la compresión
+        from .database import engine, async_engine
+        metricas.metricas.instrumentar(engine, "sync")
+        if async_engine is not None:
+            metricas.metricas.instrumentar(async_engine.sync_engine, "async")
+        metricas.metricas.instrumentar_sesiones()
+        app.add_middleware(metricas.MiddlewareMetricas)
+
+        @app.get("/metrics", include_in_schema=False)
+        async def exportar_metricas():
+            return PlainTextResponse(metricas.metricas.texto(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    app.include_router(auth_router, prefix="/auth", tags=["auth"])
+
+    # Las lecturas admiten GET condicional (ETag / Last-Modified); exportación, importación
+    # y eventos tienen su propio tratamiento
+    condicional = [Depends(peticion_condicional)]
+    # Los routers de routers_async validan con su AsyncSession
+    condicional_crud = [Depends(peticion_condicional_async)] if DB_ASYNC else condicional
+
+    # Rutas CRUD
+    app.include_router(proyectos.router, prefix="/projects", dependencies=condicional_crud, tags=["Proyectos"])
+    app.include_router(requisitos.router, prefix="/projects", dependencies=condicional_crud, tags=["Requisitos"])
+    app.include_router(casos_uso.router, prefix="/projects", dependencies=condicional_crud, tags=["Casos de Uso"])
+    app.include_router(actores.router, prefix="/actores", dependencies=condicional, tags=["Actores"])
+    app.include_router(actores.casos_uso_router, prefix="/casos_uso", dependencies=condicional, tags=["Actores"])
+    app.include_router(escenarios.router, prefix="/escenarios", dependencies=condicional_crud, tags=["Escenarios"])
+    app.include_router(escenarios.proyectos_router, prefix="/projects", dependencies=condicional_crud, tags=["Escenarios"])
+    app.include_router(relaciones.router, prefix="/relaciones", dependencies=condicional, tags=["Relaciones"])
+    app.include_router(exportacion.router, prefix="/projects", tags=["Exportación"])
+    app.include_router(importacion.router, prefix="/projects", tags=["Importación"])
+    app.include_router(exportacion.espacio_router, prefix="/export", tags=["Exportación"])
+    app.include_router(importacion.espacio_router, prefix="/import", tags=["Importación"])
+    app.include_router(busqueda.router, prefix="/projects", dependencies=condicional, tags=["Búsqueda"])
+    app.include_router(trazabilidad.router, prefix="/projects", dependencies=condicional, tags=["Trazabilidad"])
+    app.include_router(estadisticas.router, prefix="/projects", dependencies=condicional, tags=["Estadísticas"])
+    app.include_router(cambios.router, prefix="/projects", dependencies=condicional, tags=["Cambios"])
+    app.include_router(eventos.router, prefix="/projects", tags=["Eventos"])
+    app.include_router(busqueda.espacio_router, prefix="/search", dependencies=condicional, tags=["Búsqueda"])
+    app.include_router(estadisticas.espacio_router, prefix="/stats", dependencies=condicional, tags=["Estadísticas"])
+
+    @app.get("/")
+    def read_root():
+        return {"message": "Bienvenido a la API de gestión de proyectos"}
+
+    return app
+
 
-# Crear las tablas en la base de datos
-Base.metadata.create_all(bind=engine)
-# Insertar datos de prueba (mock) solo si la base de datos está vacía
-with SessionLocal() as db:
-    insertar_datos_mock(db)
-
-app = FastAPI(title="API TFG")
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],          
-    allow_credentials=True,
-    allow_methods=["*"],          
-    allow_headers=["*"],
-)
-
-
-app.include_router(auth_router, prefix="/auth", tags=["auth"])
-
-# Rutas CRUD
-app.include_router(proyectos.router, prefix="/projects", tags=["Proyectos"])
-app.include_router(requisitos.router, prefix="/projects", tags=["Requisitos"])
-app.include_router(casos_uso.router, prefix="/projects", tags=["Casos de Uso"])
-app.include_router(actores.router, prefix="/actores", tags=["Actores"])
-app.include_router(escenarios.router, prefix="/escenarios", tags=["Escenarios"])
-app.include_router(relaciones.router, prefix="/relaciones", tags=["Relaciones"])
-
-@app.get("/")
-def read_root():
-    return {"message": "Bienvenido a la API de gestión de proyectos"}
+app = create_app()
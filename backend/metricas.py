@@ -0,0 +1,284 @@
+# backend/metricas.py
+# Métricas del proceso en formato de texto de Prometheus (GET /metrics):
+#   - por ruta (la plantilla, p. ej. /projects/{project_id}/requisitos, no la URL):
+#     peticiones por código de estado, histograma de latencia y, por petición,
+#     histogramas del número de sentencias SQL y del tiempo pasado en ellas,
+#   - del motor: sentencias y tiempo totales (también las de la purga en segundo
+#     plano), conexiones prestadas por el pool y sesiones con una transacción abierta,
+#   - suscripciones a eventos en vivo y hashes de contraseñas en curso.
+#
+# Está pensado para dejarlo activo (METRICAS=0 lo desactiva): el middleware es ASGI
+# puro y cada petición o sentencia solo suma en contadores en memoria; el texto se
+# genera al pedir /metrics. Las sentencias se atribuyen a la petición en curso con
+# una contextvar, que el threadpool y las sesiones asíncronas heredan. Cada worker
+# lleva sus propias cuentas.
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+ACTIVAS = os.getenv("METRICAS", "1") == "1"
+
+BUCKETS_SEGUNDOS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_SENTENCIAS = (0, 1, 2, 5, 10, 25, 50, 100, 250, 1000)
+# Respuestas que son conexiones largas: su duración no es latencia
+SIN_LATENCIA = (b"text/event-stream",)
+SIN_RUTA = "sin_ruta"
+
+
+class _SqlPeticion:
+    __slots__ = ("sentencias", "segundos")
+
+    def __init__(self):
+        self.sentencias = 0
+        self.segundos = 0.0
+
+
+_peticion: ContextVar = ContextVar("metricas_peticion", default=None)
+
+
+class Histograma:
+    __slots__ = ("limites", "cuentas", "suma", "total")
+
+    def __init__(self, limites):
+        self.limites = limites
+        self.cuentas = [0] * len(limites)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        # Se guarda el bucket exacto y se acumula al exportar
+        i = bisect_left(self.limites, valor)
+        if i < len(self.cuentas):
+            self.cuentas[i] += 1
+        self.suma += valor
+        self.total += 1
+
+    def lineas(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, cuenta in zip(self.limites, self.cuentas):
+            acumulado += cuenta
+            yield f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}'
+        yield f'{nombre}_bucket{{{etiquetas},le="+Inf"}} {self.total}'
+        yield f"{nombre}_sum{{{etiquetas}}} {self.suma}"
+        yield f"{nombre}_count{{{etiquetas}}} {self.total}"
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metricas:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._peticiones = {}    # (metodo, ruta, estado) -> nº
+        self._por_ruta = {}      # (metodo, ruta) -> (latencia, sentencias, tiempo sql)
+        self._en_curso = 0
+        self._sentencias = 0
+        self._segundos_sql = 0.0
+        self._errores_sql = 0
+        self._prestadas = {}     # motor -> conexiones prestadas
+        self._conexiones = {}    # motor -> conexiones abiertas en total
+        self._motores = {}       # motor -> Engine
+        self._transacciones = 0
+        self._sesiones = False
+
+    # --- Peticiones ---
+    def empezar(self):
+        with self._lock:
+            self._en_curso += 1
+
+    def terminar(self, metodo, ruta, estado, segundos, sentencias_sql=0, segundos_sql=0.0):
+        clave = (metodo, ruta)
+        with self._lock:
+            self._en_curso -= 1
+            self._peticiones[clave + (estado,)] = self._peticiones.get(clave + (estado,), 0) + 1
+            if segundos is None:
+                return
+            if clave not in self._por_ruta:
+                self._por_ruta[clave] = (Histograma(BUCKETS_SEGUNDOS), Histograma(BUCKETS_SENTENCIAS),
+                                         Histograma(BUCKETS_SEGUNDOS))
+            latencia, sentencias, tiempo_sql = self._por_ruta[clave]
+            latencia.observar(segundos)
+            sentencias.observar(sentencias_sql)
+            tiempo_sql.observar(segundos_sql)
+
+    # --- Motor de SQLAlchemy ---
+    def instrumentar(self, engine, nombre: str):
+        if nombre in self._motores:
+            return
+        self._motores[nombre] = engine
+        self._prestadas[nombre] = 0
+        self._conexiones[nombre] = 0
+        event.listen(engine, "before_cursor_execute", self._antes_sentencia)
+        event.listen(engine, "after_cursor_execute", self._tras_sentencia)
+        event.listen(engine, "handle_error", self._error_sentencia)
+        event.listen(engine, "connect", lambda *a: self._contar(self._conexiones, nombre, 1))
+        event.listen(engine, "close", lambda *a: self._contar(self._conexiones, nombre, -1))
+        event.listen(engine, "checkout", lambda *a: self._contar(self._prestadas, nombre, 1))
+        event.listen(engine, "checkin", lambda *a: self._contar(self._prestadas, nombre, -1))
+
+    def instrumentar_sesiones(self):
+        if self._sesiones:
+            return
+        self._sesiones = True
+        event.listen(Session, "after_transaction_create", self._transaccion_creada)
+        event.listen(Session, "after_transaction_end", self._transaccion_terminada)
+
+    def _contar(self, contador, nombre, delta):
+        with self._lock:
+            contador[nombre] += delta
+
+    @staticmethod
+    def _antes_sentencia(conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._metricas_inicio = time.perf_counter()
+
+    def _tras_sentencia(self, conn, cursor, statement, parameters, context, executemany):
+        inicio = getattr(context, "_metricas_inicio", None)
+        if inicio is None:
+            return
+        segundos = time.perf_counter() - inicio
+        with self._lock:
+            self._sentencias += 1
+            self._segundos_sql += segundos
+        sql = _peticion.get()
+        if sql is not None:
+            sql.sentencias += 1
+            sql.segundos += segundos
+
+    def _error_sentencia(self, contexto):
+        with self._lock:
+            self._errores_sql += 1
+
+    def _transaccion_creada(self, session, transaccion):
+        if transaccion.parent is None:
+            self._contar_transaccion(1)
+
+    def _transaccion_terminada(self, session, transaccion):
+        if transaccion.parent is None:
+            self._contar_transaccion(-1)
+
+    def _contar_transaccion(self, delta):
+        with self._lock:
+            self._transacciones += delta
+
+    # --- Exportación ---
+    def texto(self) -> str:
+        from .contrasenas import pool
+        from .eventos import broker
+
+        with self._lock:
+            peticiones = dict(self._peticiones)
+            por_ruta = {clave: tuple(_copiar(h) for h in hs) for clave, hs in self._por_ruta.items()}
+            en_curso, sentencias, segundos_sql = self._en_curso, self._sentencias, self._segundos_sql
+            errores_sql, transacciones = self._errores_sql, self._transacciones
+            prestadas, conexiones = dict(self._prestadas), dict(self._conexiones)
+
+        lineas = []
+
+        def metrica(nombre, tipo, ayuda, muestras):
+            lineas.append(f"# HELP {nombre} {ayuda}")
+            lineas.append(f"# TYPE {nombre} {tipo}")
+            lineas.extend(muestras)
+
+        def etiquetas_ruta(metodo, ruta):
+            return f'method="{metodo}",route="{_escapar(ruta)}"'
+
+        metrica("http_requests_total", "counter", "Peticiones atendidas por ruta y código de estado.",
+                [f'http_requests_total{{{etiquetas_ruta(m, r)},status="{e}"}} {n}'
+                 for (m, r, e), n in sorted(peticiones.items())])
+        metrica("http_requests_in_progress", "gauge", "Peticiones en curso.",
+                [f"http_requests_in_progress {en_curso}"])
+        for indice, nombre, ayuda in (
+                (0, "http_request_duration_seconds", "Latencia de las peticiones por ruta."),
+                (1, "http_request_sql_statements", "Sentencias SQL ejecutadas por petición."),
+                (2, "http_request_sql_duration_seconds", "Tiempo en sentencias SQL por petición.")):
+            metrica(nombre, "histogram", ayuda,
+                    [linea for (m, r), hs in sorted(por_ruta.items())
+                     for linea in hs[indice].lineas(nombre, etiquetas_ruta(m, r))])
+        metrica("db_statements_total", "counter", "Sentencias SQL ejecutadas por el proceso.",
+                [f"db_statements_total {sentencias}"])
+        metrica("db_statement_duration_seconds_total", "counter", "Tiempo total en sentencias SQL.",
+                [f"db_statement_duration_seconds_total {segundos_sql}"])
+        metrica("db_statement_errors_total", "counter", "Sentencias SQL que fallaron.",
+                [f"db_statement_errors_total {errores_sql}"])
+        metrica("db_pool_connections_checked_out", "gauge", "Conexiones prestadas por el pool.",
+                [f'db_pool_connections_checked_out{{engine="{n}"}} {v}' for n, v in sorted(prestadas.items())])
+        metrica("db_pool_connections_open", "gauge", "Conexiones a la base de datos abiertas.",
+                [f'db_pool_connections_open{{engine="{n}"}} {v}' for n, v in sorted(conexiones.items())])
+        metrica("db_pool_size", "gauge", "Conexiones que el pool mantiene abiertas.",
+                [f'db_pool_size{{engine="{n}"}} {e.pool.size()}' for n, e in sorted(self._motores.items())
+                 if hasattr(e.pool, "size")])
+        metrica("db_sessions_in_transaction", "gauge", "Sesiones con una transacción abierta.",
+                [f"db_sessions_in_transaction {transacciones}"])
+        metrica("events_subscriptions", "gauge", "Conexiones abiertas a /projects/{id}/events.",
+                [f"events_subscriptions {broker.total}"])
+        metrica("password_hashes_in_progress", "gauge", "Hashes de contraseña en curso o esperando proceso.",
+                [f"password_hashes_in_progress {pool.en_curso}"])
+        return "\n".join(lineas) + "\n"
+
+
+def _copiar(histograma: Histograma) -> Histograma:
+    copia = Histograma(histograma.limites)
+    copia.cuentas = list(histograma.cuentas)
+    copia.suma, copia.total = histograma.suma, histograma.total
+    return copia
+
+
+def plantilla_ruta(scope) -> str:
+    # El router deja en el scope la ruta que atendió la petición. Según la versión de
+    # FastAPI, la de un router incluido lleva su prefijo (/projects) o no: en ese caso
+    # se recupera de la URL, buscando el trozo a partir del cual encaja la plantilla.
+    ruta = scope.get("route")
+    if ruta is None or not hasattr(ruta, "path_regex"):
+        return SIN_RUTA
+    camino = scope.get("path", "")
+    i = 0
+    while i != -1:
+        if ruta.path_regex.match(camino[i:]):
+            return camino[:i] + ruta.path
+        i = camino.find("/", i + 1)
+    return ruta.path
+
+
+class MiddlewareMetricas:
+    def __init__(self, app, registro: Metricas = None):
+        self.app = app
+        self.registro = registro or metricas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        sql = _SqlPeticion()
+        token = _peticion.set(sql)
+        estado = 500
+        conexion_larga = False
+
+        async def enviar(mensaje):
+            nonlocal estado, conexion_larga
+            if mensaje["type"] == "http.response.start":
+                estado = mensaje["status"]
+                for nombre, valor in mensaje.get("headers", ()):
+                    if nombre.lower() == b"content-type" and valor.startswith(SIN_LATENCIA):
+                        conexion_larga = True
+            await send(mensaje)
+
+        self.registro.empezar()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            segundos = None if conexion_larga else time.perf_counter() - inicio
+            self.registro.terminar(scope["method"], plantilla_ruta(scope), estado, segundos,
+                                  sql.sentencias, sql.segundos)
+            _peticion.reset(token)
+
+
+metricas = Metricas()
@@ -15,6 +15,7 @@ from backend.models import (
     TipoEscenarioEnum,
 )
 from backend.security import hash_password
+from backend.actores import sincronizar
 
 def insertar_datos_mock(db: Session):
     if db.query(Usuario).count() > 0:
@@ -80,7 +81,8 @@ def insertar_datos_mock(db: Session):
         proyecto_id=p.id,
         estado=EstadoCasoUsoEnum.EN_DESARROLLO
     )
-    db.add(cu_reserva); db.commit(); db.refresh(cu_reserva)
+    db.add(cu_reserva); db.flush()
+    sincronizar(db, [cu_reserva.id]); db.commit(); db.refresh(cu_reserva)
 
     escenarios = [
         Escenario(
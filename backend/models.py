@@ -1,6 +1,10 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func, Enum as SQLEnum
+from sqlalchemy import (Column, Integer, String, Text, Boolean, ForeignKey, DateTime, Index, Table, event, func,
+                        Enum as SQLEnum)
 from sqlalchemy.orm import relationship, backref
 from backend.database import Base 
+from backend.busqueda import crear_indice_tras_create_all
+from backend.estadisticas import crear_triggers_tras_create_all
+from backend import cambios, versiones
 import enum
 
 # Enumerados existentes
@@ -57,6 +61,8 @@ class Proyecto(Base):
     fecha_creacion = Column(DateTime, default=func.now(), nullable=False)
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
     estado = Column(SQLEnum(EstadoProyectoEnum), default=EstadoProyectoEnum.ACTIVO, nullable=False)
+    # Se incrementa con cada cambio del proyecto o de sus filas (triggers, ver versiones.py)
+    version_contenido = Column(Integer, default=0, server_default="0", nullable=False)
 
     # Cada proyecto pertenece a un usuario
     usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=False)
@@ -65,6 +71,14 @@ class Proyecto(Base):
     # Relaciones internas
     requisitos = relationship("Requisito", back_populates="proyecto", cascade="all, delete-orphan")
     casos_uso = relationship("CasoUso", back_populates="proyecto", cascade="all, delete-orphan")
+    actores = relationship("Actor", back_populates="proyecto", cascade="all, delete-orphan")
+
+    # Índices para la paginación por cursor de los listados. AUTOINCREMENT para que el id
+    # de un proyecto borrado no se reutilice mientras la purga no ha eliminado sus filas
+    __table_args__ = (
+        Index("ix_proyectos_usuario_actualizacion", "usuario_id", "fecha_actualizacion", "id"),
+        {"sqlite_autoincrement": True},
+    )
 
 class Requisito(Base):
     __tablename__ = "requisitos"
@@ -92,7 +106,7 @@ class Requisito(Base):
     version              = Column(Integer, default=1)
 
     # Dependencia jerárquica
-    requisito_padre_id   = Column(Integer, ForeignKey("requisitos.id"), nullable=True)
+    requisito_padre_id   = Column(Integer, ForeignKey("requisitos.id"), nullable=True, index=True)
     dependientes         = relationship(
                              "Requisito",
                              backref=backref("padre", remote_side=[id]),
@@ -101,19 +115,24 @@ class Requisito(Base):
 
     proyecto             = relationship("Proyecto", back_populates="requisitos")
     casos_uso            = relationship("CasoUso", back_populates="requisito", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_requisitos_proyecto_actualizacion", "proyecto_id", "fecha_actualizacion", "id"),
+        Index("ix_requisitos_proyecto_prioridad", "proyecto_id", "prioridad", "id"),
+    )
 # Modelo CasoUso
 class CasoUso(Base):
     __tablename__ = "casos_uso"
     id = Column(Integer, primary_key=True, index=True)
     titulo = Column(String(255), nullable=False)
     descripcion = Column(Text)
-    actores = Column(Text)  # Lista separada por comas (o se puede modelar con una relación N-N)
+    actores = Column(Text)  # Lista separada por comas; los vínculos consultables están en casos_uso_actores
     precondiciones = Column(Text)
     postcondiciones = Column(Text)
     flujo_normal = Column(Text)
     flujo_alternativo = Column(Text)
     categoria = Column(SQLEnum(CategoriaCasoUsoEnum), nullable=False)
-    requisito_id = Column(Integer, ForeignKey("requisitos.id"))
+    requisito_id = Column(Integer, ForeignKey("requisitos.id"), index=True)
     proyecto_id = Column(Integer, ForeignKey("proyectos.id"))
     fecha_creacion = Column(DateTime, default=func.now(), nullable=False)
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now(), nullable=False)
@@ -122,6 +141,21 @@ class CasoUso(Base):
     requisito = relationship("Requisito", back_populates="casos_uso")
     proyecto = relationship("Proyecto", back_populates="casos_uso")
     escenarios = relationship("Escenario", back_populates="caso_uso", cascade="all, delete-orphan")
+    actores_vinculados = relationship("Actor", secondary="casos_uso_actores", back_populates="casos_uso")
+
+    __table_args__ = (
+        Index("ix_casos_uso_proyecto_actualizacion", "proyecto_id", "fecha_actualizacion", "id"),
+    )
+
+# Relación N-N caso de uso <-> actor. La clave primaria sirve para ir del caso de uso
+# a sus actores y el índice inverso para ir del actor a sus casos de uso.
+casos_uso_actores = Table(
+    "casos_uso_actores",
+    Base.metadata,
+    Column("caso_uso_id", Integer, ForeignKey("casos_uso.id"), primary_key=True),
+    Column("actor_id", Integer, ForeignKey("actores.id"), primary_key=True),
+    Index("ix_casos_uso_actores_actor", "actor_id", "caso_uso_id"),
+)
 
 # Modelo Actor
 class Actor(Base):
@@ -130,13 +164,22 @@ class Actor(Base):
     nombre = Column(String(255), nullable=False)
     tipo = Column(String(50), nullable=False)  # Humano o Sistema Externo
     descripcion = Column(Text)
+    # Sin proyecto el actor es global (catálogo compartido); con proyecto, solo lo ve su dueño
+    proyecto_id = Column(Integer, ForeignKey("proyectos.id"), nullable=True)
+
+    proyecto = relationship("Proyecto", back_populates="actores")
+    casos_uso = relationship("CasoUso", secondary="casos_uso_actores", back_populates="actores_vinculados")
+
+    __table_args__ = (
+        Index("ix_actores_proyecto_nombre", "proyecto_id", "nombre", unique=True),
+    )
 
 # Modelo RelacionRequisito
 class RelacionRequisito(Base):
     __tablename__ = "relaciones_requisitos"
     id = Column(Integer, primary_key=True, index=True)
-    requisito_id = Column(Integer, ForeignKey("requisitos.id"))
-    caso_uso_id = Column(Integer, ForeignKey("casos_uso.id"))
+    requisito_id = Column(Integer, ForeignKey("requisitos.id"), index=True)
+    caso_uso_id = Column(Integer, ForeignKey("casos_uso.id"), index=True)
 
     requisito = relationship("Requisito")
     caso_uso = relationship("CasoUso")
@@ -155,4 +198,65 @@ class Escenario(Base):
 
     caso_uso = relationship("CasoUso", back_populates="escenarios")
 
+    # El índice compuesto también sirve para filtrar por caso_uso_id
+    __table_args__ = (
+        Index("ix_escenarios_caso_uso_actualizacion", "caso_uso_id", "fecha_actualizacion", "id"),
+        Index("ix_escenarios_actualizacion", "fecha_actualizacion", "id"),
+    )
+
+# Cola de borrados pendientes: proyectos y ramas de requisitos que ya no son visibles
+# y cuyas filas se eliminan por lotes en segundo plano (ver purga.py)
+class PurgaPendiente(Base):
+    __tablename__ = "purgas_pendientes"
+    id = Column(Integer, primary_key=True)
+    tabla = Column(String(20), nullable=False)  # "proyectos" o "requisitos"
+    fila_id = Column(Integer, nullable=False)
+    fecha_creacion = Column(DateTime, default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_purgas_pendientes_tabla", "tabla", "id"),
+    )
+
+# Contadores por proyecto para el dashboard (proyecto, dimensión como "requisitos.estado",
+# valor de la columna, total), mantenidos por triggers (ver estadisticas.py). Sin clave
+# ajena: es una tabla derivada que se borra con el trigger de proyectos
+class EstadisticaProyecto(Base):
+    __tablename__ = "estadisticas_proyecto"
+    proyecto_id = Column(Integer, primary_key=True)
+    dimension = Column(String(30), primary_key=True)
+    valor = Column(String(50), primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+
+# Registro de cambios para la sincronización incremental: una fila por requisito, caso
+# de uso o escenario de cada proyecto, reescrita con un seq nuevo en cada cambio y
+# marcada como borrada al eliminarla (ver cambios.py). AUTOINCREMENT para que seq no
+# se reutilice nunca
+class RegistroCambio(Base):
+    __tablename__ = "registro_cambios"
+    seq = Column(Integer, primary_key=True)
+    proyecto_id = Column(Integer, nullable=False)
+    entidad = Column(String(20), nullable=False)
+    entidad_id = Column(Integer, nullable=False)
+    borrado = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index("ux_registro_cambios_entidad", "proyecto_id", "entidad", "entidad_id", unique=True),
+        Index("ix_registro_cambios_proyecto_seq", "proyecto_id", "seq"),
+        {"sqlite_autoincrement": True},
+    )
+
+# Versión de todos los datos en una sola fila (id = 1), mantenida por triggers (ver
+# versiones.py) para los GET condicionales de las rutas que no son de un proyecto
+class VersionGlobal(Base):
+    __tablename__ = "version_global"
+    id = Column(Integer, primary_key=True)
+    valor = Column(Integer, nullable=False, default=0)
+    fecha_actualizacion = Column(DateTime, default=func.now(), nullable=False)
 
+# Índice de texto completo (tabla FTS5 y triggers, ver busqueda.py), contadores de
+# estadísticas, registro de cambios y versión de contenido (triggers) junto al resto
+# del esquema
+event.listen(Base.metadata, "after_create", crear_indice_tras_create_all)
+event.listen(Base.metadata, "after_create", crear_triggers_tras_create_all)
+event.listen(Base.metadata, "after_create", cambios.crear_triggers_tras_create_all)
+event.listen(Base.metadata, "after_create", versiones.crear_triggers_tras_create_all)
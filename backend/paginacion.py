@@ -0,0 +1,105 @@
+# backend/paginacion.py
+# Paginación por cursor (keyset) para los listados. El cursor codifica la última
+# fila devuelta como (valor de la columna de orden, id); la página siguiente se
+# obtiene con una comparación de row values que aprovecha los índices compuestos,
+# así que la página N cuesta lo mismo que la primera.
+import base64
+import json
+from datetime import datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response
+from sqlalchemy import func, literal, select, tuple_
+
+LIMITE_POR_DEFECTO = 100
+LIMITE_MAXIMO = 500
+CABECERA_CURSOR = "X-Next-Cursor"
+
+
+class Paginacion:
+    def __init__(self,
+                 limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                 cursor: Optional[str] = None,
+                 orden: str = Query("id", description="Campo de orden; prefijo '-' para orden descendente")):
+        self.limit = limit
+        self.cursor = cursor
+        self.descendente = orden.startswith("-")
+        self.campo = orden.lstrip("-")
+
+
+def codificar_cursor(valor, ultimo_id: int) -> str:
+    if isinstance(valor, datetime):
+        valor = valor.isoformat()
+    datos = json.dumps([valor, ultimo_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, es_fecha: bool):
+    try:
+        datos = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        valor, ultimo_id = json.loads(datos)
+        if es_fecha:
+            valor = datetime.fromisoformat(valor)
+        return valor, int(ultimo_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def filtro_enum(enum_cls, valor: Optional[str]):
+    # Acepta tanto el nombre ('EN_DESARROLLO') como el valor ('En Desarrollo')
+    if valor is None:
+        return None
+    for miembro in enum_cls:
+        if valor in (miembro.name, miembro.value):
+            return miembro
+    raise HTTPException(status_code=422, detail=f"Valor no válido para el filtro: {valor}")
+
+
+def _condicion_y_orden(modelo, pag: Paginacion, ordenables):
+    if pag.campo not in ordenables:
+        raise HTTPException(status_code=422, detail=f"orden debe ser uno de: {', '.join(ordenables)}")
+    columna = getattr(modelo, pag.campo)
+    claves = [modelo.id] if pag.campo == "id" else [columna, modelo.id]
+
+    condicion = None
+    if pag.cursor:
+        valor, ultimo_id = decodificar_cursor(pag.cursor, pag.campo.startswith("fecha_"))
+        if pag.campo == "id":
+            izquierda, derecha = modelo.id, ultimo_id
+        else:
+            # Se compara con el valor almacenado de la fila ancla (mismo formato que la
+            # columna); el valor del cursor solo se usa si esa fila ya no existe.
+            ancla = select(columna).where(modelo.id == ultimo_id).scalar_subquery()
+            izquierda = tuple_(columna, modelo.id)
+            derecha = tuple_(func.coalesce(ancla, valor), literal(ultimo_id))
+        condicion = izquierda < derecha if pag.descendente else izquierda > derecha
+
+    orden = [c.desc() if pag.descendente else c.asc() for c in claves]
+    return condicion, orden
+
+
+def _recortar_pagina(filas, pag: Paginacion, response: Response):
+    if len(filas) > pag.limit:
+        filas = filas[:pag.limit]
+        ultima = filas[-1]
+        response.headers[CABECERA_CURSOR] = codificar_cursor(getattr(ultima, pag.campo), ultima.id)
+    return filas
+
+
+def paginar(query, modelo, pag: Paginacion, response: Response, ordenables=("id",)):
+    condicion, orden = _condicion_y_orden(modelo, pag, ordenables)
+    if condicion is not None:
+        query = query.filter(condicion)
+    filas = query.order_by(*orden).limit(pag.limit + 1).all()
+    return _recortar_pagina(filas, pag, response)
+
+
+async def paginar_async(db, stmt, modelo, pag: Paginacion, response: Response, ordenables=("id",),
+                        columnas=False):
+    # Variante para AsyncSession: recibe una select() en lugar de una Query. Con
+    # columnas=True la select() es de columnas sueltas y se devuelven las filas tal cual
+    condicion, orden = _condicion_y_orden(modelo, pag, ordenables)
+    if condicion is not None:
+        stmt = stmt.where(condicion)
+    resultado = await db.execute(stmt.order_by(*orden).limit(pag.limit + 1))
+    return _recortar_pagina(resultado.all() if columnas else list(resultado.scalars()), pag, response)
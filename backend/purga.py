@@ -0,0 +1,150 @@
+# backend/purga.py
+# Borrado diferido de agregados grandes (un proyecto entero o una rama de requisitos).
+# La petición solo hace invisible la raíz y anota el trabajo en purgas_pendientes;
+# un hilo de fondo elimina las filas hijas en lotes acotados de DELETE ... WHERE id IN
+# (...), con un commit por lote, de modo que el bloqueo de escritura de SQLite se
+# libera entre lotes y el resto de escrituras no esperan a que termine la purga.
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy import delete, insert, literal, or_, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal
+from .jerarquia import ids_subarbol
+from .models import Proyecto, Requisito, CasoUso, Escenario, RelacionRequisito, Actor, PurgaPendiente, casos_uso_actores
+
+TAM_LOTE = int(os.getenv("PURGA_TAM_LOTE", "500"))
+# Pausa entre lotes para ceder el bloqueo de escritura a otras peticiones
+PAUSA = float(os.getenv("PURGA_PAUSA_MS", "5")) / 1000
+
+logger = logging.getLogger(__name__)
+
+
+# --- Programación (dentro de la transacción de la petición) ---
+def programar_proyecto(db: Session, proyecto_id: int):
+    # Sin la fila del proyecto sus hijos dejan de ser accesibles: todas las rutas
+    # comprueban la propiedad del proyecto. proyectos es AUTOINCREMENT, así que ningún
+    # proyecto nuevo recibe este id mientras sus filas esperan a la purga
+    db.execute(delete(Proyecto).where(Proyecto.id == proyecto_id))
+    db.add(PurgaPendiente(tabla="proyectos", fila_id=proyecto_id))
+
+
+def programar_requisito(db: Session, proyecto_id: int, requisito_id: int):
+    # Se anotan todos los requisitos de la rama y se desvinculan del proyecto (junto
+    # con sus casos de uso, que el ORM también borraba en cascada)
+    db.execute(insert(PurgaPendiente).from_select(
+        ["tabla", "fila_id"], select(literal("requisitos"), ids_subarbol(proyecto_id, requisito_id).subquery().c.id)
+    ))
+    pendientes = select(PurgaPendiente.fila_id).where(PurgaPendiente.tabla == "requisitos")
+    db.execute(update(CasoUso).where(CasoUso.requisito_id.in_(pendientes), CasoUso.proyecto_id == proyecto_id)
+               .values(proyecto_id=None))
+    db.execute(update(Requisito).where(Requisito.id.in_(pendientes), Requisito.proyecto_id == proyecto_id)
+               .values(proyecto_id=None))
+
+
+# --- Ejecución por lotes ---
+def _borrar_requisitos(db: Session, ids):
+    casos = select(CasoUso.id).where(CasoUso.requisito_id.in_(ids))
+    db.execute(delete(Escenario).where(Escenario.caso_uso_id.in_(casos)))
+    db.execute(delete(casos_uso_actores).where(casos_uso_actores.c.caso_uso_id.in_(casos)))
+    db.execute(delete(RelacionRequisito).where(
+        or_(RelacionRequisito.requisito_id.in_(ids), RelacionRequisito.caso_uso_id.in_(casos))
+    ))
+    db.execute(delete(CasoUso).where(CasoUso.requisito_id.in_(ids)))
+    db.execute(delete(Requisito).where(Requisito.id.in_(ids)))
+
+
+def _etapas_proyecto(proyecto_id: int):
+    # Hijos antes que padres; cada etapa borra como mucho TAM_LOTE filas (los vínculos
+    # con actores, los de TAM_LOTE casos de uso)
+    casos = select(CasoUso.id).where(CasoUso.proyecto_id == proyecto_id)
+    requisitos = select(Requisito.id).where(Requisito.proyecto_id == proyecto_id)
+    vinculos = casos_uso_actores.c
+    return [
+        (Escenario.__table__.c.id, select(Escenario.id).where(Escenario.caso_uso_id.in_(casos))),
+        (RelacionRequisito.__table__.c.id, select(RelacionRequisito.id).where(or_(
+            RelacionRequisito.caso_uso_id.in_(casos), RelacionRequisito.requisito_id.in_(requisitos)))),
+        (vinculos.caso_uso_id, select(vinculos.caso_uso_id).where(vinculos.caso_uso_id.in_(casos)).distinct()),
+        (CasoUso.__table__.c.id, casos),
+        (Requisito.__table__.c.id, requisitos),
+        (Actor.__table__.c.id, select(Actor.id).where(Actor.proyecto_id == proyecto_id)),
+    ]
+
+
+def purgar_lote(db: Session) -> bool:
+    # Ejecuta un lote de trabajo pendiente; devuelve False si no quedaba nada
+    ids = db.scalars(
+        select(PurgaPendiente.fila_id).where(PurgaPendiente.tabla == "requisitos")
+        .order_by(PurgaPendiente.id).limit(TAM_LOTE)
+    ).all()
+    if ids:
+        _borrar_requisitos(db, ids)
+        db.execute(delete(PurgaPendiente).where(PurgaPendiente.tabla == "requisitos",
+                                                PurgaPendiente.fila_id.in_(ids)))
+        return True
+
+    pendiente = db.scalars(
+        select(PurgaPendiente).where(PurgaPendiente.tabla == "proyectos").order_by(PurgaPendiente.id).limit(1)
+    ).first()
+    if pendiente is None:
+        return False
+    for columna, consulta in _etapas_proyecto(pendiente.fila_id):
+        borradas = db.execute(delete(columna.table).where(columna.in_(consulta.limit(TAM_LOTE)))).rowcount
+        if borradas:
+            return True
+    db.delete(pendiente)
+    return True
+
+
+def purgar_todo(db: Session):
+    # Versión síncrona (scripts y benchmarks): vacía la cola lote a lote
+    while purgar_lote(db):
+        db.commit()
+    db.commit()
+
+
+class Purgador:
+    def __init__(self):
+        self._evento = threading.Event()
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def avisar(self):
+        with self._lock:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(target=self._bucle, name="purgador", daemon=True)
+                self._hilo.start()
+        self._evento.set()
+
+    def _bucle(self):
+        while True:
+            self._evento.wait()
+            self._evento.clear()
+            try:
+                while self._ejecutar_lote():
+                    time.sleep(PAUSA)
+            except Exception:
+                # La cola es persistente: se reintentará en el siguiente aviso
+                logger.exception("Error purgando datos borrados")
+
+    @staticmethod
+    def _ejecutar_lote() -> bool:
+        with SessionLocal() as db:
+            try:
+                hay_mas = purgar_lote(db)
+                db.commit()
+                return hay_mas
+            except OperationalError as e:
+                if "locked" not in str(e):
+                    raise
+                # Base de datos ocupada (busy_timeout agotado): se reintenta más tarde
+                db.rollback()
+                time.sleep(0.1)
+                return True
+
+
+purgador = Purgador()
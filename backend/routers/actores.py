@@ -1,40 +1,67 @@
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List
-from .dependencies import get_db
-from ..models import Actor, Usuario
-from ..schemas import ActorResponse, ActorCreate
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from ..security import SECRET_KEY, ALGORITHM
+from typing import List, Optional
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Actor, CasoUso, Proyecto, casos_uso_actores
+from ..schemas import ActorResponse, ActorCreate, CasoUsoResponse
+from .. import cache_documentos
+from ..actores import renombrar_en_casos
+from ..paginacion import Paginacion, paginar
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Actores de un caso de uso (montado bajo /casos_uso)
+casos_uso_router = APIRouter()
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+def _actores_visibles(db: Session, current_user: Principal):
+    # Actores globales y los de los proyectos del usuario
+    return db.query(Actor).outerjoin(Proyecto, Actor.proyecto_id == Proyecto.id).filter(
+        or_(Actor.proyecto_id.is_(None), Proyecto.usuario_id == current_user.id)
+    )
+
+def _actor_del_usuario(db: Session, actor_id: int, current_user: Principal):
+    actor = _actores_visibles(db, current_user).filter(Actor.id == actor_id).first()
+    if not actor:
+        raise HTTPException(status_code=404, detail="Actor no encontrado")
+    return actor
+
+def _validar_actor(db: Session, actor: ActorCreate, current_user: Principal, actor_id: Optional[int] = None):
+    if actor.proyecto_id is None:
+        return
+    project = db.query(Proyecto.id).filter(
+        Proyecto.id == actor.proyecto_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    repetido = db.query(Actor.id).filter(
+        Actor.proyecto_id == actor.proyecto_id,
+        Actor.nombre == actor.nombre,
+        Actor.id != actor_id
+    ).first()
+    if repetido:
+        raise HTTPException(status_code=400, detail="Ya existe un actor con ese nombre en el proyecto")
 
 @router.get("/", response_model=List[ActorResponse])
-def get_actores(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    return db.query(Actor).all()
+def get_actores(response: Response, tipo: Optional[str] = None, proyecto_id: Optional[int] = None,
+                pag: Paginacion = Depends(),
+                db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    query = _actores_visibles(db, current_user)
+    if tipo is not None:
+        query = query.filter(Actor.tipo == tipo)
+    if proyecto_id is not None:
+        query = query.filter(Actor.proyecto_id == proyecto_id)
+    return paginar(query, Actor, pag, response)
 
 @router.post("/", response_model=ActorResponse)
-def create_actor(actor: ActorCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def create_actor(actor: ActorCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    _validar_actor(db, actor, current_user)
     nuevo_actor = Actor(
         nombre=actor.nombre,
         tipo=actor.tipo,
-        descripcion=actor.descripcion
+        descripcion=actor.descripcion,
+        proyecto_id=actor.proyecto_id
     )
     db.add(nuevo_actor)
     db.commit()
@@ -42,29 +69,69 @@ def create_actor(actor: ActorCreate, db: Session = Depends(get_db), current_user
     return nuevo_actor
 
 @router.get("/{actor_id}", response_model=ActorResponse)
-def get_actor(actor_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    actor = db.query(Actor).filter(Actor.id == actor_id).first()
-    if not actor:
-        raise HTTPException(status_code=404, detail="Actor no encontrado")
-    return actor
+def get_actor(actor_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    return _actor_del_usuario(db, actor_id, current_user)
+
+@router.get("/{actor_id}/casos_uso", response_model=List[CasoUsoResponse])
+def get_casos_uso_actor(actor_id: int, response: Response, pag: Paginacion = Depends(),
+                        db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    # Una sola consulta sobre el índice (actor_id, caso_uso_id) de casos_uso_actores
+    query = db.query(CasoUso).join(
+        casos_uso_actores, casos_uso_actores.c.caso_uso_id == CasoUso.id
+    ).join(Proyecto, CasoUso.proyecto_id == Proyecto.id).filter(
+        casos_uso_actores.c.actor_id == actor_id,
+        Proyecto.usuario_id == current_user.id
+    )
+    casos = paginar(query, CasoUso, pag, response, ordenables=("id", "fecha_actualizacion"))
+    if not casos and not pag.cursor:
+        _actor_del_usuario(db, actor_id, current_user)
+    return casos
 
 @router.put("/{actor_id}", response_model=ActorResponse)
-def update_actor(actor_id: int, actor: ActorCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    db_actor = db.query(Actor).filter(Actor.id == actor_id).first()
-    if not db_actor:
-        raise HTTPException(status_code=404, detail="Actor no encontrado")
+def update_actor(actor_id: int, actor: ActorCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    db_actor = _actor_del_usuario(db, actor_id, current_user)
+    if actor.proyecto_id != db_actor.proyecto_id and db_actor.casos_uso:
+        raise HTTPException(status_code=400, detail="El actor está vinculado a casos de uso y no puede cambiar de proyecto")
+    _validar_actor(db, actor, current_user, actor_id)
+    proyectos = set()
+    if actor.nombre != db_actor.nombre:
+        proyectos = renombrar_en_casos(db, actor_id, db_actor.nombre, actor.nombre)
     db_actor.nombre = actor.nombre
     db_actor.tipo = actor.tipo
     db_actor.descripcion = actor.descripcion
+    db_actor.proyecto_id = actor.proyecto_id
     db.commit()
+    for proyecto_id in proyectos:
+        cache_documentos.invalidar_proyecto(proyecto_id)
     db.refresh(db_actor)
     return db_actor
 
 @router.delete("/{actor_id}")
-def delete_actor(actor_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    db_actor = db.query(Actor).filter(Actor.id == actor_id).first()
-    if not db_actor:
-        raise HTTPException(status_code=404, detail="Actor no encontrado")
+def delete_actor(actor_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    db_actor = _actor_del_usuario(db, actor_id, current_user)
+    proyectos = renombrar_en_casos(db, actor_id, db_actor.nombre)
     db.delete(db_actor)
     db.commit()
+    for proyecto_id in proyectos:
+        cache_documentos.invalidar_proyecto(proyecto_id)
     return {"detail": "Actor eliminado"}
+
+@casos_uso_router.get("/{caso_uso_id}/actores", response_model=List[ActorResponse])
+def get_actores_caso_uso(caso_uso_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    # Una sola consulta sobre la clave primaria (caso_uso_id, actor_id) de casos_uso_actores
+    actores = db.query(Actor).join(
+        casos_uso_actores, casos_uso_actores.c.actor_id == Actor.id
+    ).join(CasoUso, CasoUso.id == casos_uso_actores.c.caso_uso_id).join(
+        Proyecto, CasoUso.proyecto_id == Proyecto.id
+    ).filter(
+        casos_uso_actores.c.caso_uso_id == caso_uso_id,
+        Proyecto.usuario_id == current_user.id
+    ).order_by(Actor.nombre).all()
+    if not actores:
+        caso = db.query(CasoUso.id).join(Proyecto, CasoUso.proyecto_id == Proyecto.id).filter(
+            CasoUso.id == caso_uso_id,
+            Proyecto.usuario_id == current_user.id
+        ).first()
+        if not caso:
+            raise HTTPException(status_code=404, detail="Caso de uso no encontrado")
+    return actores
@@ -0,0 +1,49 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto
+from ..schemas import ResultadoBusqueda
+from ..busqueda import FUENTES, consulta_fts, consulta_busqueda, resultados
+
+router = APIRouter(tags=["Búsqueda"])
+# Búsqueda en todos los proyectos del usuario (montado bajo /search)
+espacio_router = APIRouter(tags=["Búsqueda"])
+
+PATRON_ENTIDAD = f"^({'|'.join(FUENTES)})$"
+
+
+def _buscar(db: Session, q: str, proyecto_ids: List[int], entidad: Optional[str], limit: int):
+    fts = consulta_fts(q)
+    if fts is None:
+        raise HTTPException(status_code=422, detail="La búsqueda no contiene ninguna palabra")
+    if not proyecto_ids:
+        return []
+    return resultados(db.execute(consulta_busqueda(fts, proyecto_ids, entidad, limit)))
+
+
+@router.get("/{project_id}/search", response_model=List[ResultadoBusqueda])
+def buscar_en_proyecto(project_id: int,
+                       q: str = Query(..., min_length=1, max_length=200),
+                       entidad: Optional[str] = Query(None, pattern=PATRON_ENTIDAD),
+                       limit: int = Query(20, ge=1, le=100),
+                       db: Session = Depends(get_db),
+                       current_user: Principal = Depends(get_current_user)):
+    project = db.query(Proyecto.id).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    return _buscar(db, q, [project.id], entidad, limit)
+
+
+@espacio_router.get("", response_model=List[ResultadoBusqueda])
+def buscar_en_espacio(q: str = Query(..., min_length=1, max_length=200),
+                      entidad: Optional[str] = Query(None, pattern=PATRON_ENTIDAD),
+                      limit: int = Query(20, ge=1, le=100),
+                      db: Session = Depends(get_db),
+                      current_user: Principal = Depends(get_current_user)):
+    proyecto_ids = db.scalars(select(Proyecto.id).where(Proyecto.usuario_id == current_user.id)).all()
+    return _buscar(db, q, proyecto_ids, entidad, limit)
@@ -0,0 +1,47 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.orm import Session
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto, Requisito, CasoUso, Escenario
+from ..schemas import CambiosProyectoResponse, RequisitoResponse, CasoUsoResponse, EscenarioResponse
+from ..serializacion import Listado, RespuestaJSON
+from .. import cambios
+
+router = APIRouter(tags=["Cambios"])
+
+LIMITE_POR_DEFECTO = 500
+LIMITE_MAXIMO = 2000
+LISTADOS = {
+    "requisitos": (Requisito, Listado(Requisito, RequisitoResponse)),
+    "casos_uso": (CasoUso, Listado(CasoUso, CasoUsoResponse)),
+    "escenarios": (Escenario, Listado(Escenario, EscenarioResponse)),
+}
+
+
+@router.get("/{project_id}/changes", response_model=CambiosProyectoResponse)
+def cambios_proyecto(project_id: int, response: Response,
+                     since: Optional[int] = Query(None, ge=0),
+                     limit: int = Query(LIMITE_POR_DEFECTO, ge=1, le=LIMITE_MAXIMO),
+                     db: Session = Depends(get_db),
+                     current_user: Principal = Depends(get_current_user)):
+    project = db.query(Proyecto.id).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    contenido = {"proyecto_id": project.id, "cursor": 0, "mas": False,
+                 **{entidad: [] for entidad in LISTADOS}, "borrados": {entidad: [] for entidad in LISTADOS}}
+    if since is None:
+        # Sin since solo se devuelve la posición actual, desde la que seguir los cambios
+        contenido["cursor"] = cambios.ultimo(db, project.id)
+        return RespuestaJSON(contenido, headers=dict(response.headers))
+
+    cursor, mas, vivos, borrados = cambios.leer(db, project.id, since, limit)
+    contenido.update(cursor=cursor, mas=mas, borrados=borrados)
+    for entidad, (modelo, listado) in LISTADOS.items():
+        if vivos[entidad]:
+            filas = db.query(*listado.columnas).filter(modelo.id.in_(vivos[entidad])).order_by(modelo.id).all()
+            contenido[entidad] = listado.filas_a_dicts(filas)
+    # Como en los listados, las cabeceras de `response` (ETag) se copian a la respuesta
+    return RespuestaJSON(contenido, headers=dict(response.headers))
@@ -1,41 +1,38 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from .dependencies import get_db
-from ..models import Proyecto, CasoUso, Usuario
+from typing import List, Optional
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto, CasoUso, EstadoCasoUsoEnum, CategoriaCasoUsoEnum
 from ..schemas import CasoUsoResponse, CasoUsoCreate
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from ..security import SECRET_KEY, ALGORITHM
+from .. import cache_documentos, eventos
+from ..actores import sincronizar
+from ..paginacion import Paginacion, paginar, filtro_enum
+from ..serializacion import Listado
 
 router = APIRouter( tags=["Casos de Uso"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+listado = Listado(CasoUso, CasoUsoResponse)
 
 @router.get("/{project_id}/casos_uso", response_model=List[CasoUsoResponse])
-def listar_casos_uso(project_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def listar_casos_uso(project_id: int, response: Response,
+                     estado: Optional[str] = None, categoria: Optional[str] = None,
+                     pag: Paginacion = Depends(),
+                     db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
     ).first()
     if not project:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
-    return project.casos_uso
+    query = db.query(*listado.columnas).filter(CasoUso.proyecto_id == project.id)
+    if estado is not None:
+        query = query.filter(CasoUso.estado == filtro_enum(EstadoCasoUsoEnum, estado))
+    if categoria is not None:
+        query = query.filter(CasoUso.categoria == filtro_enum(CategoriaCasoUsoEnum, categoria))
+    filas = paginar(query, CasoUso, pag, response, ordenables=("id", "fecha_actualizacion"))
+    return listado.respuesta(filas, response)
 
 @router.get("/{project_id}/casos_uso/{caso_uso_id}", response_model=CasoUsoResponse)
-def obtener_caso_uso(project_id: int, caso_uso_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def obtener_caso_uso(project_id: int, caso_uso_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
@@ -51,7 +48,7 @@ def obtener_caso_uso(project_id: int, caso_uso_id: int, db: Session = Depends(ge
     return caso
 
 @router.post("/{project_id}/casos_uso", response_model=CasoUsoResponse, status_code=status.HTTP_201_CREATED)
-def crear_caso_uso(project_id: int, cu: CasoUsoCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def crear_caso_uso(project_id: int, cu: CasoUsoCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
@@ -72,12 +69,16 @@ def crear_caso_uso(project_id: int, cu: CasoUsoCreate, db: Session = Depends(get
         proyecto_id=project.id
     )
     db.add(nuevo_caso)
+    db.flush()
+    sincronizar(db, [nuevo_caso.id])
     db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
     db.refresh(nuevo_caso)
+    eventos.publicar(project.id, "casos_uso", nuevo_caso.id, "creado")
     return nuevo_caso
 
 @router.put("/{project_id}/casos_uso/{caso_uso_id}", response_model=CasoUsoResponse)
-def actualizar_caso_uso(project_id: int, caso_uso_id: int, cu: CasoUsoCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def actualizar_caso_uso(project_id: int, caso_uso_id: int, cu: CasoUsoCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
@@ -90,6 +91,7 @@ def actualizar_caso_uso(project_id: int, caso_uso_id: int, cu: CasoUsoCreate, db
     ).first()
     if not db_caso:
         raise HTTPException(status_code=404, detail="Caso de uso no encontrado en este proyecto")
+    cambian_actores = cu.actores != db_caso.actores
     db_caso.titulo = cu.titulo
     db_caso.descripcion = cu.descripcion
     db_caso.actores = cu.actores
@@ -100,12 +102,17 @@ def actualizar_caso_uso(project_id: int, caso_uso_id: int, cu: CasoUsoCreate, db
     db_caso.categoria = cu.categoria
     db_caso.estado = cu.estado
     db_caso.requisito_id = cu.requisito_id
+    if cambian_actores:
+        db.flush()
+        sincronizar(db, [db_caso.id])
     db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
     db.refresh(db_caso)
+    eventos.publicar(project.id, "casos_uso", caso_uso_id, "actualizado")
     return db_caso
 
 @router.delete("/{project_id}/casos_uso/{caso_uso_id}", status_code=status.HTTP_204_NO_CONTENT)
-def eliminar_caso_uso(project_id: int, caso_uso_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def eliminar_caso_uso(project_id: int, caso_uso_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
@@ -120,6 +127,8 @@ def eliminar_caso_uso(project_id: int, caso_uso_id: int, db: Session = Depends(g
         raise HTTPException(status_code=404, detail="Caso de uso no encontrado en este proyecto")
     db.delete(db_caso)
     db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
+    eventos.publicar(project.id, "casos_uso", caso_uso_id, "borrado")
     return None
 
 
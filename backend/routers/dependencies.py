@@ -1,24 +1,115 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import event, inspect, select
 from sqlalchemy.orm import Session
-from jose import JWTError, jwt
-from ..database import get_db
+from ..database import get_db, get_async_db
 from ..models import Usuario
-from ..security import SECRET_KEY, ALGORITHM
+from ..security import decode_access_token
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
+# Caché de tokens ya validados: evita decodificar el JWT y consultar la tabla
+# usuarios en cada petición. Cada entrada caduca con el `exp` del token o, antes, tras
+# TTL_MAXIMO segundos. Los cambios y borrados de usuarios invalidan la caché del
+# proceso que los hace; en los demás workers un usuario borrado o renombrado sigue
+# autenticado como mucho TTL_MAXIMO segundos (PRINCIPALES_TTL_S, 0 desactiva la caché).
+TTL_MAXIMO = float(os.getenv("PRINCIPALES_TTL_S", "5"))
+MAX_ENTRADAS = 10000
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: int
+    username: str
+    email: str
+
+
+class CachePrincipales:
+    def __init__(self, max_entradas: int = MAX_ENTRADAS, ttl_maximo: float = TTL_MAXIMO):
+        self.max_entradas = max_entradas
+        self.ttl_maximo = ttl_maximo
+        self._entradas = OrderedDict()  # token -> (principal, caducidad)
+        self._lock = threading.Lock()
+
+    def obtener(self, token: str):
+        with self._lock:
+            entrada = self._entradas.get(token)
+            if entrada is None:
+                return None
+            principal, caducidad = entrada
+            if caducidad <= time.time():
+                del self._entradas[token]
+                return None
+            self._entradas.move_to_end(token)
+            return principal
+
+    def guardar(self, token: str, principal: Principal, exp: float):
+        caducidad = min(exp, time.time() + self.ttl_maximo)
+        with self._lock:
+            self._entradas[token] = (principal, caducidad)
+            self._entradas.move_to_end(token)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar_usuario(self, username: str):
+        with self._lock:
+            for token in [t for t, (p, _) in self._entradas.items() if p.username == username]:
+                del self._entradas[token]
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+
+cache_principales = CachePrincipales()
+
+
+@event.listens_for(Usuario, "after_update")
+@event.listens_for(Usuario, "after_delete")
+def _invalidar_principal(mapper, connection, usuario):
+    # Se invalida por el nombre anterior y el actual por si cambió el username
+    historial = inspect(usuario).attrs.username.history
+    for username in {usuario.username, *(historial.deleted or ())}:
+        cache_principales.invalidar_usuario(username)
+
+
+def _decodificar_token(token: str):
+    payload = decode_access_token(token)
+    username = payload.get("sub") if payload else None
+    if username is None:
         raise HTTPException(status_code=401, detail="Token inválido")
-    
-    user = db.query(Usuario).filter(Usuario.username == username).first()
+    return username, payload.get("exp", time.time())
+
+
+def _guardar_principal(token: str, user, exp: float) -> Principal:
     if user is None:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    
-    return user
+    principal = Principal(id=user.id, username=user.username, email=user.email)
+    cache_principales.guardar(token, principal, exp)
+    return principal
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    principal = cache_principales.obtener(token)
+    if principal is not None:
+        return principal
+    username, exp = _decodificar_token(token)
+    user = db.query(Usuario.id, Usuario.username, Usuario.email).filter(Usuario.username == username).first()
+    return _guardar_principal(token, user, exp)
+
+
+async def get_current_user_async(token: str = Depends(oauth2_scheme), db=Depends(get_async_db)) -> Principal:
+    principal = cache_principales.obtener(token)
+    if principal is not None:
+        return principal
+    username, exp = _decodificar_token(token)
+    resultado = await db.execute(
+        select(Usuario.id, Usuario.username, Usuario.email).where(Usuario.username == username)
+    )
+    return _guardar_principal(token, resultado.first(), exp)
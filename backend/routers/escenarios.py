@@ -1,35 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from .dependencies import get_db
-from ..models import Escenario, Usuario
+from typing import List, Optional
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Escenario, CasoUso, Proyecto, TipoEscenarioEnum
 from ..schemas import EscenarioResponse, EscenarioCreate
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from ..security import SECRET_KEY, ALGORITHM
+from .. import cache_documentos, eventos
+from ..paginacion import Paginacion, paginar, filtro_enum
+from ..serializacion import Listado
 
 router = APIRouter( tags=["Escenarios"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+# Rutas de escenarios acotadas a un proyecto (se montan bajo /projects)
+proyectos_router = APIRouter(tags=["Escenarios"])
+listado = Listado(Escenario, EscenarioResponse)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+def invalidar_documentos(db: Session, *caso_uso_ids: int, escenario_id: int, accion: str):
+    # Los escenarios no guardan el proyecto: se obtiene a través de su caso de uso
+    proyectos = db.query(CasoUso.proyecto_id).filter(CasoUso.id.in_(caso_uso_ids)).distinct()
+    for (proyecto_id,) in proyectos:
+        cache_documentos.invalidar_proyecto(proyecto_id)
+        eventos.publicar(proyecto_id, "escenarios", escenario_id, accion)
 
 @router.get("/", response_model=List[EscenarioResponse])
-def get_escenarios(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    return db.query(Escenario).all()
+def get_escenarios(response: Response, tipo: Optional[str] = None, pag: Paginacion = Depends(),
+                   db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    query = db.query(*listado.columnas)
+    if tipo is not None:
+        query = query.filter(Escenario.tipo == filtro_enum(TipoEscenarioEnum, tipo))
+    filas = paginar(query, Escenario, pag, response, ordenables=("id", "fecha_actualizacion"))
+    return listado.respuesta(filas, response)
 
 @router.post("/", response_model=EscenarioResponse, status_code=status.HTTP_201_CREATED)
-def create_escenario(escenario: EscenarioCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def create_escenario(escenario: EscenarioCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     nuevo_escenario = Escenario(
         nombre=escenario.nombre,
         descripcion=escenario.descripcion,
@@ -39,35 +40,80 @@ def create_escenario(escenario: EscenarioCreate, db: Session = Depends(get_db),
     )
     db.add(nuevo_escenario)
     db.commit()
+    invalidar_documentos(db, nuevo_escenario.caso_uso_id, escenario_id=nuevo_escenario.id, accion="creado")
     db.refresh(nuevo_escenario)
     return nuevo_escenario
 
 @router.get("/{escenario_id}", response_model=EscenarioResponse)
-def get_escenario(escenario_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def get_escenario(escenario_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     escenario = db.query(Escenario).filter(Escenario.id == escenario_id).first()
     if not escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
     return escenario
 
 @router.put("/{escenario_id}", response_model=EscenarioResponse)
-def update_escenario(escenario_id: int, escenario: EscenarioCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def update_escenario(escenario_id: int, escenario: EscenarioCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     db_escenario = db.query(Escenario).filter(Escenario.id == escenario_id).first()
     if not db_escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    caso_uso_anterior = db_escenario.caso_uso_id
     db_escenario.nombre = escenario.nombre
     db_escenario.descripcion = escenario.descripcion
     db_escenario.tipo = escenario.tipo
     db_escenario.caso_uso_id = escenario.caso_uso_id
     db_escenario.resultado_esperado = escenario.resultado_esperado
     db.commit()
+    invalidar_documentos(db, caso_uso_anterior, db_escenario.caso_uso_id, escenario_id=escenario_id,
+                         accion="actualizado")
     db.refresh(db_escenario)
     return db_escenario
 
 @router.delete("/{escenario_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_escenario(escenario_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def delete_escenario(escenario_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     db_escenario = db.query(Escenario).filter(Escenario.id == escenario_id).first()
     if not db_escenario:
         raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    caso_uso_id = db_escenario.caso_uso_id
     db.delete(db_escenario)
     db.commit()
+    invalidar_documentos(db, caso_uso_id, escenario_id=escenario_id, accion="borrado")
     return None
+
+def _proyecto_del_usuario(db: Session, project_id: int, current_user: Principal):
+    project = db.query(Proyecto).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    return project
+
+@proyectos_router.get("/{project_id}/escenarios", response_model=List[EscenarioResponse])
+def listar_escenarios_proyecto(project_id: int, response: Response, tipo: Optional[str] = None,
+                               pag: Paginacion = Depends(),
+                               db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    _proyecto_del_usuario(db, project_id, current_user)
+    query = db.query(*listado.columnas).join(CasoUso, Escenario.caso_uso_id == CasoUso.id).filter(
+        CasoUso.proyecto_id == project_id
+    )
+    if tipo is not None:
+        query = query.filter(Escenario.tipo == filtro_enum(TipoEscenarioEnum, tipo))
+    filas = paginar(query, Escenario, pag, response, ordenables=("id", "fecha_actualizacion"))
+    return listado.respuesta(filas, response)
+
+@proyectos_router.get("/{project_id}/casos_uso/{caso_uso_id}/escenarios", response_model=List[EscenarioResponse])
+def listar_escenarios_caso_uso(project_id: int, caso_uso_id: int, response: Response, tipo: Optional[str] = None,
+                               pag: Paginacion = Depends(),
+                               db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    _proyecto_del_usuario(db, project_id, current_user)
+    caso = db.query(CasoUso.id).filter(
+        CasoUso.id == caso_uso_id,
+        CasoUso.proyecto_id == project_id
+    ).first()
+    if not caso:
+        raise HTTPException(status_code=404, detail="Caso de uso no encontrado en este proyecto")
+    query = db.query(*listado.columnas).filter(Escenario.caso_uso_id == caso_uso_id)
+    if tipo is not None:
+        query = query.filter(Escenario.tipo == filtro_enum(TipoEscenarioEnum, tipo))
+    filas = paginar(query, Escenario, pag, response, ordenables=("id", "fecha_actualizacion"))
+    return listado.respuesta(filas, response)
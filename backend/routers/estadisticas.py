@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto, EstadisticaProyecto, EstadoProyectoEnum
+from ..schemas import EstadisticasProyectoResponse, EstadisticasUsuarioResponse
+from ..estadisticas import resumen
+
+router = APIRouter(tags=["Estadísticas"])
+# Estadísticas de todos los proyectos del usuario (montado bajo /stats)
+espacio_router = APIRouter(tags=["Estadísticas"])
+
+
+@router.get("/{project_id}/stats", response_model=EstadisticasProyectoResponse)
+def estadisticas_proyecto(project_id: int,
+                          db: Session = Depends(get_db),
+                          current_user: Principal = Depends(get_current_user)):
+    project = db.query(Proyecto.id).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    # Rango de la clave primaria (proyecto_id, dimension, valor)
+    filas = db.execute(
+        select(EstadisticaProyecto.dimension, EstadisticaProyecto.valor, EstadisticaProyecto.total)
+        .where(EstadisticaProyecto.proyecto_id == project.id)
+    )
+    return {"proyecto_id": project.id, **resumen(filas)}
+
+
+@espacio_router.get("", response_model=EstadisticasUsuarioResponse)
+def estadisticas_usuario(db: Session = Depends(get_db),
+                         current_user: Principal = Depends(get_current_user)):
+    por_estado = dict.fromkeys((e.value for e in EstadoProyectoEnum), 0)
+    for estado, total in db.execute(
+        select(Proyecto.estado, func.count()).where(Proyecto.usuario_id == current_user.id).group_by(Proyecto.estado)
+    ):
+        por_estado[estado.value] = total
+    filas = db.execute(
+        select(EstadisticaProyecto.dimension, EstadisticaProyecto.valor,
+               func.sum(EstadisticaProyecto.total).label("total"))
+        .join(Proyecto, Proyecto.id == EstadisticaProyecto.proyecto_id)
+        .where(Proyecto.usuario_id == current_user.id)
+        .group_by(EstadisticaProyecto.dimension, EstadisticaProyecto.valor)
+    )
+    return {"total_proyectos": sum(por_estado.values()), "proyectos_por_estado": por_estado, **resumen(filas)}
@@ -0,0 +1,46 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from fastapi.security import OAuth2PasswordBearer
+from starlette.concurrency import run_in_threadpool
+from .dependencies import get_current_user
+from ..database import SessionLocal
+from ..models import Proyecto
+from ..eventos import broker, formatear
+from .. import cambios
+
+router = APIRouter(tags=["Eventos"])
+# EventSource no permite enviar cabeceras: el token se acepta también como ?access_token=
+oauth2_opcional = OAuth2PasswordBearer(tokenUrl="/auth/login", auto_error=False)
+
+
+def _cursor_inicial(token: str, project_id: int) -> int:
+    # Sesión corta: una conexión de eventos abierta no retiene conexión a la base de datos
+    with SessionLocal() as db:
+        current_user = get_current_user(token, db)
+        project = db.query(Proyecto.id).filter(
+            Proyecto.id == project_id,
+            Proyecto.usuario_id == current_user.id
+        ).first()
+        if not project:
+            raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+        return cambios.ultimo(db, project.id)
+
+
+@router.get("/{project_id}/events")
+async def eventos_proyecto(project_id: int,
+                           token: Optional[str] = Depends(oauth2_opcional),
+                           access_token: Optional[str] = Query(None)):
+    token = token or access_token
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    cursor = await run_in_threadpool(_cursor_inicial, token, project_id)
+    if broker.completo:
+        raise HTTPException(status_code=503, detail="Demasiadas conexiones de eventos abiertas",
+                            headers={"Retry-After": "30"})
+    # El primer evento trae el cursor del registro de cambios desde el que sincronizar
+    return StreamingResponse(
+        broker.flujo(project_id, formatear("conectado", {"cursor": cursor})),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
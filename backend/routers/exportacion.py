@@ -0,0 +1,70 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Header, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from .dependencies import get_db, get_current_user, Principal
+from ..database import SessionLocal
+from ..models import Proyecto
+from ..exportacion import FORMATOS, generar_documento
+from ..volcado import generar_volcado
+from .. import cache_documentos
+
+router = APIRouter(tags=["Exportación"])
+# Volcado de todo el espacio de trabajo del usuario (montado bajo /export)
+espacio_router = APIRouter(tags=["Exportación"])
+
+
+def _generar_con_sesion(project_id: int, formato: str):
+    # La sesión de la petición se cierra antes de que termine el streaming,
+    # así que el generador abre la suya propia.
+    with SessionLocal() as db:
+        yield from generar_documento(db, project_id, formato)
+
+
+def _volcado_con_sesion(usuario_id: int):
+    with SessionLocal() as db:
+        yield from generar_volcado(db, usuario_id)
+
+
+@router.get("/{project_id}/export")
+def exportar_proyecto(project_id: int,
+                      formato: str = Query("md", alias="format", pattern="^(md|html|docx|pdf)$"),
+                      if_none_match: Optional[str] = Header(None),
+                      db: Session = Depends(get_db),
+                      current_user: Principal = Depends(get_current_user)):
+    project = db.query(Proyecto).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+
+    media_type, extension = FORMATOS[formato]
+    etag = cache_documentos.calcular_etag(cache_documentos.version_proyecto(db, project.id), formato)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f'attachment; filename="proyecto_{project.id}.{extension}"',
+    }
+    if cache_documentos.etag_coincide(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
+
+    en_cache = cache_documentos.cache.obtener(etag)
+    if isinstance(en_cache, bytes):
+        return Response(en_cache, media_type=media_type, headers=headers)
+    if en_cache is not None:
+        return StreamingResponse(cache_documentos.leer_fichero(en_cache), media_type=media_type, headers=headers)
+    return StreamingResponse(
+        cache_documentos.cache.guardar_en_streaming(etag, project.id, _generar_con_sesion(project.id, formato)),
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@espacio_router.get("/dump")
+def volcar_espacio(current_user: Principal = Depends(get_current_user)):
+    return StreamingResponse(
+        _volcado_con_sesion(current_user.id),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="volcado_{current_user.username}.ndjson"'},
+    )
@@ -0,0 +1,101 @@
+import io
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto
+from ..importacion import Importador, leer_csv, leer_ndjson
+from .. import cache_documentos
+
+router = APIRouter(tags=["Importación"])
+# Importación de un espacio de trabajo completo (montado bajo /import)
+espacio_router = APIRouter(tags=["Importación"])
+
+
+def _importar(db: Session, importador: Importador, fichero, formato: str, atomico: bool):
+    texto = io.TextIOWrapper(fichero, encoding="utf-8-sig", newline="" if formato == "csv" else None)
+    try:
+        importador.procesar(leer_csv(texto) if formato == "csv" else leer_ndjson(texto))
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="El cuerpo debe estar codificado en UTF-8")
+    except Exception:
+        db.rollback()
+        raise
+    if atomico and importador.total_errores:
+        db.rollback()
+        raise HTTPException(status_code=422, detail=importador.resumen())
+    db.commit()
+    if importador.usuario_id is None:
+        cache_documentos.invalidar_proyecto(importador.proyecto_id)
+    return importador.resumen()
+
+
+def _proyecto_del_usuario(db: Session, project_id: int, usuario_id: int):
+    project = db.query(Proyecto.id).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == usuario_id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    return project.id
+
+
+def _comprobar_proyecto(db: Session, project_id: int, usuario_id: int):
+    # Antes de leer el cuerpo. La transacción se cierra para no retener la conexión
+    # mientras llega
+    try:
+        _proyecto_del_usuario(db, project_id, usuario_id)
+    finally:
+        db.rollback()
+
+
+def _importar_en_proyecto(db: Session, project_id: int, usuario_id: int, fichero, formato: str, atomico: bool):
+    # Se vuelve a comprobar: el proyecto puede haberse borrado mientras llegaba el cuerpo
+    proyecto_id = _proyecto_del_usuario(db, project_id, usuario_id)
+    return _importar(db, Importador(db, proyecto_id=proyecto_id), fichero, formato, atomico)
+
+
+async def _volcar_cuerpo(request: Request, fichero):
+    # Las escrituras en disco se hacen en el threadpool para no bloquear el bucle de eventos
+    async for trozo in request.stream():
+        await run_in_threadpool(fichero.write, trozo)
+    fichero.seek(0)
+
+
+def _formato(request: Request, formato: Optional[str]):
+    if formato is None:
+        formato = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    return formato
+
+
+@router.post("/{project_id}/import")
+async def importar_proyecto(project_id: int, request: Request,
+                            formato: Optional[str] = Query(None, alias="format", pattern="^(ndjson|csv)$"),
+                            atomico: bool = Query(False, description="Si hay errores no se inserta ninguna fila"),
+                            db: Session = Depends(get_db),
+                            current_user: Principal = Depends(get_current_user)):
+    # El cuerpo se vuelca a un temporal mientras llega; después se procesa fila a fila
+    formato = _formato(request, formato)
+    await run_in_threadpool(_comprobar_proyecto, db, project_id, current_user.id)
+    with tempfile.TemporaryFile() as fichero:
+        await _volcar_cuerpo(request, fichero)
+        return await run_in_threadpool(_importar_en_proyecto, db, project_id, current_user.id,
+                                       fichero, formato, atomico)
+
+
+@espacio_router.post("/dump")
+async def importar_volcado(request: Request,
+                           atomico: bool = Query(False, description="Si hay errores no se inserta ninguna fila"),
+                           db: Session = Depends(get_db),
+                           current_user: Principal = Depends(get_current_user)):
+    # Recrea los proyectos de un volcado de GET /export/dump para el usuario actual. Los
+    # nombres de los proyectos vienen en el cuerpo, así que los conflictos se detectan fila
+    # a fila al procesarlo; solo se libera antes la conexión que haya usado la autenticación
+    await run_in_threadpool(db.rollback)
+    with tempfile.TemporaryFile() as fichero:
+        await _volcar_cuerpo(request, fichero)
+        importador = Importador(db, usuario_id=current_user.id)
+        return await run_in_threadpool(_importar, db, importador, fichero, "ndjson", atomico)
@@ -1,36 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from .dependencies import get_db
-from ..models import Proyecto, Usuario
-from ..schemas import ProyectoResponse, ProyectoCreate
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from ..security import SECRET_KEY, ALGORITHM
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import or_
+from sqlalchemy.orm import Session, selectinload
+from typing import List, Optional
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto, CasoUso, Actor, EstadoProyectoEnum
+from ..schemas import ProyectoResponse, ProyectoCreate, ProyectoBundleResponse
+from .. import cache_documentos, purga
+from ..paginacion import Paginacion, paginar, filtro_enum
+from ..serializacion import Listado
 
 router = APIRouter( tags=["Proyectos"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
-
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+listado = Listado(Proyecto, ProyectoResponse)
 
 @router.get("/", response_model=List[ProyectoResponse])
-def get_projects(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    proyectos = db.query(Proyecto).filter(Proyecto.usuario_id == current_user.id).all()
-    return proyectos
+def get_projects(response: Response, estado: Optional[str] = None, pag: Paginacion = Depends(),
+                 db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    query = db.query(*listado.columnas).filter(Proyecto.usuario_id == current_user.id)
+    if estado is not None:
+        query = query.filter(Proyecto.estado == filtro_enum(EstadoProyectoEnum, estado))
+    filas = paginar(query, Proyecto, pag, response, ordenables=("id", "fecha_actualizacion"))
+    return listado.respuesta(filas, response)
 
 @router.post("/", response_model=ProyectoResponse, status_code=status.HTTP_201_CREATED)
-def create_project(proyecto: ProyectoCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def create_project(proyecto: ProyectoCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     nuevo_proyecto = Proyecto(
         nombre=proyecto.nombre,
         descripcion=proyecto.descripcion,
@@ -43,7 +35,7 @@ def create_project(proyecto: ProyectoCreate, db: Session = Depends(get_db), curr
     return nuevo_proyecto
 
 @router.get("/{project_id}", response_model=ProyectoResponse)
-def get_project(project_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def get_project(project_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
@@ -52,8 +44,28 @@ def get_project(project_id: int, db: Session = Depends(get_db), current_user: Us
         raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
     return project
 
+@router.get("/{project_id}/bundle", response_model=ProyectoBundleResponse)
+def get_project_bundle(project_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    # Número fijo de consultas: proyecto + una SELECT ... IN por cada colección + actores
+    project = db.query(Proyecto).options(
+        selectinload(Proyecto.requisitos),
+        selectinload(Proyecto.casos_uso).selectinload(CasoUso.escenarios)
+    ).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    return {
+        "proyecto": project,
+        "requisitos": project.requisitos,
+        "casos_uso": project.casos_uso,
+        "escenarios": [e for cu in project.casos_uso for e in cu.escenarios],
+        "actores": db.query(Actor).filter(or_(Actor.proyecto_id.is_(None), Actor.proyecto_id == project.id)).all(),
+    }
+
 @router.put("/{project_id}", response_model=ProyectoResponse)
-def update_project(project_id: int, proyecto: ProyectoCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def update_project(project_id: int, proyecto: ProyectoCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
     db_proj = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
@@ -64,17 +76,21 @@ def update_project(project_id: int, proyecto: ProyectoCreate, db: Session = Depe
     db_proj.descripcion = proyecto.descripcion
     db_proj.estado = proyecto.estado
     db.commit()
+    cache_documentos.invalidar_proyecto(project_id)
     db.refresh(db_proj)
     return db_proj
 
-@router.delete("/{project_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_project(project_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    db_proj = db.query(Proyecto).filter(
+@router.delete("/{project_id}", status_code=status.HTTP_202_ACCEPTED)
+def delete_project(project_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    db_proj = db.query(Proyecto.id).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
     ).first()
     if not db_proj:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
-    db.delete(db_proj)
+    # El proyecto desaparece ya; sus requisitos, casos de uso y escenarios se purgan en segundo plano
+    purga.programar_proyecto(db, project_id)
     db.commit()
-    return None
+    purga.purgador.avisar()
+    cache_documentos.invalidar_proyecto(project_id)
+    return {"detail": "Proyecto eliminado; sus datos se purgarán en segundo plano"}
@@ -1,50 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
-from .dependencies import get_db
-from ..models import RelacionRequisito, Usuario
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto, Requisito, CasoUso, RelacionRequisito
 from ..schemas import RelacionRequisitoResponse, RelacionRequisitoCreate
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from ..security import SECRET_KEY, ALGORITHM
+from .. import cache_documentos
+from ..paginacion import Paginacion, paginar
 
 router = APIRouter(prefix="/relaciones", tags=["Relaciones"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+def _relaciones_del_usuario(db: Session, current_user: Principal):
+    return db.query(RelacionRequisito).join(
+        Requisito, Requisito.id == RelacionRequisito.requisito_id
+    ).join(Proyecto, Proyecto.id == Requisito.proyecto_id).filter(Proyecto.usuario_id == current_user.id)
 
 @router.get("/", response_model=List[RelacionRequisitoResponse])
-def get_relaciones(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    return db.query(RelacionRequisito).all()
+def get_relaciones(response: Response, pag: Paginacion = Depends(),
+                   db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    return paginar(_relaciones_del_usuario(db, current_user), RelacionRequisito, pag, response)
 
 @router.post("/", response_model=RelacionRequisitoResponse, status_code=status.HTTP_201_CREATED)
-def create_relacion(relacion: RelacionRequisitoCreate, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+def create_relacion(relacion: RelacionRequisitoCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    requisito = db.query(Requisito.proyecto_id).join(Proyecto).filter(
+        Requisito.id == relacion.requisito_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not requisito:
+        raise HTTPException(status_code=404, detail="Requisito no encontrado")
+    caso = db.query(CasoUso.id).filter(
+        CasoUso.id == relacion.caso_uso_id,
+        CasoUso.proyecto_id == requisito.proyecto_id
+    ).first()
+    if not caso:
+        raise HTTPException(status_code=400, detail="El caso de uso no pertenece al proyecto del requisito")
     nuevo_relacion = RelacionRequisito(
         requisito_id=relacion.requisito_id,
         caso_uso_id=relacion.caso_uso_id
     )
     db.add(nuevo_relacion)
     db.commit()
+    cache_documentos.invalidar_proyecto(requisito.proyecto_id)
     db.refresh(nuevo_relacion)
     return nuevo_relacion
 
 @router.delete("/{relacion_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_relacion(relacion_id: int, db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
-    relacion = db.query(RelacionRequisito).filter(RelacionRequisito.id == relacion_id).first()
+def delete_relacion(relacion_id: int, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    relacion = _relaciones_del_usuario(db, current_user).filter(RelacionRequisito.id == relacion_id).first()
     if not relacion:
         raise HTTPException(status_code=404, detail="Relación no encontrada")
+    proyecto_id = relacion.requisito.proyecto_id
     db.delete(relacion)
     db.commit()
+    cache_documentos.invalidar_proyecto(proyecto_id)
     return None
-
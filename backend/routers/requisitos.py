@@ -1,45 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from typing import List
-from .dependencies import get_db
-from ..models import Proyecto, Requisito, Usuario
-from ..schemas import RequisitoResponse, RequisitoCreate
-from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
-from ..security import SECRET_KEY, ALGORITHM
+from typing import List, Optional
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto, Requisito, EstadoRequisitoEnum, TipoRequisitoEnum
+from ..schemas import RequisitoResponse, RequisitoCreate, RequisitoNodoResponse
+from .. import cache_documentos, eventos, purga
+from ..paginacion import Paginacion, paginar, filtro_enum
+from ..serializacion import Listado
+from ..jerarquia import (PROFUNDIDAD_MAXIMA, consulta_subarbol, consulta_ancestros, consulta_padre,
+                         aplicar_profundidad)
 
 router = APIRouter(tags=["Requisitos"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
+listado = Listado(Requisito, RequisitoResponse)
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-    except JWTError:
-        raise HTTPException(status_code=401, detail="Token inválido")
-    user = db.query(Usuario).filter(Usuario.username == username).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
-    return user
+def validar_padre(db: Session, project_id: int, requisito_id: Optional[int], padre_id: Optional[int]):
+    if padre_id is None:
+        return
+    encontrados, ciclo = db.execute(consulta_padre(project_id, requisito_id, padre_id)).one()
+    if not encontrados:
+        raise HTTPException(status_code=400, detail="El requisito padre no existe en el proyecto")
+    if ciclo:
+        raise HTTPException(status_code=400, detail="El requisito padre crearía un ciclo en la jerarquía")
 
 @router.get("/{project_id}/requisitos", response_model=List[RequisitoResponse])
 def listar_requisitos(project_id: int,
+                      response: Response,
+                      estado: Optional[str] = None,
+                      tipo: Optional[str] = None,
+                      prioridad: Optional[int] = None,
+                      pag: Paginacion = Depends(),
                       db: Session = Depends(get_db),
-                      current_user: Usuario = Depends(get_current_user)):
+                      current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
     ).first()
     if not project:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
-    return project.requisitos
+    query = db.query(*listado.columnas).filter(Requisito.proyecto_id == project.id)
+    if estado is not None:
+        query = query.filter(Requisito.estado == filtro_enum(EstadoRequisitoEnum, estado))
+    if tipo is not None:
+        query = query.filter(Requisito.tipo == filtro_enum(TipoRequisitoEnum, tipo))
+    if prioridad is not None:
+        query = query.filter(Requisito.prioridad == prioridad)
+    filas = paginar(query, Requisito, pag, response, ordenables=("id", "fecha_actualizacion", "prioridad"))
+    return listado.respuesta(filas, response)
 
 @router.get("/{project_id}/requisitos/{requisito_id}", response_model=RequisitoResponse)
 def obtener_requisito(project_id: int, requisito_id: int,
                       db: Session = Depends(get_db),
-                      current_user: Usuario = Depends(get_current_user)):
+                      current_user: Principal = Depends(get_current_user)):
     requisito = db.query(Requisito).join(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id,
@@ -49,16 +60,50 @@ def obtener_requisito(project_id: int, requisito_id: int,
         raise HTTPException(status_code=404, detail="Requisito no encontrado")
     return requisito
 
+@router.get("/{project_id}/requisitos/{requisito_id}/subtree", response_model=List[RequisitoNodoResponse])
+def subarbol_requisito(project_id: int, requisito_id: int,
+                       profundidad: Optional[int] = Query(None, ge=0, le=PROFUNDIDAD_MAXIMA,
+                                                          description="Niveles máximos por debajo del requisito"),
+                       db: Session = Depends(get_db),
+                       current_user: Principal = Depends(get_current_user)):
+    project = db.query(Proyecto).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    filas = db.execute(consulta_subarbol(project.id, requisito_id, profundidad if profundidad is not None else PROFUNDIDAD_MAXIMA)).all()
+    if not filas:
+        raise HTTPException(status_code=404, detail="Requisito no encontrado")
+    return aplicar_profundidad(filas)
+
+@router.get("/{project_id}/requisitos/{requisito_id}/ancestors", response_model=List[RequisitoNodoResponse])
+def ancestros_requisito(project_id: int, requisito_id: int,
+                        profundidad: Optional[int] = Query(None, ge=1, le=PROFUNDIDAD_MAXIMA,
+                                                           description="Niveles máximos por encima del requisito"),
+                        db: Session = Depends(get_db),
+                        current_user: Principal = Depends(get_current_user)):
+    requisito = db.query(Requisito.id).join(Proyecto).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id,
+        Requisito.id == requisito_id
+    ).first()
+    if not requisito:
+        raise HTTPException(status_code=404, detail="Requisito no encontrado")
+    filas = db.execute(consulta_ancestros(project_id, requisito_id, profundidad if profundidad is not None else PROFUNDIDAD_MAXIMA)).all()
+    return aplicar_profundidad(filas)
+
 @router.post("/{project_id}/requisitos", response_model=RequisitoResponse, status_code=status.HTTP_201_CREATED)
 def crear_requisito(project_id: int, req: RequisitoCreate,
                     db: Session = Depends(get_db),
-                    current_user: Usuario = Depends(get_current_user)):
+                    current_user: Principal = Depends(get_current_user)):
     project = db.query(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id
     ).first()
     if not project:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+    validar_padre(db, project.id, None, req.requisito_padre_id)
     nuevo = Requisito(
         nombre=req.nombre,
         descripcion=req.descripcion,
@@ -73,13 +118,15 @@ def crear_requisito(project_id: int, req: RequisitoCreate,
     )
     db.add(nuevo)
     db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
     db.refresh(nuevo)
+    eventos.publicar(project.id, "requisitos", nuevo.id, "creado")
     return nuevo
 
 @router.put("/{project_id}/requisitos/{requisito_id}", response_model=RequisitoResponse)
 def actualizar_requisito(project_id: int, requisito_id: int, req: RequisitoCreate,
                          db: Session = Depends(get_db),
-                         current_user: Usuario = Depends(get_current_user)):
+                         current_user: Principal = Depends(get_current_user)):
     db_req = db.query(Requisito).join(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id,
@@ -87,6 +134,8 @@ def actualizar_requisito(project_id: int, requisito_id: int, req: RequisitoCreat
     ).first()
     if not db_req:
         raise HTTPException(status_code=404, detail="Requisito no encontrado")
+    if req.requisito_padre_id != db_req.requisito_padre_id:
+        validar_padre(db, project_id, requisito_id, req.requisito_padre_id)
     db_req.nombre = req.nombre
     db_req.descripcion = req.descripcion
     db_req.tipo = req.tipo
@@ -97,20 +146,26 @@ def actualizar_requisito(project_id: int, requisito_id: int, req: RequisitoCreat
     db_req.version = req.version
     db_req.requisito_padre_id = req.requisito_padre_id
     db.commit()
+    cache_documentos.invalidar_proyecto(project_id)
     db.refresh(db_req)
+    eventos.publicar(project_id, "requisitos", requisito_id, "actualizado")
     return db_req
 
-@router.delete("/{project_id}/requisitos/{requisito_id}", status_code=status.HTTP_204_NO_CONTENT)
+@router.delete("/{project_id}/requisitos/{requisito_id}", status_code=status.HTTP_202_ACCEPTED)
 def eliminar_requisito(project_id: int, requisito_id: int,
                        db: Session = Depends(get_db),
-                       current_user: Usuario = Depends(get_current_user)):
-    db_req = db.query(Requisito).join(Proyecto).filter(
+                       current_user: Principal = Depends(get_current_user)):
+    db_req = db.query(Requisito.id).join(Proyecto).filter(
         Proyecto.id == project_id,
         Proyecto.usuario_id == current_user.id,
         Requisito.id == requisito_id
     ).first()
     if not db_req:
         raise HTTPException(status_code=404, detail="Requisito no encontrado")
-    db.delete(db_req)
+    # La rama (dependientes y sus casos de uso) sale del proyecto ya y se purga en segundo plano
+    purga.programar_requisito(db, project_id, requisito_id)
     db.commit()
-    return None
+    purga.purgador.avisar()
+    cache_documentos.invalidar_proyecto(project_id)
+    eventos.publicar(project_id, "requisitos", requisito_id, "borrado")
+    return {"detail": "Requisito eliminado; sus dependientes se purgarán en segundo plano"}
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from .dependencies import get_db, get_current_user, Principal
+from ..models import Proyecto
+from ..schemas import MatrizTrazabilidadResponse
+from ..trazabilidad import cache_matrices
+
+router = APIRouter(tags=["Trazabilidad"])
+
+
+@router.get("/{project_id}/traceability", response_model=MatrizTrazabilidadResponse)
+def matriz_trazabilidad(project_id: int,
+                        db: Session = Depends(get_db),
+                        current_user: Principal = Depends(get_current_user)):
+    project = db.query(Proyecto.id, Proyecto.version_contenido).filter(
+        Proyecto.id == project_id,
+        Proyecto.usuario_id == current_user.id
+    ).first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    return cache_matrices.obtener(db, project.id, project.version_contenido)
@@ -0,0 +1,112 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db
+from ..routers.dependencies import get_current_user_async, Principal
+from ..models import CasoUso, EstadoCasoUsoEnum, CategoriaCasoUsoEnum
+from ..schemas import CasoUsoResponse, CasoUsoCreate
+from .. import cache_documentos, eventos
+from ..actores import sincronizar
+from ..paginacion import Paginacion, paginar_async, filtro_enum
+from ..serializacion import Listado
+from .comun import proyecto_del_usuario, borrar_en_cascada
+
+router = APIRouter(tags=["Casos de Uso"])
+listado = Listado(CasoUso, CasoUsoResponse)
+
+async def _caso_uso_del_proyecto(db: AsyncSession, project_id: int, caso_uso_id: int):
+    resultado = await db.execute(
+        select(CasoUso).where(CasoUso.id == caso_uso_id, CasoUso.proyecto_id == project_id)
+    )
+    caso = resultado.scalars().first()
+    if not caso:
+        raise HTTPException(status_code=404, detail="Caso de uso no encontrado en este proyecto")
+    return caso
+
+@router.get("/{project_id}/casos_uso", response_model=List[CasoUsoResponse])
+async def listar_casos_uso(project_id: int, response: Response,
+                           estado: Optional[str] = None, categoria: Optional[str] = None,
+                           pag: Paginacion = Depends(),
+                           db: AsyncSession = Depends(get_async_db),
+                           current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user)
+    stmt = select(*listado.columnas).where(CasoUso.proyecto_id == project.id)
+    if estado is not None:
+        stmt = stmt.where(CasoUso.estado == filtro_enum(EstadoCasoUsoEnum, estado))
+    if categoria is not None:
+        stmt = stmt.where(CasoUso.categoria == filtro_enum(CategoriaCasoUsoEnum, categoria))
+    filas = await paginar_async(db, stmt, CasoUso, pag, response, ordenables=("id", "fecha_actualizacion"),
+                                columnas=True)
+    return listado.respuesta(filas, response)
+
+@router.get("/{project_id}/casos_uso/{caso_uso_id}", response_model=CasoUsoResponse)
+async def obtener_caso_uso(project_id: int, caso_uso_id: int,
+                           db: AsyncSession = Depends(get_async_db),
+                           current_user: Principal = Depends(get_current_user_async)):
+    await proyecto_del_usuario(db, project_id, current_user)
+    return await _caso_uso_del_proyecto(db, project_id, caso_uso_id)
+
+@router.post("/{project_id}/casos_uso", response_model=CasoUsoResponse, status_code=status.HTTP_201_CREATED)
+async def crear_caso_uso(project_id: int, cu: CasoUsoCreate,
+                         db: AsyncSession = Depends(get_async_db),
+                         current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user)
+    nuevo_caso = CasoUso(
+        titulo=cu.titulo,
+        descripcion=cu.descripcion,
+        actores=cu.actores,
+        precondiciones=cu.precondiciones,
+        postcondiciones=cu.postcondiciones,
+        flujo_normal=cu.flujo_normal,
+        flujo_alternativo=cu.flujo_alternativo,
+        categoria=cu.categoria,
+        estado=cu.estado,
+        requisito_id=cu.requisito_id,
+        proyecto_id=project.id
+    )
+    db.add(nuevo_caso)
+    await db.flush()
+    await db.run_sync(lambda sesion: sincronizar(sesion, [nuevo_caso.id]))
+    await db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
+    await db.refresh(nuevo_caso)
+    eventos.publicar(project.id, "casos_uso", nuevo_caso.id, "creado")
+    return nuevo_caso
+
+@router.put("/{project_id}/casos_uso/{caso_uso_id}", response_model=CasoUsoResponse)
+async def actualizar_caso_uso(project_id: int, caso_uso_id: int, cu: CasoUsoCreate,
+                              db: AsyncSession = Depends(get_async_db),
+                              current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user)
+    db_caso = await _caso_uso_del_proyecto(db, project.id, caso_uso_id)
+    cambian_actores = cu.actores != db_caso.actores
+    db_caso.titulo = cu.titulo
+    db_caso.descripcion = cu.descripcion
+    db_caso.actores = cu.actores
+    db_caso.precondiciones = cu.precondiciones
+    db_caso.postcondiciones = cu.postcondiciones
+    db_caso.flujo_normal = cu.flujo_normal
+    db_caso.flujo_alternativo = cu.flujo_alternativo
+    db_caso.categoria = cu.categoria
+    db_caso.estado = cu.estado
+    db_caso.requisito_id = cu.requisito_id
+    if cambian_actores:
+        await db.flush()
+        await db.run_sync(lambda sesion: sincronizar(sesion, [db_caso.id]))
+    await db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
+    await db.refresh(db_caso)
+    eventos.publicar(project.id, "casos_uso", caso_uso_id, "actualizado")
+    return db_caso
+
+@router.delete("/{project_id}/casos_uso/{caso_uso_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def eliminar_caso_uso(project_id: int, caso_uso_id: int,
+                            db: AsyncSession = Depends(get_async_db),
+                            current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user)
+    db_caso = await _caso_uso_del_proyecto(db, project.id, caso_uso_id)
+    await borrar_en_cascada(db, db_caso)
+    cache_documentos.invalidar_proyecto(project.id)
+    eventos.publicar(project.id, "casos_uso", caso_uso_id, "borrado")
+    return None
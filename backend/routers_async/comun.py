@@ -0,0 +1,23 @@
+# Utilidades compartidas por los routers asíncronos (modo DB_ASYNC=1)
+from fastapi import HTTPException
+from sqlalchemy import select
+from ..models import Proyecto
+from ..routers.dependencies import Principal
+
+
+async def proyecto_del_usuario(db, project_id: int, current_user: Principal,
+                               detalle: str = "Proyecto no encontrado o no te pertenece"):
+    resultado = await db.execute(
+        select(Proyecto).where(Proyecto.id == project_id, Proyecto.usuario_id == current_user.id)
+    )
+    project = resultado.scalars().first()
+    if not project:
+        raise HTTPException(status_code=404, detail=detalle)
+    return project
+
+
+async def borrar_en_cascada(db, objeto):
+    # El borrado en cascada del ORM carga los hijos de forma perezosa, algo que
+    # AsyncSession no permite; run_sync lo ejecuta sobre la Session síncrona subyacente.
+    await db.run_sync(lambda sesion: sesion.delete(objeto))
+    await db.commit()
@@ -0,0 +1,122 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db
+from ..routers.dependencies import get_current_user_async, Principal
+from ..models import Escenario, CasoUso, TipoEscenarioEnum
+from ..schemas import EscenarioResponse, EscenarioCreate
+from .. import cache_documentos, eventos
+from ..paginacion import Paginacion, paginar_async, filtro_enum
+from ..serializacion import Listado
+from .comun import proyecto_del_usuario
+
+router = APIRouter(tags=["Escenarios"])
+# Rutas de escenarios acotadas a un proyecto (se montan bajo /projects)
+proyectos_router = APIRouter(tags=["Escenarios"])
+listado = Listado(Escenario, EscenarioResponse)
+
+async def invalidar_documentos(db: AsyncSession, *caso_uso_ids: int, escenario_id: int, accion: str):
+    proyectos = await db.execute(
+        select(CasoUso.proyecto_id).where(CasoUso.id.in_(caso_uso_ids)).distinct()
+    )
+    for proyecto_id in proyectos.scalars():
+        cache_documentos.invalidar_proyecto(proyecto_id)
+        eventos.publicar(proyecto_id, "escenarios", escenario_id, accion)
+
+async def _escenario(db: AsyncSession, escenario_id: int):
+    escenario = await db.get(Escenario, escenario_id)
+    if not escenario:
+        raise HTTPException(status_code=404, detail="Escenario no encontrado")
+    return escenario
+
+@router.get("/", response_model=List[EscenarioResponse])
+async def get_escenarios(response: Response, tipo: Optional[str] = None, pag: Paginacion = Depends(),
+                         db: AsyncSession = Depends(get_async_db),
+                         current_user: Principal = Depends(get_current_user_async)):
+    stmt = select(*listado.columnas)
+    if tipo is not None:
+        stmt = stmt.where(Escenario.tipo == filtro_enum(TipoEscenarioEnum, tipo))
+    filas = await paginar_async(db, stmt, Escenario, pag, response, ordenables=("id", "fecha_actualizacion"),
+                                columnas=True)
+    return listado.respuesta(filas, response)
+
+@router.post("/", response_model=EscenarioResponse, status_code=status.HTTP_201_CREATED)
+async def create_escenario(escenario: EscenarioCreate, db: AsyncSession = Depends(get_async_db),
+                           current_user: Principal = Depends(get_current_user_async)):
+    nuevo_escenario = Escenario(
+        nombre=escenario.nombre,
+        descripcion=escenario.descripcion,
+        tipo=escenario.tipo,
+        caso_uso_id=escenario.caso_uso_id,
+        resultado_esperado=escenario.resultado_esperado
+    )
+    db.add(nuevo_escenario)
+    await db.commit()
+    await invalidar_documentos(db, nuevo_escenario.caso_uso_id, escenario_id=nuevo_escenario.id, accion="creado")
+    await db.refresh(nuevo_escenario)
+    return nuevo_escenario
+
+@router.get("/{escenario_id}", response_model=EscenarioResponse)
+async def get_escenario(escenario_id: int, db: AsyncSession = Depends(get_async_db),
+                        current_user: Principal = Depends(get_current_user_async)):
+    return await _escenario(db, escenario_id)
+
+@router.put("/{escenario_id}", response_model=EscenarioResponse)
+async def update_escenario(escenario_id: int, escenario: EscenarioCreate, db: AsyncSession = Depends(get_async_db),
+                           current_user: Principal = Depends(get_current_user_async)):
+    db_escenario = await _escenario(db, escenario_id)
+    caso_uso_anterior = db_escenario.caso_uso_id
+    db_escenario.nombre = escenario.nombre
+    db_escenario.descripcion = escenario.descripcion
+    db_escenario.tipo = escenario.tipo
+    db_escenario.caso_uso_id = escenario.caso_uso_id
+    db_escenario.resultado_esperado = escenario.resultado_esperado
+    await db.commit()
+    await invalidar_documentos(db, caso_uso_anterior, db_escenario.caso_uso_id, escenario_id=escenario_id,
+                               accion="actualizado")
+    await db.refresh(db_escenario)
+    return db_escenario
+
+@router.delete("/{escenario_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_escenario(escenario_id: int, db: AsyncSession = Depends(get_async_db),
+                           current_user: Principal = Depends(get_current_user_async)):
+    db_escenario = await _escenario(db, escenario_id)
+    caso_uso_id = db_escenario.caso_uso_id
+    await db.delete(db_escenario)
+    await db.commit()
+    await invalidar_documentos(db, caso_uso_id, escenario_id=escenario_id, accion="borrado")
+    return None
+
+@proyectos_router.get("/{project_id}/escenarios", response_model=List[EscenarioResponse])
+async def listar_escenarios_proyecto(project_id: int, response: Response, tipo: Optional[str] = None,
+                                     pag: Paginacion = Depends(),
+                                     db: AsyncSession = Depends(get_async_db),
+                                     current_user: Principal = Depends(get_current_user_async)):
+    await proyecto_del_usuario(db, project_id, current_user)
+    stmt = select(*listado.columnas).join(CasoUso, Escenario.caso_uso_id == CasoUso.id).where(
+        CasoUso.proyecto_id == project_id
+    )
+    if tipo is not None:
+        stmt = stmt.where(Escenario.tipo == filtro_enum(TipoEscenarioEnum, tipo))
+    filas = await paginar_async(db, stmt, Escenario, pag, response, ordenables=("id", "fecha_actualizacion"),
+                                columnas=True)
+    return listado.respuesta(filas, response)
+
+@proyectos_router.get("/{project_id}/casos_uso/{caso_uso_id}/escenarios", response_model=List[EscenarioResponse])
+async def listar_escenarios_caso_uso(project_id: int, caso_uso_id: int, response: Response, tipo: Optional[str] = None,
+                                     pag: Paginacion = Depends(),
+                                     db: AsyncSession = Depends(get_async_db),
+                                     current_user: Principal = Depends(get_current_user_async)):
+    await proyecto_del_usuario(db, project_id, current_user)
+    caso = await db.execute(
+        select(CasoUso.id).where(CasoUso.id == caso_uso_id, CasoUso.proyecto_id == project_id)
+    )
+    if caso.first() is None:
+        raise HTTPException(status_code=404, detail="Caso de uso no encontrado en este proyecto")
+    stmt = select(*listado.columnas).where(Escenario.caso_uso_id == caso_uso_id)
+    if tipo is not None:
+        stmt = stmt.where(Escenario.tipo == filtro_enum(TipoEscenarioEnum, tipo))
+    filas = await paginar_async(db, stmt, Escenario, pag, response, ordenables=("id", "fecha_actualizacion"),
+                                columnas=True)
+    return listado.respuesta(filas, response)
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from typing import List, Optional
+from ..database import get_async_db
+from ..routers.dependencies import get_current_user_async, Principal
+from ..models import Proyecto, CasoUso, Actor, EstadoProyectoEnum
+from ..schemas import ProyectoResponse, ProyectoCreate, ProyectoBundleResponse
+from .. import cache_documentos, purga
+from ..paginacion import Paginacion, paginar_async, filtro_enum
+from ..serializacion import Listado
+from .comun import proyecto_del_usuario
+
+router = APIRouter(tags=["Proyectos"])
+listado = Listado(Proyecto, ProyectoResponse)
+
+@router.get("/", response_model=List[ProyectoResponse])
+async def get_projects(response: Response, estado: Optional[str] = None, pag: Paginacion = Depends(),
+                       db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user_async)):
+    stmt = select(*listado.columnas).where(Proyecto.usuario_id == current_user.id)
+    if estado is not None:
+        stmt = stmt.where(Proyecto.estado == filtro_enum(EstadoProyectoEnum, estado))
+    filas = await paginar_async(db, stmt, Proyecto, pag, response, ordenables=("id", "fecha_actualizacion"),
+                                columnas=True)
+    return listado.respuesta(filas, response)
+
+@router.post("/", response_model=ProyectoResponse, status_code=status.HTTP_201_CREATED)
+async def create_project(proyecto: ProyectoCreate, db: AsyncSession = Depends(get_async_db),
+                         current_user: Principal = Depends(get_current_user_async)):
+    nuevo_proyecto = Proyecto(
+        nombre=proyecto.nombre,
+        descripcion=proyecto.descripcion,
+        estado=proyecto.estado,
+        usuario_id=current_user.id
+    )
+    db.add(nuevo_proyecto)
+    await db.commit()
+    await db.refresh(nuevo_proyecto)
+    return nuevo_proyecto
+
+@router.get("/{project_id}", response_model=ProyectoResponse)
+async def get_project(project_id: int, db: AsyncSession = Depends(get_async_db),
+                      current_user: Principal = Depends(get_current_user_async)):
+    return await proyecto_del_usuario(db, project_id, current_user)
+
+@router.get("/{project_id}/bundle", response_model=ProyectoBundleResponse)
+async def get_project_bundle(project_id: int, db: AsyncSession = Depends(get_async_db),
+                             current_user: Principal = Depends(get_current_user_async)):
+    resultado = await db.execute(
+        select(Proyecto).options(
+            selectinload(Proyecto.requisitos),
+            selectinload(Proyecto.casos_uso).selectinload(CasoUso.escenarios)
+        ).where(Proyecto.id == project_id, Proyecto.usuario_id == current_user.id)
+    )
+    project = resultado.scalars().first()
+    if not project:
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado o no te pertenece")
+    actores = await db.execute(
+        select(Actor).where(or_(Actor.proyecto_id.is_(None), Actor.proyecto_id == project.id))
+    )
+    return {
+        "proyecto": project,
+        "requisitos": project.requisitos,
+        "casos_uso": project.casos_uso,
+        "escenarios": [e for cu in project.casos_uso for e in cu.escenarios],
+        "actores": list(actores.scalars()),
+    }
+
+@router.put("/{project_id}", response_model=ProyectoResponse)
+async def update_project(project_id: int, proyecto: ProyectoCreate, db: AsyncSession = Depends(get_async_db),
+                         current_user: Principal = Depends(get_current_user_async)):
+    db_proj = await proyecto_del_usuario(db, project_id, current_user)
+    db_proj.nombre = proyecto.nombre
+    db_proj.descripcion = proyecto.descripcion
+    db_proj.estado = proyecto.estado
+    await db.commit()
+    cache_documentos.invalidar_proyecto(project_id)
+    await db.refresh(db_proj)
+    return db_proj
+
+@router.delete("/{project_id}", status_code=status.HTTP_202_ACCEPTED)
+async def delete_project(project_id: int, db: AsyncSession = Depends(get_async_db),
+                         current_user: Principal = Depends(get_current_user_async)):
+    await proyecto_del_usuario(db, project_id, current_user)
+    # El proyecto desaparece ya; sus requisitos, casos de uso y escenarios se purgan en segundo plano
+    await db.run_sync(lambda sesion: purga.programar_proyecto(sesion, project_id))
+    await db.commit()
+    purga.purgador.avisar()
+    cache_documentos.invalidar_proyecto(project_id)
+    return {"detail": "Proyecto eliminado; sus datos se purgarán en segundo plano"}
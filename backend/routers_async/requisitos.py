@@ -0,0 +1,149 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from ..database import get_async_db
+from ..routers.dependencies import get_current_user_async, Principal
+from ..models import Proyecto, Requisito, EstadoRequisitoEnum, TipoRequisitoEnum
+from ..schemas import RequisitoResponse, RequisitoCreate, RequisitoNodoResponse
+from .. import cache_documentos, eventos, purga
+from ..paginacion import Paginacion, paginar_async, filtro_enum
+from ..serializacion import Listado
+from ..jerarquia import (PROFUNDIDAD_MAXIMA, consulta_subarbol, consulta_ancestros, consulta_padre,
+                         aplicar_profundidad)
+from .comun import proyecto_del_usuario
+
+router = APIRouter(tags=["Requisitos"])
+listado = Listado(Requisito, RequisitoResponse)
+
+async def validar_padre(db: AsyncSession, project_id: int, requisito_id: Optional[int], padre_id: Optional[int]):
+    if padre_id is None:
+        return
+    encontrados, ciclo = (await db.execute(consulta_padre(project_id, requisito_id, padre_id))).one()
+    if not encontrados:
+        raise HTTPException(status_code=400, detail="El requisito padre no existe en el proyecto")
+    if ciclo:
+        raise HTTPException(status_code=400, detail="El requisito padre crearía un ciclo en la jerarquía")
+
+async def _requisito_del_usuario(db: AsyncSession, project_id: int, requisito_id: int, current_user: Principal):
+    resultado = await db.execute(
+        select(Requisito).join(Proyecto).where(
+            Proyecto.id == project_id,
+            Proyecto.usuario_id == current_user.id,
+            Requisito.id == requisito_id
+        )
+    )
+    requisito = resultado.scalars().first()
+    if not requisito:
+        raise HTTPException(status_code=404, detail="Requisito no encontrado")
+    return requisito
+
+@router.get("/{project_id}/requisitos", response_model=List[RequisitoResponse])
+async def listar_requisitos(project_id: int,
+                            response: Response,
+                            estado: Optional[str] = None,
+                            tipo: Optional[str] = None,
+                            prioridad: Optional[int] = None,
+                            pag: Paginacion = Depends(),
+                            db: AsyncSession = Depends(get_async_db),
+                            current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user, "Proyecto no encontrado")
+    stmt = select(*listado.columnas).where(Requisito.proyecto_id == project.id)
+    if estado is not None:
+        stmt = stmt.where(Requisito.estado == filtro_enum(EstadoRequisitoEnum, estado))
+    if tipo is not None:
+        stmt = stmt.where(Requisito.tipo == filtro_enum(TipoRequisitoEnum, tipo))
+    if prioridad is not None:
+        stmt = stmt.where(Requisito.prioridad == prioridad)
+    filas = await paginar_async(db, stmt, Requisito, pag, response, ordenables=("id", "fecha_actualizacion", "prioridad"),
+                                columnas=True)
+    return listado.respuesta(filas, response)
+
+@router.get("/{project_id}/requisitos/{requisito_id}", response_model=RequisitoResponse)
+async def obtener_requisito(project_id: int, requisito_id: int,
+                            db: AsyncSession = Depends(get_async_db),
+                            current_user: Principal = Depends(get_current_user_async)):
+    return await _requisito_del_usuario(db, project_id, requisito_id, current_user)
+
+@router.get("/{project_id}/requisitos/{requisito_id}/subtree", response_model=List[RequisitoNodoResponse])
+async def subarbol_requisito(project_id: int, requisito_id: int,
+                             profundidad: Optional[int] = Query(None, ge=0, le=PROFUNDIDAD_MAXIMA,
+                                                                description="Niveles máximos por debajo del requisito"),
+                             db: AsyncSession = Depends(get_async_db),
+                             current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user, "Proyecto no encontrado")
+    resultado = await db.execute(consulta_subarbol(project.id, requisito_id, profundidad if profundidad is not None else PROFUNDIDAD_MAXIMA))
+    filas = resultado.all()
+    if not filas:
+        raise HTTPException(status_code=404, detail="Requisito no encontrado")
+    return aplicar_profundidad(filas)
+
+@router.get("/{project_id}/requisitos/{requisito_id}/ancestors", response_model=List[RequisitoNodoResponse])
+async def ancestros_requisito(project_id: int, requisito_id: int,
+                              profundidad: Optional[int] = Query(None, ge=1, le=PROFUNDIDAD_MAXIMA,
+                                                                 description="Niveles máximos por encima del requisito"),
+                              db: AsyncSession = Depends(get_async_db),
+                              current_user: Principal = Depends(get_current_user_async)):
+    await _requisito_del_usuario(db, project_id, requisito_id, current_user)
+    resultado = await db.execute(consulta_ancestros(project_id, requisito_id, profundidad if profundidad is not None else PROFUNDIDAD_MAXIMA))
+    return aplicar_profundidad(resultado.all())
+
+@router.post("/{project_id}/requisitos", response_model=RequisitoResponse, status_code=status.HTTP_201_CREATED)
+async def crear_requisito(project_id: int, req: RequisitoCreate,
+                          db: AsyncSession = Depends(get_async_db),
+                          current_user: Principal = Depends(get_current_user_async)):
+    project = await proyecto_del_usuario(db, project_id, current_user, "Proyecto no encontrado")
+    await validar_padre(db, project.id, None, req.requisito_padre_id)
+    nuevo = Requisito(
+        nombre=req.nombre,
+        descripcion=req.descripcion,
+        tipo=req.tipo,
+        prioridad=req.prioridad,
+        fuente=req.fuente,
+        observaciones=req.observaciones,
+        estado=req.estado,
+        version=req.version,
+        requisito_padre_id=req.requisito_padre_id,
+        proyecto_id=project.id
+    )
+    db.add(nuevo)
+    await db.commit()
+    cache_documentos.invalidar_proyecto(project.id)
+    await db.refresh(nuevo)
+    eventos.publicar(project.id, "requisitos", nuevo.id, "creado")
+    return nuevo
+
+@router.put("/{project_id}/requisitos/{requisito_id}", response_model=RequisitoResponse)
+async def actualizar_requisito(project_id: int, requisito_id: int, req: RequisitoCreate,
+                               db: AsyncSession = Depends(get_async_db),
+                               current_user: Principal = Depends(get_current_user_async)):
+    db_req = await _requisito_del_usuario(db, project_id, requisito_id, current_user)
+    if req.requisito_padre_id != db_req.requisito_padre_id:
+        await validar_padre(db, project_id, requisito_id, req.requisito_padre_id)
+    db_req.nombre = req.nombre
+    db_req.descripcion = req.descripcion
+    db_req.tipo = req.tipo
+    db_req.prioridad = req.prioridad
+    db_req.fuente = req.fuente
+    db_req.observaciones = req.observaciones
+    db_req.estado = req.estado
+    db_req.version = req.version
+    db_req.requisito_padre_id = req.requisito_padre_id
+    await db.commit()
+    cache_documentos.invalidar_proyecto(project_id)
+    await db.refresh(db_req)
+    eventos.publicar(project_id, "requisitos", requisito_id, "actualizado")
+    return db_req
+
+@router.delete("/{project_id}/requisitos/{requisito_id}", status_code=status.HTTP_202_ACCEPTED)
+async def eliminar_requisito(project_id: int, requisito_id: int,
+                             db: AsyncSession = Depends(get_async_db),
+                             current_user: Principal = Depends(get_current_user_async)):
+    await _requisito_del_usuario(db, project_id, requisito_id, current_user)
+    # La rama (dependientes y sus casos de uso) sale del proyecto ya y se purga en segundo plano
+    await db.run_sync(lambda sesion: purga.programar_requisito(sesion, project_id, requisito_id))
+    await db.commit()
+    purga.purgador.avisar()
+    cache_documentos.invalidar_proyecto(project_id)
+    eventos.publicar(project_id, "requisitos", requisito_id, "borrado")
+    return {"detail": "Requisito eliminado; sus dependientes se purgarán en segundo plano"}
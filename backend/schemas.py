@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic import BaseModel, EmailStr
 from datetime import datetime
 
@@ -72,6 +72,10 @@ class RequisitoResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# Requisito dentro de una rama del árbol (subtree / ancestors)
+class RequisitoNodoResponse(RequisitoResponse):
+    profundidad: int
+
 # --- Caso de Uso ---
 class CasoUsoCreate(BaseModel):
     titulo: str
@@ -112,6 +116,7 @@ class ActorCreate(BaseModel):
     nombre: str
     tipo: str  # Ej.: "Humano" o "Sistema Externo"
     descripcion: Optional[str] = None
+    proyecto_id: Optional[int] = None  # Sin proyecto el actor es global
 
     class Config:
         from_attributes = True
@@ -121,6 +126,7 @@ class ActorResponse(BaseModel):
     nombre: str
     tipo: str
     descripcion: Optional[str] = None
+    proyecto_id: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -164,3 +170,89 @@ class RelacionRequisitoResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+# --- Matriz de trazabilidad (lista de adyacencia dispersa) ---
+class TrazaRequisito(BaseModel):
+    id: int
+    nombre: str
+    casos_uso: List[int] = []
+
+class TrazaCasoUso(BaseModel):
+    id: int
+    titulo: str
+    requisitos: List[int] = []
+
+class CoberturaTrazabilidad(BaseModel):
+    total_requisitos: int
+    requisitos_cubiertos: int
+    porcentaje_cubiertos: float
+    requisitos_sin_caso_uso: List[int] = []
+    total_casos_uso: int
+    casos_uso_sin_requisito: List[int] = []
+    total_vinculos: int
+
+class MatrizTrazabilidadResponse(BaseModel):
+    proyecto_id: int
+    requisitos: List[TrazaRequisito] = []
+    casos_uso: List[TrazaCasoUso] = []
+    cobertura: CoberturaTrazabilidad
+
+# --- Estadísticas (contadores materializados) ---
+class EstadisticasRequisitos(BaseModel):
+    total: int
+    por_estado: Dict[str, int]
+    por_tipo: Dict[str, int]
+
+class EstadisticasCasosUso(BaseModel):
+    total: int
+    por_estado: Dict[str, int]
+    por_categoria: Dict[str, int]
+
+class EstadisticasEscenarios(BaseModel):
+    total: int
+    por_tipo: Dict[str, int]
+
+class EstadisticasProyectoResponse(BaseModel):
+    proyecto_id: int
+    requisitos: EstadisticasRequisitos
+    casos_uso: EstadisticasCasosUso
+    escenarios: EstadisticasEscenarios
+
+class EstadisticasUsuarioResponse(BaseModel):
+    total_proyectos: int
+    proyectos_por_estado: Dict[str, int]
+    requisitos: EstadisticasRequisitos
+    casos_uso: EstadisticasCasosUso
+    escenarios: EstadisticasEscenarios
+
+# --- Búsqueda de texto completo ---
+class ResultadoBusqueda(BaseModel):
+    entidad: str  # 'requisito', 'caso_uso' o 'escenario'
+    id: int
+    proyecto_id: int
+    titulo: str  # Con las coincidencias marcadas entre **
+    fragmento: str
+    puntuacion: float  # BM25: mayor es más relevante
+
+# --- Proyecto completo (detalle) ---
+class ProyectoBundleResponse(BaseModel):
+    proyecto: ProyectoResponse
+    requisitos: List[RequisitoResponse] = []
+    casos_uso: List[CasoUsoResponse] = []
+    escenarios: List[EscenarioResponse] = []
+    actores: List[ActorResponse] = []
+
+# --- Cambios (sincronización incremental) ---
+class BorradosProyecto(BaseModel):
+    requisitos: List[int] = []
+    casos_uso: List[int] = []
+    escenarios: List[int] = []
+
+class CambiosProyectoResponse(BaseModel):
+    proyecto_id: int
+    cursor: int  # Se pasa como since en la siguiente petición
+    mas: bool  # Quedan cambios posteriores a cursor
+    requisitos: List[RequisitoResponse] = []
+    casos_uso: List[CasoUsoResponse] = []
+    escenarios: List[EscenarioResponse] = []
+    borrados: BorradosProyecto
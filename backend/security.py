@@ -1,22 +1,47 @@
-from passlib.context import CryptContext
+import os
 from datetime import datetime, timedelta
-from jose import JWTError, jwt
+from functools import lru_cache
+
+# passlib y jose se importan al usarse por primera vez: importar la aplicación
+# (cada worker, cada script) no debe pagar su carga.
 
 SECRET_KEY = "tu_secreto_super_seguro"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Coste de bcrypt (2^n iteraciones). Los hashes con un coste menor se rehacen con el
+# actual la próxima vez que el usuario inicia sesión
+BCRYPT_COSTE = int(os.getenv("BCRYPT_COSTE", "12"))
+
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+@lru_cache(maxsize=None)
+def _pwd_context():
+    from passlib.context import CryptContext
+    return CryptContext(schemes=["bcrypt"], deprecated="auto",
+                        bcrypt__default_rounds=BCRYPT_COSTE, bcrypt__min_rounds=BCRYPT_COSTE)
 
+# Las rutas no llaman a estas funciones directamente sino a través del pool de
+# procesos de contrasenas.py
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return _pwd_context().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return _pwd_context().verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password: str, hashed_password: str):
+    # (válida, hash nuevo o None si el guardado sigue al día)
+    return _pwd_context().verify_and_update(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
+    from jose import jwt
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
+def decode_access_token(token: str):
+    # Devuelve el payload o None si el token no es válido
+    from jose import JWTError, jwt
+    try:
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        return None
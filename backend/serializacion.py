@@ -0,0 +1,64 @@
+# backend/serializacion.py
+# Vía rápida para los listados grandes. En lugar de cargar objetos ORM (con su
+# identity map) y validarlos uno a uno con el esquema de respuesta, se seleccionan
+# solo las columnas del esquema como filas planas, los enumerados se leen como texto
+# y se traducen con un diccionario, y la lista se codifica directamente a JSON.
+# La salida es la misma que la de response_model (mismos campos y valores).
+import json
+from datetime import datetime
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import Enum as SQLEnum, String, type_coerce
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional: sin él se usa el módulo json
+    orjson = None
+
+
+def _por_defecto(valor):
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+class RespuestaJSON(JSONResponse):
+    def render(self, contenido) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(contenido)
+        return json.dumps(contenido, ensure_ascii=False, separators=(",", ":"), default=_por_defecto).encode()
+
+
+class Listado:
+    # Columnas de `esquema` tomadas de `modelo`, etiquetadas con el nombre del campo
+    def __init__(self, modelo, esquema):
+        self.campos = list(esquema.model_fields)
+        self.columnas = []
+        self.enumerados = []  # (posición, {valor guardado: valor de la API})
+        for posicion, campo in enumerate(self.campos):
+            columna = getattr(modelo, campo)
+            if isinstance(columna.type, SQLEnum) and columna.type.enum_class is not None:
+                # Según la columna se guarda el nombre del miembro o su valor
+                miembros = columna.type.enum_class
+                traduccion = {m.name: m.value for m in miembros}
+                traduccion.update({m.value: m.value for m in miembros})
+                self.enumerados.append((posicion, traduccion))
+                columna = type_coerce(columna, String)
+            self.columnas.append(columna.label(campo))
+
+    def filas_a_dicts(self, filas):
+        campos, enumerados = self.campos, self.enumerados
+        resultado = []
+        for fila in filas:
+            if enumerados:
+                fila = list(fila)
+                for posicion, traduccion in enumerados:
+                    fila[posicion] = traduccion.get(fila[posicion], fila[posicion])
+            resultado.append(dict(zip(campos, fila)))
+        return resultado
+
+    def respuesta(self, filas, response: Response):
+        # Devolver la respuesta directamente salta response_model, así que las
+        # cabeceras puestas en `response` (p. ej. el cursor) se copian aquí
+        return RespuestaJSON(self.filas_a_dicts(filas), headers=dict(response.headers))
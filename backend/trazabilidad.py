@@ -0,0 +1,112 @@
+# backend/trazabilidad.py
+# Matriz de trazabilidad requisito x caso de uso de un proyecto. Un caso de uso traza
+# un requisito por su requisito_id o por una fila de relaciones_requisitos; ambas
+# fuentes se unen en una CTE y una sola consulta agrupada devuelve la lista de
+# adyacencia dispersa en los dos sentidos (solo se envían las celdas ocupadas).
+#
+# El resultado se guarda en memoria por proyecto junto con la version_contenido con la
+# que se calculó (ver versiones.py). Quien lo pide lee la versión actual en la misma
+# transacción en la que se calcularía la matriz, así que una escritura hecha por otro
+# proceso se ve en la siguiente petición y la matriz siempre corresponde a la versión
+# que usa el ETag.
+import os
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import func, literal, select, union, union_all
+from sqlalchemy.orm import Session
+
+from . import cache_documentos
+from .models import Requisito, CasoUso, RelacionRequisito
+
+MAX_PROYECTOS = int(os.getenv("TRAZABILIDAD_MAX_PROYECTOS", "256"))
+
+
+def consulta_matriz(proyecto_id: int):
+    vinculos = union(
+        select(CasoUso.requisito_id, CasoUso.id.label("caso_uso_id"))
+        .join(Requisito, Requisito.id == CasoUso.requisito_id)
+        .where(CasoUso.proyecto_id == proyecto_id, Requisito.proyecto_id == proyecto_id),
+        select(RelacionRequisito.requisito_id, RelacionRequisito.caso_uso_id)
+        .join(Requisito, Requisito.id == RelacionRequisito.requisito_id)
+        .join(CasoUso, CasoUso.id == RelacionRequisito.caso_uso_id)
+        .where(Requisito.proyecto_id == proyecto_id, CasoUso.proyecto_id == proyecto_id),
+    ).cte("vinculos")
+    # Una fila por requisito y por caso de uso, con los ids del otro eje separados por comas
+    return union_all(
+        select(literal("R").label("eje"), Requisito.id, Requisito.nombre.label("texto"),
+               func.group_concat(vinculos.c.caso_uso_id).label("vecinos"))
+        .outerjoin(vinculos, vinculos.c.requisito_id == Requisito.id)
+        .where(Requisito.proyecto_id == proyecto_id).group_by(Requisito.id),
+        select(literal("C").label("eje"), CasoUso.id, CasoUso.titulo.label("texto"),
+               func.group_concat(vinculos.c.requisito_id).label("vecinos"))
+        .outerjoin(vinculos, vinculos.c.caso_uso_id == CasoUso.id)
+        .where(CasoUso.proyecto_id == proyecto_id).group_by(CasoUso.id),
+    )
+
+
+def _ids(vecinos):
+    return sorted(int(v) for v in vecinos.split(",")) if vecinos else []
+
+
+def calcular_matriz(db: Session, proyecto_id: int):
+    requisitos, casos_uso = [], []
+    for fila in db.execute(consulta_matriz(proyecto_id)):
+        if fila.eje == "R":
+            requisitos.append({"id": fila.id, "nombre": fila.texto, "casos_uso": _ids(fila.vecinos)})
+        else:
+            casos_uso.append({"id": fila.id, "titulo": fila.texto, "requisitos": _ids(fila.vecinos)})
+    requisitos.sort(key=lambda r: r["id"])
+    casos_uso.sort(key=lambda c: c["id"])
+
+    sin_caso_uso = [r["id"] for r in requisitos if not r["casos_uso"]]
+    sin_requisito = [c["id"] for c in casos_uso if not c["requisitos"]]
+    cubiertos = len(requisitos) - len(sin_caso_uso)
+    return {
+        "proyecto_id": proyecto_id,
+        "requisitos": requisitos,
+        "casos_uso": casos_uso,
+        "cobertura": {
+            "total_requisitos": len(requisitos),
+            "requisitos_cubiertos": cubiertos,
+            "porcentaje_cubiertos": round(100 * cubiertos / len(requisitos), 2) if requisitos else 100.0,
+            "requisitos_sin_caso_uso": sin_caso_uso,
+            "total_casos_uso": len(casos_uso),
+            "casos_uso_sin_requisito": sin_requisito,
+            "total_vinculos": sum(len(r["casos_uso"]) for r in requisitos),
+        },
+    }
+
+
+class CacheMatrices:
+    def __init__(self, max_proyectos: int = MAX_PROYECTOS):
+        self.max_proyectos = max_proyectos
+        self._entradas = OrderedDict()  # proyecto_id -> (version_contenido, matriz)
+        self._lock = threading.Lock()
+
+    def obtener(self, db: Session, proyecto_id: int, version: int):
+        # version: version_contenido del proyecto leída en la transacción de db
+        with self._lock:
+            entrada = self._entradas.get(proyecto_id)
+            if entrada is not None and entrada[0] == version:
+                self._entradas.move_to_end(proyecto_id)
+                return entrada[1]
+        matriz = calcular_matriz(db, proyecto_id)
+        with self._lock:
+            entrada = self._entradas.get(proyecto_id)
+            # Otra petición puede haber guardado ya una versión posterior
+            if entrada is None or entrada[0] < version:
+                self._entradas[proyecto_id] = (version, matriz)
+                self._entradas.move_to_end(proyecto_id)
+                while len(self._entradas) > self.max_proyectos:
+                    self._entradas.popitem(last=False)
+        return matriz
+
+    def invalidar(self, proyecto_id: int):
+        # La versión ya distingue las matrices viejas; esto solo libera la memoria antes
+        with self._lock:
+            self._entradas.pop(proyecto_id, None)
+
+
+cache_matrices = CacheMatrices()
+cache_documentos.al_invalidar(cache_matrices.invalidar)
@@ -0,0 +1,84 @@
+# backend/versiones.py
+# Versión de contenido por proyecto: proyectos.version_contenido se incrementa en cada
+# escritura que cambia algo del proyecto (sus propias columnas, requisitos, casos de
+# uso, escenarios, relaciones, actores y actores vinculados a casos de uso). La clave
+# de la caché de exportaciones y los ETag la incluyen, así que dos cambios dentro del
+# mismo segundo (fecha_actualizacion tiene resolución de segundo) o que no alteran el
+# número de filas dan versiones distintas, también si los hace otro proceso.
+#
+# version_global (una sola fila) se incrementa con cualquiera de esas escrituras y
+# también al crear o borrar proyectos y al cambiar actores globales. Versiona las
+# lecturas que no son de un proyecto (/projects, /actores, /escenarios, /relaciones,
+# /search, /stats) y guarda la hora de la última escritura para Last-Modified.
+#
+# Como las estadísticas y el registro de cambios, la mantienen triggers de SQLite en la
+# misma transacción que la escritura. Las bases nuevas los crean con create_all (ver
+# models.py) y las existentes con las migraciones 0008 y 0009.
+from .estadisticas import PROYECTO as PROYECTO_ENTIDADES
+
+# Cómo llega cada tabla a su proyecto
+PROYECTO = dict(PROYECTO_ENTIDADES, **{
+    "relaciones_requisitos": "(SELECT proyecto_id FROM requisitos WHERE id = {fila}.requisito_id)",
+    "actores": "{fila}.proyecto_id",
+    "casos_uso_actores": "(SELECT proyecto_id FROM casos_uso WHERE id = {fila}.caso_uso_id)",
+})
+GLOBAL = "version_global"
+DISPARADORES = [f"{tabla}_version_{sufijo}" for tabla in PROYECTO for sufijo in ("ai", "au", "ad")] + [
+    "proyectos_version_au"]
+DISPARADORES_GLOBAL = [f"{tabla}_global_{sufijo}" for tabla in (*PROYECTO, "proyectos")
+                       for sufijo in ("ai", "au", "ad")]
+
+
+def _incrementar(*proyectos):
+    return f"UPDATE proyectos SET version_contenido = version_contenido + 1 WHERE id IN ({', '.join(proyectos)}); "
+
+
+def sentencias_ddl():
+    for tabla, proyecto in PROYECTO.items():
+        nuevo, viejo = proyecto.format(fila="new"), proyecto.format(fila="old")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_version_ai AFTER INSERT ON {tabla} BEGIN "
+               f"{_incrementar(nuevo)}END")
+        # Si la fila cambia de proyecto, cambian los dos
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_version_au AFTER UPDATE ON {tabla} BEGIN "
+               f"{_incrementar(viejo, nuevo)}END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_version_ad AFTER DELETE ON {tabla} BEGIN "
+               f"{_incrementar(viejo)}END")
+    # Cambios en las columnas del propio proyecto; la condición evita que el incremento
+    # se dispare a sí mismo
+    yield ("CREATE TRIGGER IF NOT EXISTS proyectos_version_au AFTER UPDATE ON proyectos "
+           "WHEN old.version_contenido IS new.version_contenido BEGIN "
+           f"{_incrementar('new.id')}END")
+
+
+def sentencias_ddl_global():
+    incrementar = (f"UPDATE {GLOBAL} SET valor = valor + 1, fecha_actualizacion = CURRENT_TIMESTAMP "
+                   "WHERE id = 1; ")
+    for tabla in (*PROYECTO, "proyectos"):
+        # El incremento de version_contenido no es un cambio propio del proyecto
+        condicion = " WHEN old.version_contenido IS new.version_contenido" if tabla == "proyectos" else ""
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_global_ai AFTER INSERT ON {tabla} BEGIN {incrementar}END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_global_au AFTER UPDATE ON {tabla}{condicion} BEGIN "
+               f"{incrementar}END")
+        yield (f"CREATE TRIGGER IF NOT EXISTS {tabla}_global_ad AFTER DELETE ON {tabla} BEGIN {incrementar}END")
+
+
+def crear_triggers(conexion):
+    if conexion.dialect.name != "sqlite":
+        return
+    for sentencia in sentencias_ddl():
+        conexion.exec_driver_sql(sentencia)
+
+
+def crear_version_global(conexion):
+    # Fila única y triggers de version_global
+    if conexion.dialect.name != "sqlite":
+        return
+    conexion.exec_driver_sql(f"INSERT OR IGNORE INTO {GLOBAL}(id, valor, fecha_actualizacion) "
+                             "VALUES (1, 0, CURRENT_TIMESTAMP)")
+    for sentencia in sentencias_ddl_global():
+        conexion.exec_driver_sql(sentencia)
+
+
+def crear_triggers_tras_create_all(target, conexion, **kw):
+    crear_triggers(conexion)
+    crear_version_global(conexion)
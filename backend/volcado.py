@@ -0,0 +1,105 @@
+# backend/volcado.py
+# Volcado NDJSON de todo el espacio de trabajo de un usuario (proyectos, actores,
+# requisitos, casos de uso, escenarios y relaciones). Las filas se leen con yield_per
+# directamente de las tablas (sin objetos ORM) y se codifican una a una, así que la
+# memoria no depende del tamaño del volcado. El formato es el mismo que acepta la importación
+# (backend/importacion.py): cada fila lleva su `entidad` y las referencias usan
+# claves del tipo P<id>, R<id> y C<id>.
+import json
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .models import Proyecto, Requisito, CasoUso, Escenario, RelacionRequisito, Actor
+
+TAM_LOTE = 1000
+# Agrupa varias líneas por trozo para no emitir un write por fila
+TAM_TROZO = 64 * 1024
+
+
+def _json(valor):
+    if hasattr(valor, "value"):  # Enumerados
+        return valor.value
+    if isinstance(valor, datetime):
+        return valor.isoformat()
+    return valor
+
+
+def _clave(prefijo, id_):
+    return f"{prefijo}{id_}" if id_ is not None else None
+
+
+def _filas(db: Session, consulta):
+    return db.execute(consulta.execution_options(yield_per=TAM_LOTE))
+
+
+def _lineas_proyecto(db: Session, proyecto):
+    yield {
+        "entidad": "proyecto", "clave": _clave("P", proyecto.id),
+        "nombre": proyecto.nombre, "descripcion": proyecto.descripcion, "estado": proyecto.estado,
+        "fecha_creacion": proyecto.fecha_creacion, "fecha_actualizacion": proyecto.fecha_actualizacion,
+    }
+
+    a = Actor.__table__.c
+    for fila in _filas(db, select(a.nombre, a.tipo, a.descripcion).where(a.proyecto_id == proyecto.id).order_by(a.id)):
+        yield {"entidad": "actor", "nombre": fila.nombre, "tipo": fila.tipo, "descripcion": fila.descripcion}
+
+    r = Requisito.__table__.c
+    for fila in _filas(db, select(Requisito.__table__).where(r.proyecto_id == proyecto.id).order_by(r.id)):
+        yield {
+            "entidad": "requisito", "clave": _clave("R", fila.id), "padre": _clave("R", fila.requisito_padre_id),
+            "nombre": fila.nombre, "descripcion": fila.descripcion, "tipo": fila.tipo,
+            "prioridad": fila.prioridad, "fuente": fila.fuente, "observaciones": fila.observaciones,
+            "estado": fila.estado, "version": fila.version,
+            "fecha_creacion": fila.fecha_creacion, "fecha_actualizacion": fila.fecha_actualizacion,
+        }
+
+    c = CasoUso.__table__.c
+    for fila in _filas(db, select(CasoUso.__table__).where(c.proyecto_id == proyecto.id).order_by(c.id)):
+        yield {
+            "entidad": "caso_uso", "clave": _clave("C", fila.id), "requisito": _clave("R", fila.requisito_id),
+            "titulo": fila.titulo, "descripcion": fila.descripcion, "actores": fila.actores,
+            "precondiciones": fila.precondiciones, "postcondiciones": fila.postcondiciones,
+            "flujo_normal": fila.flujo_normal, "flujo_alternativo": fila.flujo_alternativo,
+            "categoria": fila.categoria, "estado": fila.estado,
+            "fecha_creacion": fila.fecha_creacion, "fecha_actualizacion": fila.fecha_actualizacion,
+        }
+
+    e = Escenario.__table__.c
+    consulta = (select(Escenario.__table__).join(CasoUso.__table__, e.caso_uso_id == c.id)
+                .where(c.proyecto_id == proyecto.id).order_by(e.id))
+    for fila in _filas(db, consulta):
+        yield {
+            "entidad": "escenario", "caso_uso": _clave("C", fila.caso_uso_id),
+            "nombre": fila.nombre, "descripcion": fila.descripcion, "tipo": fila.tipo,
+            "resultado_esperado": fila.resultado_esperado,
+            "fecha_creacion": fila.fecha_creacion, "fecha_actualizacion": fila.fecha_actualizacion,
+        }
+
+    rel = RelacionRequisito.__table__.c
+    consulta = (select(rel.requisito_id, rel.caso_uso_id).join(Requisito.__table__, rel.requisito_id == r.id)
+                .where(r.proyecto_id == proyecto.id).order_by(rel.id))
+    for fila in _filas(db, consulta):
+        yield {"entidad": "relacion", "requisito": _clave("R", fila.requisito_id),
+               "caso_uso": _clave("C", fila.caso_uso_id)}
+
+
+def generar_volcado(db: Session, usuario_id: int):
+    # Toda la lectura ocurre en una transacción: con WAL es una instantánea coherente
+    proyectos = select(Proyecto.id, Proyecto.nombre, Proyecto.descripcion, Proyecto.estado,
+                       Proyecto.fecha_creacion, Proyecto.fecha_actualizacion)
+    trozo = []
+    tam = 0
+    for proyecto in db.execute(proyectos.where(Proyecto.usuario_id == usuario_id).order_by(Proyecto.id)).all():
+        for objeto in _lineas_proyecto(db, proyecto):
+            linea = json.dumps({k: _json(v) for k, v in objeto.items() if v is not None},
+                               ensure_ascii=False, separators=(",", ":")) + "\n"
+            trozo.append(linea)
+            tam += len(linea)
+            if tam >= TAM_TROZO:
+                yield "".join(trozo).encode()
+                trozo = []
+                tam = 0
+    if trozo:
+        yield "".join(trozo).encode()
@@ -0,0 +1,62 @@
+# benchmarks/bench_arranque.py
+# Tiempo de arranque en frío: cada medición es un proceso nuevo que importa
+# backend.main y sirve la primera petición (GET / y una petición autenticada).
+# Se compara el arranque por defecto con el que además crea tablas y carga los
+# datos mock en el lifespan (DB_CREAR_TABLAS=1 DB_DATOS_MOCK=1).
+#
+# Uso: python -m benchmarks.bench_arranque [repeticiones]
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+MEDICION = r"""
+import json, time
+inicio = time.perf_counter()
+import backend.main
+importado = time.perf_counter()
+from fastapi.testclient import TestClient
+from backend.security import create_access_token
+with TestClient(backend.main.app) as cliente:
+    listo = time.perf_counter()
+    cliente.get("/")
+    primera = time.perf_counter()
+    cliente.get("/projects/", headers={"Authorization": "Bearer " + create_access_token({"sub": "travel_admin"})})
+    autenticada = time.perf_counter()
+print(json.dumps({
+    "import": (importado - inicio) * 1000,
+    "primera": (primera - listo) * 1000,
+    "autenticada": (autenticada - primera) * 1000,
+}))
+"""
+
+
+def medir(entorno, repeticiones):
+    resultados = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, "-c", MEDICION], env=entorno,
+                                capture_output=True, text=True, check=True).stdout
+        resultados.append(json.loads(salida.strip().splitlines()[-1]))
+    return {clave: statistics.median(r[clave] for r in resultados) for clave in resultados[0]}
+
+
+def main(repeticiones=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        base = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'arranque.db')}")
+        subprocess.run([sys.executable, "-m", "backend.gestion", "iniciar"], env=base,
+                       capture_output=True, check=True)
+        modos = {
+            "por defecto": base,
+            "con init": dict(base, DB_CREAR_TABLAS="1", DB_DATOS_MOCK="1"),
+        }
+        print(f"mediana de {repeticiones} procesos (ms)")
+        for nombre, entorno in modos.items():
+            r = medir(entorno, repeticiones)
+            print(f"{nombre:12s} import {r['import']:7.1f}   primera petición {r['primera']:6.1f}"
+                  f"   primera autenticada {r['autenticada']:6.1f}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
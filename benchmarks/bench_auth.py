@@ -0,0 +1,60 @@
+# benchmarks/bench_auth.py
+# Micro-benchmark del coste de autenticación por petición: compara la ruta sin
+# caché (jwt.decode + SELECT en usuarios) con la ruta servida desde la caché de
+# principales de backend.routers.dependencies.
+#
+# Uso: python -m benchmarks.bench_auth [iteraciones]
+import os
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.models import Usuario
+from backend.security import create_access_token
+from backend.routers.dependencies import get_current_user, cache_principales
+
+
+def medir(funcion, iteraciones):
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        funcion()
+    return (time.perf_counter() - inicio) / iteraciones * 1e6  # µs por llamada
+
+
+def main(iteraciones=5000):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}",
+                               connect_args={"check_same_thread": False})
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            db.add(Usuario(username="bench", email="bench@example.com", hashed_password="x"))
+            db.commit()
+
+        token = create_access_token({"sub": "bench"})
+        with Session() as db:
+            def sin_cache():
+                cache_principales.limpiar()
+                get_current_user(token, db)
+
+            def con_cache():
+                get_current_user(token, db)
+
+            sin_cache()  # calentamiento
+            frio = medir(sin_cache, iteraciones)
+            con_cache()
+            caliente = medir(con_cache, iteraciones)
+        engine.dispose()
+
+    print(f"iteraciones: {iteraciones}")
+    print(f"sin caché  (decode + SELECT): {frio:8.1f} µs/petición")
+    print(f"con caché  (principal en memoria): {caliente:8.1f} µs/petición")
+    print(f"aceleración: x{frio / caliente:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
@@ -0,0 +1,123 @@
+# benchmarks/bench_busqueda.py
+# Latencia de la búsqueda de texto completo (FTS5 + BM25) frente a un LIKE sobre
+# todas las columnas de texto, en un proyecto con N requisitos, casos de uso y
+# escenarios de texto sintético. Otro usuario tiene un proyecto del mismo tamaño, así
+# que la búsqueda también tiene que descartar sus coincidencias.
+#
+# Uso: python -m benchmarks.bench_busqueda [filas_por_entidad]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+from sqlalchemy import or_, select
+from sqlalchemy.orm import sessionmaker
+
+from backend import busqueda
+from backend.almacenamiento import crear_motor
+from backend.database import Base
+from backend.importacion import Importador
+from backend.models import Usuario, Requisito, CasoUso, Escenario
+
+# Vocabulario sintético con frecuencias tipo Zipf (pocas palabras muy comunes y una
+# cola larga de palabras raras), como en textos reales
+SILABAS = "ba be bi bo bu ca ce ci co cu da de di do du fa fe fi fo fu la le li lo lu ma me mi mo mu " \
+          "na ne ni no nu pa pe pi po pu ra re ri ro ru sa se si so su ta te ti to tu".split()
+TAM_VOCABULARIO = 20000
+CONSULTAS = {"palabra común": 3, "palabra media": 300, "palabra rara": 5000, "dos palabras": (40, 900)}
+REPETICIONES = 20
+
+
+def vocabulario():
+    rnd = random.Random(3)
+    palabras = []
+    while len(palabras) < TAM_VOCABULARIO:
+        palabra = "".join(rnd.choice(SILABAS) for _ in range(rnd.randint(2, 4)))
+        if palabra not in palabras:
+            palabras.append(palabra)
+    return palabras
+
+
+VOCABULARIO = vocabulario()
+PESOS_ACUMULADOS = list(accumulate(1 / rango for rango in range(1, TAM_VOCABULARIO + 1)))
+
+
+def frase(rnd, palabras):
+    return " ".join(rnd.choices(VOCABULARIO, cum_weights=PESOS_ACUMULADOS, k=palabras))
+
+
+def filas_sinteticas(n, nombre, semilla):
+    rnd = random.Random(semilla)
+    yield 1, {"entidad": "proyecto", "nombre": nombre}
+    for i in range(n):
+        yield i, {"entidad": "requisito", "clave": f"R{i}", "nombre": frase(rnd, 4), "descripcion": frase(rnd, 30),
+                  "tipo": "FUNCIONAL"}
+        yield i, {"entidad": "caso_uso", "clave": f"C{i}", "titulo": frase(rnd, 4), "descripcion": frase(rnd, 20),
+                  "flujo_normal": frase(rnd, 40), "categoria": "PRINCIPAL", "requisito": f"R{i}"}
+        yield i, {"entidad": "escenario", "nombre": frase(rnd, 3), "descripcion": frase(rnd, 15),
+                  "tipo": "NORMAL", "caso_uso": f"C{i}"}
+
+
+def like(db, proyecto_id, q):
+    patron = f"%{q}%"
+    total = 0
+    for modelo, columnas in ((Requisito, ("nombre", "descripcion", "observaciones")),
+                             (CasoUso, ("titulo", "descripcion", "precondiciones", "postcondiciones",
+                                        "flujo_normal", "flujo_alternativo"))):
+        total += len(db.scalars(select(modelo.id).where(
+            modelo.proyecto_id == proyecto_id, or_(*(getattr(modelo, c).like(patron) for c in columnas))
+        ).limit(20)).all())
+    total += len(db.scalars(select(Escenario.id).join(CasoUso).where(
+        CasoUso.proyecto_id == proyecto_id,
+        or_(Escenario.nombre.like(patron), Escenario.descripcion.like(patron), Escenario.resultado_esperado.like(patron))
+    ).limit(20)).all())
+    return total
+
+
+def fts(db, proyecto_id, q):
+    return len(busqueda.resultados(db.execute(
+        busqueda.consulta_busqueda(busqueda.consulta_fts(q), [proyecto_id], limite=20))))
+
+
+def medir(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main(n=30000):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = crear_motor(f"sqlite:///{os.path.join(tmp, 'busqueda.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            inicio = time.perf_counter()
+            for nombre in ("Ajeno", "Grande"):
+                usuario = Usuario(username=nombre, email=f"{nombre}@example.com", hashed_password="x")
+                db.add(usuario)
+                db.flush()
+                importador = Importador(db, usuario_id=usuario.id)
+                importador.procesar(filas_sinteticas(n, nombre, len(nombre)))
+            db.commit()
+            print(f"2 proyectos con {n} requisitos, casos de uso y escenarios importados (con indexado) en "
+                  f"{time.perf_counter() - inicio:.1f} s")
+            proyecto_id = importador.proyecto_id
+
+        with Session() as db:
+            print(f"{'consulta':28s} {'LIKE':>10s} {'FTS5':>10s}")
+            for nombre, rangos in CONSULTAS.items():
+                q = " ".join(VOCABULARIO[r] for r in (rangos if isinstance(rangos, tuple) else (rangos,)))
+                t_like = medir(lambda: like(db, proyecto_id, q))
+                t_fts = medir(lambda: fts(db, proyecto_id, q))
+                print(f"{nombre + ' (' + q + ')':28s} {t_like:8.1f}ms {t_fts:8.1f}ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,87 @@
+# benchmarks/bench_carga.py
+# Prueba de carga que compara el modo síncrono (threadpool + SessionLocal) con el
+# modo asíncrono (DB_ASYNC=1, AsyncSession sobre aiosqlite). Para cada modo arranca
+# un uvicorn contra una base de datos temporal con los datos mock y lanza
+# `concurrencia` clientes durante `duracion` segundos.
+#
+# Uso: python -m benchmarks.bench_carga [concurrencia] [duracion]
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+RUTAS = ["/projects/", "/projects/1/requisitos", "/projects/1/casos_uso", "/projects/1/escenarios"]
+
+
+async def esperar_servidor(url, intentos=100):
+    async with httpx.AsyncClient() as cliente:
+        for _ in range(intentos):
+            try:
+                await cliente.get(url)
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError(f"El servidor no arrancó en {url}")
+
+
+async def cargar(url, concurrencia, duracion):
+    async with httpx.AsyncClient(base_url=url, timeout=30) as cliente:
+        r = await cliente.post("/auth/login", data={"username": "travel_admin", "password": "viaje123"})
+        cabeceras = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        latencias, errores = [], 0
+        fin = time.perf_counter() + duracion
+
+        async def trabajador(n):
+            nonlocal errores
+            i = n
+            while time.perf_counter() < fin:
+                inicio = time.perf_counter()
+                respuesta = await cliente.get(RUTAS[i % len(RUTAS)], headers=cabeceras)
+                latencias.append(time.perf_counter() - inicio)
+                if respuesta.status_code != 200:
+                    errores += 1
+                i += 1
+
+        await asyncio.gather(*(trabajador(n) for n in range(concurrencia)))
+    latencias.sort()
+    return {
+        "rps": len(latencias) / duracion,
+        "p50": statistics.median(latencias) * 1000,
+        "p99": latencias[int(len(latencias) * 0.99) - 1] * 1000,
+        "errores": errores,
+    }
+
+
+def ejecutar_modo(modo_async, concurrencia, duracion, puerto):
+    with tempfile.TemporaryDirectory() as tmp:
+        entorno = dict(os.environ,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'carga.db')}",
+                       DB_ASYNC="1" if modo_async else "0",
+                       DB_CREAR_TABLAS="1", DB_DATOS_MOCK="1")
+        servidor = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(puerto), "--log-level", "warning"],
+            env=entorno,
+        )
+        try:
+            url = f"http://127.0.0.1:{puerto}"
+            asyncio.run(esperar_servidor(url))
+            return asyncio.run(cargar(url, concurrencia, duracion))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+def main(concurrencia=200, duracion=10):
+    print(f"concurrencia: {concurrencia}, duración: {duracion}s por modo")
+    for nombre, modo_async, puerto in (("síncrono", False, 8301), ("asíncrono", True, 8302)):
+        r = ejecutar_modo(modo_async, concurrencia, duracion, puerto)
+        print(f"{nombre:10s} {r['rps']:8.1f} req/s   p50 {r['p50']:7.1f} ms   p99 {r['p99']:7.1f} ms   errores {r['errores']}")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
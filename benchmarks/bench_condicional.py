@@ -0,0 +1,80 @@
+# benchmarks/bench_condicional.py
+# Coste de volver a pedir un listado sin cambios: la respuesta completa frente al 304
+# de un GET condicional con If-None-Match, y el tamaño del cuerpo sin comprimir, con
+# gzip y con brotli (si está instalado).
+#
+# Uso: python -m benchmarks.bench_condicional [filas]
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+REPETICIONES = 20
+
+
+def filas_sinteticas(n):
+    yield 1, {"entidad": "proyecto", "nombre": "Grande"}
+    for i in range(n):
+        yield i, {"entidad": "requisito", "clave": f"R{i}", "nombre": f"Requisito {i}",
+                  "descripcion": f"El sistema debe permitir la operación {i} a los usuarios de tipo {i % 7}",
+                  "tipo": "FUNCIONAL", "prioridad": i % 5,
+                  "estado": "Aprobado", "fuente": "Cliente"}
+        yield i, {"entidad": "caso_uso", "clave": f"C{i}", "titulo": f"Caso de uso {i}", "requisito": f"R{i}",
+                  "descripcion": f"El usuario {i % 13} completa la operación {i}",
+                  "flujo_normal": "\n".join(f"{p}. Paso {p} de la operación {i}" for p in range(1, 6)),
+                  "categoria": "PRINCIPAL", "estado": "EN_DESARROLLO", "precondiciones": "Sesión iniciada"}
+
+
+def medir(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main(n=5000):
+    with tempfile.TemporaryDirectory() as tmp:
+        # La base de datos se elige al importar backend.database
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'condicional.db')}"
+        from fastapi.testclient import TestClient
+        from backend import compresion, security
+        from backend.database import Base, SessionLocal, engine
+        from backend.importacion import Importador
+        from backend.main import create_app
+        from backend.models import Usuario
+        from backend.paginacion import LIMITE_MAXIMO
+
+        Base.metadata.create_all(bind=engine)
+        with SessionLocal() as db:
+            usuario = Usuario(username="grande", email="grande@example.com", hashed_password="x")
+            db.add(usuario)
+            db.flush()
+            importador = Importador(db, usuario_id=usuario.id)
+            importador.procesar(filas_sinteticas(n))
+            db.commit()
+            proyecto_id = importador.proyecto_id
+        cabeceras = {"Authorization": f"Bearer {security.create_access_token({'sub': 'grande'})}",
+                     "Accept-Encoding": "identity"}
+
+        codificaciones = ["identity", "gzip"] + (["br"] if compresion.brotli is not None else [])
+        with TestClient(create_app()) as cliente:
+            print(f"listados de {n} filas (mediana de {REPETICIONES})")
+            for ruta in (f"/projects/{proyecto_id}/requisitos?limit={LIMITE_MAXIMO}",
+                         f"/projects/{proyecto_id}/casos_uso?limit={LIMITE_MAXIMO}", f"/projects/{proyecto_id}/bundle"):
+                etag = cliente.get(ruta, headers=cabeceras).headers["etag"]
+                assert cliente.get(ruta, headers={**cabeceras, "If-None-Match": etag}).status_code == 304
+                t_completa = medir(lambda: cliente.get(ruta, headers=cabeceras))
+                t_304 = medir(lambda: cliente.get(ruta, headers={**cabeceras, "If-None-Match": etag}))
+                tamanos = []
+                for codificacion in codificaciones:
+                    respuesta = cliente.get(ruta, headers={**cabeceras, "Accept-Encoding": codificacion})
+                    tamanos.append(f"{codificacion} {int(respuesta.headers['content-length']) / 1024:.1f} KiB")
+                print(f"{ruta}: {t_completa:.1f} ms completa, {t_304:.2f} ms con 304; " + ", ".join(tamanos))
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
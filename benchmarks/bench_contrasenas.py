@@ -0,0 +1,125 @@
+# benchmarks/bench_contrasenas.py
+# Coste de bcrypt con el hash en el threadpool de las peticiones (HASH_PROCESOS=0)
+# frente al pool de procesos de backend/contrasenas.py. Para cada modo arranca un
+# uvicorn con los datos mock y mide:
+#   - la latencia de un listado (GET /projects/1/requisitos) sin logins y mientras
+#     `logins` clientes inician sesión en bucle,
+#   - los logins por segundo conseguidos en ese tiempo y los rechazados con 503,
+#   - una ráfaga de 100 logins simultáneos: cuántos se atienden y cuánto tarda el 503.
+#
+# Uso: python -m benchmarks.bench_contrasenas [logins] [duracion]
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.bench_carga import esperar_servidor
+
+CLIENTES_CRUD = 8
+RAFAGA = 100
+CREDENCIALES = {"username": "travel_admin", "password": "viaje123"}
+
+
+def percentil(valores, p):
+    valores = sorted(valores)
+    return valores[max(0, int(len(valores) * p) - 1)] * 1000
+
+
+async def crud(cliente, cabeceras, duracion):
+    latencias = []
+    fin = time.perf_counter() + duracion
+
+    async def trabajador():
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            await cliente.get("/projects/1/requisitos", headers=cabeceras)
+            latencias.append(time.perf_counter() - inicio)
+
+    await asyncio.gather(*(trabajador() for _ in range(CLIENTES_CRUD)))
+    return latencias
+
+
+async def iniciar_sesiones(cliente, concurrencia, duracion):
+    estados = []
+    fin = time.perf_counter() + duracion
+
+    async def trabajador():
+        while time.perf_counter() < fin:
+            respuesta = await cliente.post("/auth/login", data=CREDENCIALES)
+            estados.append(respuesta.status_code)
+            if respuesta.status_code == 503:
+                await asyncio.sleep(float(respuesta.headers.get("retry-after", "1")))
+
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return estados
+
+
+async def rafaga(cliente):
+    async def uno():
+        inicio = time.perf_counter()
+        respuesta = await cliente.post("/auth/login", data=CREDENCIALES)
+        return respuesta.status_code, time.perf_counter() - inicio
+
+    resultados = await asyncio.gather(*(uno() for _ in range(RAFAGA)))
+    rechazados = [t for estado, t in resultados if estado == 503]
+    return RAFAGA - len(rechazados), (statistics.median(rechazados) * 1000 if rechazados else None)
+
+
+async def medir(url, logins, duracion):
+    limites = httpx.Limits(max_connections=None)
+    async with httpx.AsyncClient(base_url=url, timeout=120, limits=limites) as cliente:
+        r = await cliente.post("/auth/login", data=CREDENCIALES)
+        cabeceras = {"Authorization": f"Bearer {r.json()['access_token']}"}
+        reposo = await crud(cliente, cabeceras, duracion)
+        latencias, estados = await asyncio.gather(
+            crud(cliente, cabeceras, duracion), iniciar_sesiones(cliente, logins, duracion))
+        atendidos, t_503 = await rafaga(cliente)
+    return {
+        "reposo": (percentil(reposo, 0.5), percentil(reposo, 0.95)),
+        "carga": (percentil(latencias, 0.5), percentil(latencias, 0.95)),
+        "logins_s": estados.count(200) / duracion,
+        "rechazados": estados.count(503),
+        "rafaga": (atendidos, t_503),
+    }
+
+
+def ejecutar_modo(procesos, logins, duracion, puerto):
+    with tempfile.TemporaryDirectory() as tmp:
+        entorno = dict(os.environ,
+                       DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'contrasenas.db')}",
+                       DB_CREAR_TABLAS="1", DB_DATOS_MOCK="1", HASH_PROCESOS=str(procesos))
+        servidor = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.main:app", "--port", str(puerto), "--log-level", "warning"],
+            env=entorno,
+        )
+        try:
+            url = f"http://127.0.0.1:{puerto}"
+            asyncio.run(esperar_servidor(url))
+            return asyncio.run(medir(url, logins, duracion))
+        finally:
+            servidor.terminate()
+            servidor.wait()
+
+
+def main(logins=16, duracion=10):
+    procesos = int(os.getenv("HASH_PROCESOS", str(min(4, os.cpu_count() or 1))))
+    print(f"{CLIENTES_CRUD} clientes de listado, {logins} de login, {duracion}s por fase, "
+          f"BCRYPT_COSTE={os.getenv('BCRYPT_COSTE', '12')}")
+    for nombre, n, puerto in (("threadpool", 0, 8311), (f"pool de {procesos}", procesos, 8312)):
+        r = ejecutar_modo(n, logins, duracion, puerto)
+        atendidos, t_503 = r["rafaga"]
+        print(f"{nombre}:\n"
+              f"  listado sin logins  p50 {r['reposo'][0]:7.1f} ms   p95 {r['reposo'][1]:7.1f} ms\n"
+              f"  listado con logins  p50 {r['carga'][0]:7.1f} ms   p95 {r['carga'][1]:7.1f} ms\n"
+              f"  logins {r['logins_s']:.1f}/s, {r['rechazados']} rechazados con 503\n"
+              f"  ráfaga de {RAFAGA}: {atendidos} atendidos"
+              + (f", 503 en {t_503:.1f} ms (mediana)" if t_503 is not None else ""))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:3]))
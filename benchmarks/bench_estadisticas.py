@@ -0,0 +1,106 @@
+# benchmarks/bench_estadisticas.py
+# Coste de las estadísticas del dashboard: contar por estado/tipo/categoría con GROUP BY
+# sobre las tablas del proyecto frente a leer los contadores materializados de
+# estadisticas_proyecto, y lo que añaden los triggers que los mantienen a una
+# importación masiva.
+#
+# Uso: python -m benchmarks.bench_estadisticas [filas_por_entidad]
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import sessionmaker
+
+from backend import estadisticas
+from backend.almacenamiento import crear_motor
+from backend.database import Base
+from backend.importacion import Importador
+from backend.models import Usuario, Requisito, CasoUso, Escenario, EstadisticaProyecto
+
+REPETICIONES = 20
+
+
+def filas_sinteticas(n, semilla=1):
+    rnd = random.Random(semilla)
+    yield 1, {"entidad": "proyecto", "nombre": "Grande"}
+    for i in range(n):
+        yield i, {"entidad": "requisito", "clave": f"R{i}", "nombre": f"Requisito {i}", "descripcion": "-",
+                  "tipo": rnd.choice(("FUNCIONAL", "NO_FUNCIONAL")),
+                  "estado": rnd.choice(("Propuesto", "Aprobado", "Implementado", "Verificado", "Rechazado"))}
+        yield i, {"entidad": "caso_uso", "clave": f"C{i}", "titulo": f"Caso {i}", "requisito": f"R{i}",
+                  "categoria": rnd.choice(("PRINCIPAL", "SECUNDARIO", "EXCEPCIONAL")),
+                  "estado": rnd.choice(("PROPUESTO", "EN_DESARROLLO", "IMPLEMENTADO", "VALIDADO"))}
+        yield i, {"entidad": "escenario", "nombre": f"Escenario {i}", "caso_uso": f"C{i}",
+                  "tipo": rnd.choice(("NORMAL", "ALTERNATIVO", "EXCEPCION"))}
+
+
+def contar_tablas(db, proyecto_id):
+    filas = []
+    for modelo, columna in ((Requisito, Requisito.estado), (Requisito, Requisito.tipo),
+                            (CasoUso, CasoUso.estado), (CasoUso, CasoUso.categoria)):
+        filas += db.execute(select(columna, func.count()).where(modelo.proyecto_id == proyecto_id)
+                            .group_by(columna)).all()
+    filas += db.execute(select(Escenario.tipo, func.count()).join(CasoUso)
+                        .where(CasoUso.proyecto_id == proyecto_id).group_by(Escenario.tipo)).all()
+    return filas
+
+
+def leer_contadores(db, proyecto_id):
+    return estadisticas.resumen(db.execute(
+        select(EstadisticaProyecto.dimension, EstadisticaProyecto.valor, EstadisticaProyecto.total)
+        .where(EstadisticaProyecto.proyecto_id == proyecto_id)))
+
+
+def medir(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def importar(tmp, n, con_triggers):
+    engine = crear_motor(f"sqlite:///{os.path.join(tmp, f'estadisticas_{int(con_triggers)}.db')}")
+    Base.metadata.create_all(bind=engine)
+    if not con_triggers:
+        with engine.begin() as conexion:
+            for nombre in estadisticas.DISPARADORES:
+                conexion.exec_driver_sql(f"DROP TRIGGER {nombre}")
+    Session = sessionmaker(bind=engine, autoflush=False)
+    with Session() as db:
+        inicio = time.perf_counter()
+        usuario = Usuario(username="grande", email="grande@example.com", hashed_password="x")
+        db.add(usuario)
+        db.flush()
+        importador = Importador(db, usuario_id=usuario.id)
+        importador.procesar(filas_sinteticas(n))
+        db.commit()
+        return engine, Session, importador.proyecto_id, time.perf_counter() - inicio
+
+
+def main(n=50000):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, _, _, t_sin = importar(tmp, n, con_triggers=False)
+        engine.dispose()
+        engine, Session, proyecto_id, t_con = importar(tmp, n, con_triggers=True)
+        print(f"importar {n} requisitos, casos de uso y escenarios: {t_sin:.1f} s sin contadores, "
+              f"{t_con:.1f} s con contadores")
+        with Session() as db:
+            t_tablas = medir(lambda: contar_tablas(db, proyecto_id))
+            t_contadores = medir(lambda: leer_contadores(db, proyecto_id))
+            print(f"estadísticas del proyecto: {t_tablas:.2f} ms con GROUP BY sobre las tablas, "
+                  f"{t_contadores:.2f} ms con los contadores")
+        with engine.begin() as conexion:
+            inicio = time.perf_counter()
+            diferencias = estadisticas.reconciliar(conexion)
+            print(f"reconciliar: {len(diferencias)} diferencias en {time.perf_counter() - inicio:.2f} s")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,66 @@
+# benchmarks/bench_eventos.py
+# Coste del canal de eventos en vivo (backend/eventos.py) sin HTTP de por medio:
+# memoria por suscripción inactiva, tiempo de repartir un evento a todas las
+# suscripciones de un proyecto y expulsión de los consumidores que no leen.
+#
+# Uso: python -m benchmarks.bench_eventos [suscripciones]
+import asyncio
+import statistics
+import sys
+import time
+import tracemalloc
+
+from backend.eventos import Broker
+
+REPETICIONES = 20
+
+
+async def consumir(flujo, recibidos):
+    async for mensaje in flujo:
+        recibidos.append(mensaje)
+
+
+async def medir(n):
+    broker = Broker(tam_cola=64, max_suscripciones=n + 1, latido=3600)
+    recibidos = []
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    flujos = [broker.flujo(1) for _ in range(n)]
+    tareas = [asyncio.create_task(consumir(flujo, recibidos)) for flujo in flujos]
+    await asyncio.sleep(0.1)
+    memoria = (tracemalloc.get_traced_memory()[0] - antes) / n
+    tracemalloc.stop()
+    print(f"{broker.total} suscripciones inactivas: {memoria / 1024:.1f} KiB por suscripción (corrutina, cola y flujo)")
+
+    tiempos = []
+    for i in range(REPETICIONES):
+        recibidos.clear()
+        inicio = time.perf_counter()
+        broker.publicar(1, "requisitos", i, "actualizado")
+        while len(recibidos) < n:
+            await asyncio.sleep(0)
+        tiempos.append(time.perf_counter() - inicio)
+    print(f"publicar un evento y entregarlo a las {n}: {statistics.median(tiempos) * 1000:.1f} ms (mediana)")
+
+    # Un consumidor que no lee: se le expulsa al llenarse su cola sin afectar al resto
+    lento = broker.flujo(2)
+    await lento.__anext__()
+    for i in range(broker.tam_cola + 1):
+        broker.publicar(2, "requisitos", i, "actualizado")
+    evento = (await lento.__anext__()).split(b"\n")[0].decode()
+    print(f"consumidor lento: {broker.expulsadas} expulsión tras {broker.tam_cola + 1} eventos sin leer, "
+          f"recibe {evento!r}")
+    await lento.aclose()
+
+    for tarea in tareas:
+        tarea.cancel()
+    await asyncio.gather(*tareas, return_exceptions=True)
+    print(f"tras cerrar las conexiones quedan {broker.total} suscripciones")
+
+
+def main(n=5000):
+    asyncio.run(medir(n))
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
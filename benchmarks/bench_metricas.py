@@ -0,0 +1,79 @@
+# benchmarks/bench_metricas.py
+# Sobrecoste de las métricas (backend/metricas.py): por sentencia SQL con los hooks
+# del motor, por petición con el middleware (llamando a la aplicación ASGI sin HTTP
+# de por medio) y tiempo de generar /metrics con muchas rutas registradas.
+#
+# Uso: python -m benchmarks.bench_metricas [iteraciones]
+import asyncio
+import sys
+import time
+
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+
+from backend.metricas import Metricas, MiddlewareMetricas
+
+
+def por_sentencia(iteraciones, instrumentado):
+    engine = create_engine("sqlite://")
+    if instrumentado:
+        Metricas().instrumentar(engine, "bench")
+    with engine.connect() as conexion:
+        sentencia = text("SELECT 1")
+        inicio = time.perf_counter()
+        for _ in range(iteraciones):
+            conexion.execute(sentencia)
+        return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def aplicacion(instrumentada):
+    app = FastAPI()
+
+    @app.get("/projects/{project_id}/requisitos")
+    async def listar(project_id: int):
+        return {"id": project_id}
+
+    if instrumentada:
+        app.add_middleware(MiddlewareMetricas, registro=Metricas())
+    return app
+
+
+async def por_peticion(app, iteraciones):
+    scope = {"type": "http", "method": "GET", "path": "/projects/1/requisitos", "raw_path": b"/projects/1/requisitos",
+             "root_path": "", "query_string": b"", "headers": [], "http_version": "1.1", "scheme": "http",
+             "server": ("test", 80), "client": ("test", 1)}
+
+    async def recibir():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def enviar(mensaje):
+        pass
+
+    # La primera llamada construye la pila de middlewares
+    await app(dict(scope), recibir, enviar)
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        await app(dict(scope), recibir, enviar)
+    return (time.perf_counter() - inicio) / iteraciones * 1e6
+
+
+def main(iteraciones=20000):
+    sin, con = por_sentencia(iteraciones, False), por_sentencia(iteraciones, True)
+    print(f"sentencia SELECT 1: {sin:.1f} µs sin hooks, {con:.1f} µs con hooks (+{con - sin:.1f} µs)")
+
+    sin = asyncio.run(por_peticion(aplicacion(False), iteraciones))
+    con = asyncio.run(por_peticion(aplicacion(True), iteraciones))
+    print(f"petición mínima: {sin:.1f} µs sin middleware, {con:.1f} µs con middleware (+{con - sin:.1f} µs)")
+
+    registro = Metricas()
+    for i in range(200):
+        for estado in (200, 404):
+            registro.empezar()
+            registro.terminar("GET", f"/ruta/{i}", estado, 0.01, 3, 0.001)
+    inicio = time.perf_counter()
+    texto = registro.texto()
+    print(f"/metrics con 200 rutas: {(time.perf_counter() - inicio) * 1000:.1f} ms, {len(texto) / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
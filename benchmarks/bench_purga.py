@@ -0,0 +1,101 @@
+# benchmarks/bench_purga.py
+# Borrado de un proyecto grande: cascada del ORM (db.delete) frente a la purga por
+# lotes en segundo plano. Mientras tanto otro hilo inserta requisitos en un segundo
+# proyecto y se mide la latencia máxima de esas escrituras.
+#
+# Uso: python -m benchmarks.bench_purga [requisitos]
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from backend import purga
+from backend.almacenamiento import crear_motor
+from backend.database import Base
+from backend.importacion import Importador
+from backend.models import Usuario, Proyecto, Requisito, PurgaPendiente, TipoRequisitoEnum, EstadoRequisitoEnum
+
+
+def filas_sinteticas(requisitos):
+    yield 1, {"entidad": "proyecto", "nombre": "Grande"}
+    for i in range(requisitos):
+        yield i, {"entidad": "requisito", "clave": f"R{i}", "nombre": f"Requisito {i}", "descripcion": "d",
+                  "tipo": "FUNCIONAL", "padre": f"R{(i - 1) // 4}" if i else None}
+        yield i, {"entidad": "caso_uso", "clave": f"C{i}", "titulo": f"Caso {i}", "categoria": "PRINCIPAL",
+                  "requisito": f"R{i}"}
+        yield i, {"entidad": "escenario", "nombre": "Escenario", "tipo": "NORMAL", "caso_uso": f"C{i}"}
+
+
+def preparar(Session, requisitos):
+    with Session() as db:
+        usuario = Usuario(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(usuario)
+        db.flush()
+        Importador(db, usuario_id=usuario.id).procesar(filas_sinteticas(requisitos))
+        otro = Proyecto(nombre="Pequeño", usuario_id=usuario.id)
+        db.add(otro)
+        db.commit()
+        grande = db.scalar(select(Proyecto.id).where(Proyecto.nombre == "Grande"))
+        return grande, otro.id
+
+
+def escritor(Session, proyecto_id, parar, latencias):
+    while not parar.is_set():
+        inicio = time.perf_counter()
+        with Session() as db:
+            db.execute(insert(Requisito).values(nombre="nuevo", descripcion="d", tipo=TipoRequisitoEnum.FUNCIONAL,
+                                                estado=EstadoRequisitoEnum.PROPUESTO, prioridad=1,
+                                                proyecto_id=proyecto_id))
+            db.commit()
+        latencias.append(time.perf_counter() - inicio)
+        time.sleep(0.005)
+
+
+def medir(modo, requisitos):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = crear_motor(f"sqlite:///{os.path.join(tmp, 'purga.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        grande, pequeno = preparar(Session, requisitos)
+
+        parar, latencias = threading.Event(), []
+        hilo = threading.Thread(target=escritor, args=(Session, pequeno, parar, latencias))
+        hilo.start()
+        time.sleep(0.1)
+        inicio = time.perf_counter()
+        with Session() as db:
+            if modo == "cascada ORM":
+                db.delete(db.get(Proyecto, grande))
+                db.commit()
+                respuesta = fin = time.perf_counter()
+            else:
+                purga.programar_proyecto(db, grande)
+                db.commit()
+                respuesta = time.perf_counter()
+                while purga.purgar_lote(db):
+                    db.commit()
+                    time.sleep(purga.PAUSA)
+                db.commit()
+                fin = time.perf_counter()
+        parar.set()
+        hilo.join()
+        with Session() as db:
+            assert db.scalar(select(func.count()).select_from(PurgaPendiente)) == 0
+        engine.dispose()
+        return respuesta - inicio, fin - inicio, max(latencias), len(latencias)
+
+
+def main(requisitos=20000):
+    print(f"proyecto con {requisitos} requisitos, {requisitos} casos de uso y {requisitos} escenarios")
+    for modo in ("cascada ORM", "purga por lotes"):
+        respuesta, total, peor, escrituras = medir(modo, requisitos)
+        print(f"{modo:16s} respuesta {respuesta * 1000:8.1f} ms   borrado completo {total:6.2f} s"
+              f"   escritura concurrente más lenta {peor * 1000:7.1f} ms ({escrituras} escrituras)")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
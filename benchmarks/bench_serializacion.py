@@ -0,0 +1,99 @@
+# benchmarks/bench_serializacion.py
+# Coste de servir un listado grande: la vía anterior (objetos ORM validados con el
+# esquema de respuesta y codificados como hace response_model) frente a la vía rápida
+# de backend/serializacion.py (columnas como filas planas, enumerados traducidos con
+# un diccionario y codificación directa), con orjson y con el módulo json.
+#
+# Uso: python -m benchmarks.bench_serializacion [filas]
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import sessionmaker
+
+from backend import serializacion
+from backend.almacenamiento import crear_motor
+from backend.database import Base
+from backend.importacion import Importador
+from backend.models import Usuario, Requisito, CasoUso
+from backend.schemas import RequisitoResponse, CasoUsoResponse
+
+REPETICIONES = 10
+
+
+def filas_sinteticas(n):
+    yield 1, {"entidad": "proyecto", "nombre": "Grande"}
+    for i in range(n):
+        yield i, {"entidad": "requisito", "clave": f"R{i}", "nombre": f"Requisito {i}",
+                  "descripcion": "El sistema debe permitir " * 4, "tipo": "FUNCIONAL", "prioridad": i % 5,
+                  "estado": "Aprobado", "fuente": "Cliente"}
+        yield i, {"entidad": "caso_uso", "clave": f"C{i}", "titulo": f"Caso de uso {i}", "requisito": f"R{i}",
+                  "descripcion": "El usuario " * 10, "flujo_normal": "1. Paso\n" * 6, "categoria": "PRINCIPAL",
+                  "estado": "EN_DESARROLLO", "precondiciones": "Sesión iniciada"}
+
+
+def via_orm(db, modelo, esquema, proyecto_id):
+    # Lo que hace FastAPI con response_model: validar y volcar a JSON con json.dumps
+    objetos = db.query(modelo).filter(modelo.proyecto_id == proyecto_id).order_by(modelo.id).all()
+    adaptador = TypeAdapter(List[esquema])
+    contenido = adaptador.dump_python(adaptador.validate_python(objetos, from_attributes=True), mode="json")
+    cuerpo = json.dumps(contenido, ensure_ascii=False, separators=(",", ":")).encode()
+    db.expunge_all()
+    return cuerpo
+
+
+def via_rapida(db, listado, modelo, proyecto_id):
+    filas = db.query(*listado.columnas).filter(modelo.proyecto_id == proyecto_id).order_by(modelo.id).all()
+    return listado.respuesta(filas, Response()).body
+
+
+def medir(funcion):
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000
+
+
+def main(n=10000):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = crear_motor(f"sqlite:///{os.path.join(tmp, 'serializacion.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        with Session() as db:
+            usuario = Usuario(username="grande", email="grande@example.com", hashed_password="x")
+            db.add(usuario)
+            db.flush()
+            importador = Importador(db, usuario_id=usuario.id)
+            importador.procesar(filas_sinteticas(n))
+            db.commit()
+            proyecto_id = importador.proyecto_id
+
+        orjson = serializacion.orjson
+        print(f"listados de {n} filas (mediana de {REPETICIONES})")
+        print(f"{'listado':12s} {'ORM+pydantic':>14s} {'rápida json':>14s} {'rápida orjson':>14s}")
+        with Session() as db:
+            for modelo, esquema in ((Requisito, RequisitoResponse), (CasoUso, CasoUsoResponse)):
+                listado = serializacion.Listado(modelo, esquema)
+                # Las dos vías tienen que producir el mismo JSON
+                assert json.loads(via_orm(db, modelo, esquema, proyecto_id)) == \
+                    json.loads(via_rapida(db, listado, modelo, proyecto_id))
+                t_orm = medir(lambda: via_orm(db, modelo, esquema, proyecto_id))
+                serializacion.orjson = None
+                t_json = medir(lambda: via_rapida(db, listado, modelo, proyecto_id))
+                serializacion.orjson = orjson
+                t_orjson = medir(lambda: via_rapida(db, listado, modelo, proyecto_id)) if orjson else float("nan")
+                print(f"{modelo.__tablename__:12s} {t_orm:12.1f}ms {t_json:12.1f}ms {t_orjson:12.1f}ms  "
+                      f"(x{t_orm / min(t_json, t_orjson if orjson else t_json):.1f})")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,97 @@
+# benchmarks/bench_sqlite.py
+# Lecturas y escrituras concurrentes contra SQLite con cada perfil de
+# almacenamiento (backend.almacenamiento). Varios hilos listan requisitos de un
+# proyecto mientras otros actualizan e insertan; se cuentan operaciones por
+# segundo y errores "database is locked".
+#
+# Uso: python -m benchmarks.bench_sqlite [lectores] [escritores] [duracion]
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from backend.almacenamiento import PERFILES, crear_motor
+from backend.database import Base
+from backend.models import Usuario, Proyecto, Requisito, TipoRequisitoEnum
+
+REQUISITOS = 5000
+
+
+def preparar(Session):
+    with Session() as db:
+        usuario = Usuario(username="bench", email="bench@example.com", hashed_password="x")
+        db.add(usuario)
+        db.flush()
+        proyecto = Proyecto(nombre="Bench", usuario_id=usuario.id)
+        db.add(proyecto)
+        db.flush()
+        db.add_all(Requisito(nombre=f"Requisito {i}", descripcion="-", tipo=TipoRequisitoEnum.FUNCIONAL,
+                              proyecto_id=proyecto.id) for i in range(REQUISITOS))
+        db.commit()
+        return proyecto.id
+
+
+def ejecutar(perfil, lectores, escritores, duracion):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = crear_motor(f"sqlite:///{os.path.join(tmp, 'bench.db')}", perfil)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        proyecto_id = preparar(Session)
+        contadores = {"lecturas": 0, "escrituras": 0, "bloqueos": 0}
+        lock = threading.Lock()
+        fin = time.perf_counter() + duracion
+
+        def sumar(clave):
+            with lock:
+                contadores[clave] += 1
+
+        def lector():
+            while time.perf_counter() < fin:
+                try:
+                    with Session() as db:
+                        db.execute(select(Requisito).where(Requisito.proyecto_id == proyecto_id)
+                                   .order_by(Requisito.id).limit(100)).all()
+                    sumar("lecturas")
+                except OperationalError:
+                    sumar("bloqueos")
+
+        def escritor(n):
+            i = n
+            while time.perf_counter() < fin:
+                try:
+                    with Session() as db:
+                        db.execute(update(Requisito).where(Requisito.id == i % REQUISITOS + 1)
+                                   .values(descripcion=f"cambio {i}"))
+                        db.add(Requisito(nombre=f"Nuevo {i}", descripcion="-", tipo=TipoRequisitoEnum.FUNCIONAL,
+                                         proyecto_id=proyecto_id))
+                        db.commit()
+                    sumar("escrituras")
+                except OperationalError:
+                    sumar("bloqueos")
+                i += escritores
+
+        hilos = [threading.Thread(target=lector) for _ in range(lectores)]
+        hilos += [threading.Thread(target=escritor, args=(n,)) for n in range(escritores)]
+        for h in hilos:
+            h.start()
+        for h in hilos:
+            h.join()
+        engine.dispose()
+        return {clave: valor / duracion for clave, valor in contadores.items()}
+
+
+def main(lectores=8, escritores=2, duracion=5):
+    print(f"{lectores} lectores, {escritores} escritores, {duracion}s por perfil")
+    for perfil in PERFILES:
+        r = ejecutar(perfil, lectores, escritores, duracion)
+        print(f"{perfil:8s} {r['lecturas']:9.1f} lecturas/s {r['escrituras']:8.1f} escrituras/s"
+              f" {r['bloqueos']:7.1f} bloqueos/s")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:4]))
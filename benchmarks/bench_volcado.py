@@ -0,0 +1,63 @@
+# benchmarks/bench_volcado.py
+# Memoria y velocidad del volcado NDJSON (GET /export/dump) según el tamaño del
+# espacio de trabajo: el pico de memoria (tracemalloc) debe mantenerse plano.
+#
+# Uso: python -m benchmarks.bench_volcado [requisitos...]
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.database import Base
+from backend.importacion import Importador
+from backend.models import Usuario
+from backend.volcado import generar_volcado
+
+
+def filas_sinteticas(requisitos):
+    yield 1, {"entidad": "proyecto", "nombre": "Bench"}
+    for i in range(requisitos):
+        yield i, {"entidad": "requisito", "clave": f"R{i}", "nombre": f"Requisito {i}",
+                  "descripcion": "Descripción " * 10, "tipo": "FUNCIONAL"}
+        yield i, {"entidad": "caso_uso", "clave": f"C{i}", "titulo": f"Caso {i}",
+                  "categoria": "PRINCIPAL", "requisito": f"R{i}", "flujo_normal": "Paso " * 30}
+        yield i, {"entidad": "escenario", "nombre": f"Escenario {i}", "tipo": "NORMAL", "caso_uso": f"C{i}"}
+
+
+def medir(requisitos):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'volcado.db')}")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            usuario = Usuario(username="bench", email="bench@example.com", hashed_password="x")
+            db.add(usuario)
+            db.flush()
+            Importador(db, usuario_id=usuario.id).procesar(filas_sinteticas(requisitos))
+            db.commit()
+            usuario_id = usuario.id
+
+        with Session() as db:
+            tracemalloc.start()
+            inicio = time.perf_counter()
+            total = sum(len(trozo) for trozo in generar_volcado(db, usuario_id))
+            duracion = time.perf_counter() - inicio
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        engine.dispose()
+        return total, duracion, pico
+
+
+def main(*tamanos):
+    for requisitos in tamanos or (1000, 10000, 100000):
+        total, duracion, pico = medir(requisitos)
+        print(f"{requisitos * 3:8d} filas  {total / 1e6:7.1f} MB  {duracion:6.2f} s"
+              f"  pico de memoria {pico / 1e6:6.2f} MB")
+
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:]))
@@ -0,0 +1,82 @@
+# benchmarks/plan_consultas.py
+# Planes de las consultas más frecuentes (listados por proyecto, versión para los
+# ETag y borrados en cascada): muestra el EXPLAIN QUERY PLAN de cada una y marca las
+# que recorren una tabla entera (SCAN sin índice). La comprobación de regresión está
+# en tests/test_plan_consultas.py, que usa estas mismas consultas.
+#
+# Uso: python -m benchmarks.plan_consultas
+import os
+import re
+import tempfile
+
+from sqlalchemy import create_engine, delete, select
+
+from backend.cache_documentos import consulta_estado
+from backend.database import Base
+from backend.models import (Proyecto, Requisito, CasoUso, Escenario, RelacionRequisito, Actor, RegistroCambio,
+                            EstadisticaProyecto, casos_uso_actores)
+from backend.trazabilidad import consulta_matriz
+
+# Un SCAN que recorre un índice (p. ej. para ordenar) no lee la tabla entera
+_CON_INDICE = re.compile(r"USING (COVERING )?INDEX|USING INTEGER PRIMARY KEY")
+
+
+def consultas():
+    return {
+        "proyectos del usuario": select(Proyecto).where(Proyecto.usuario_id == 1)
+        .order_by(Proyecto.fecha_actualizacion, Proyecto.id),
+        "requisitos del proyecto": select(Requisito).where(Requisito.proyecto_id == 1).order_by(Requisito.id),
+        "requisitos por prioridad": select(Requisito).where(Requisito.proyecto_id == 1)
+        .order_by(Requisito.prioridad, Requisito.id),
+        "requisitos dependientes": select(Requisito).where(Requisito.requisito_padre_id == 1),
+        "casos de uso del proyecto": select(CasoUso).where(CasoUso.proyecto_id == 1).order_by(CasoUso.id),
+        "casos de uso del requisito": select(CasoUso).where(CasoUso.requisito_id == 1),
+        "escenarios del caso de uso": select(Escenario).where(Escenario.caso_uso_id == 1).order_by(Escenario.id),
+        "relaciones del requisito": select(RelacionRequisito).where(RelacionRequisito.requisito_id == 1),
+        "relaciones del caso de uso": select(RelacionRequisito).where(RelacionRequisito.caso_uso_id == 1),
+        "casos de uso del actor": select(CasoUso)
+        .join(casos_uso_actores, casos_uso_actores.c.caso_uso_id == CasoUso.id)
+        .join(Proyecto, CasoUso.proyecto_id == Proyecto.id)
+        .where(casos_uso_actores.c.actor_id == 1, Proyecto.usuario_id == 1).order_by(CasoUso.id),
+        "actores del caso de uso": select(Actor)
+        .join(casos_uso_actores, casos_uso_actores.c.actor_id == Actor.id)
+        .join(CasoUso, CasoUso.id == casos_uso_actores.c.caso_uso_id)
+        .join(Proyecto, CasoUso.proyecto_id == Proyecto.id)
+        .where(casos_uso_actores.c.caso_uso_id == 1, Proyecto.usuario_id == 1).order_by(Actor.nombre),
+        "actores del proyecto": select(Actor).where(Actor.proyecto_id == 1),
+        "matriz de trazabilidad": consulta_matriz(1),
+        "versión del proyecto": consulta_estado(1, 1),
+        "estadísticas del proyecto": select(EstadisticaProyecto).where(EstadisticaProyecto.proyecto_id == 1),
+        "cambios del proyecto": select(RegistroCambio).where(RegistroCambio.proyecto_id == 1, RegistroCambio.seq > 10)
+        .order_by(RegistroCambio.seq).limit(500),
+        "borrar escenarios del caso de uso": delete(Escenario).where(Escenario.caso_uso_id == 1),
+        "borrar casos de uso del proyecto": delete(CasoUso).where(CasoUso.proyecto_id == 1),
+    }
+
+
+def plan(conn, consulta):
+    sql = str(consulta.compile(conn.engine, compile_kwargs={"literal_binds": True}))
+    return [fila[-1] for fila in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+
+
+def recorridos(pasos):
+    # Pasos que leen una tabla completa
+    return [paso for paso in pasos if paso.startswith("SCAN") and not _CON_INDICE.search(paso)]
+
+
+def main():
+    fallos = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'plan.db')}")
+        Base.metadata.create_all(bind=engine)
+        with engine.connect() as conn:
+            for nombre, consulta in consultas().items():
+                pasos = plan(conn, consulta)
+                fallos += bool(recorridos(pasos))
+                print(f"{'SCAN' if recorridos(pasos) else 'ok':4s}  {nombre}: {'; '.join(pasos)}")
+        engine.dispose()
+    print(f"{fallos} consulta(s) recorren una tabla completa")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,317 @@
+# benchmarks/suite.py
+# Batería de rendimiento de extremo a extremo: genera un conjunto de datos sintético
+# (backend/generador.py) en una base de datos temporal y recorre todas las rutas de
+# la API con un cliente ASGI en el mismo proceso (httpx.ASGITransport, sin red), con
+# `concurrencia` peticiones simultáneas. Para cada ruta informa de peticiones por
+# segundo y latencias p50/p95/p99.
+#
+# Las escrituras trabajan sobre filas creadas por la propia batería (POST, después PUT
+# y DELETE de lo creado), así que los datos generados no cambian entre rutas. Las
+# rutas de contraseñas (login, registro) hacen pocas repeticiones: cada una es un hash
+# bcrypt. GET /projects/{id}/events no tiene fin y se mide en bench_eventos.
+#
+# Con --guardar los resultados se escriben en JSON; con --comparar se contrastan con
+# unos guardados antes y el proceso termina con error si el p95 de alguna ruta
+# empeora más de --tolerancia.
+#
+# Uso: python -m benchmarks.suite [--usuarios N] [--proyectos M] [--requisitos K]
+#          [--repeticiones R] [--concurrencia C] [--filtro texto]
+#          [--guardar fichero.json] [--comparar fichero.json] [--tolerancia 0.2]
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+from itertools import count
+
+REPETICIONES_CONTRASENAS = 5
+
+
+class Caso:
+    def __init__(self, metodo, plantilla, peticion, repeticiones=None, guardar=None, crea=None, requiere=None):
+        self.metodo = metodo
+        self.plantilla = plantilla
+        # peticion(i) -> (ruta, argumentos de httpx)
+        self.peticion = peticion
+        self.repeticiones = repeticiones
+        # guardar(respuesta) recoge los ids creados para las rutas siguientes
+        self.guardar = guardar
+        # Entidad que crea la ruta o de cuyas filas creadas depende
+        self.crea = crea
+        self.requiere = requiere
+
+    @property
+    def nombre(self):
+        return f"{self.metodo} {self.plantilla}"
+
+
+def percentil(valores, p):
+    return valores[min(len(valores) - 1, int(len(valores) * p))] * 1000
+
+
+async def ejecutar(cliente, caso, repeticiones, concurrencia):
+    indices = count()
+    latencias, errores = [], 0
+
+    async def trabajador():
+        nonlocal errores
+        while (i := next(indices)) < repeticiones:
+            ruta, argumentos = caso.peticion(i)
+            inicio = time.perf_counter()
+            respuesta = await cliente.request(caso.metodo, ruta, **argumentos)
+            latencias.append(time.perf_counter() - inicio)
+            if respuesta.status_code >= 400:
+                errores += 1
+            elif caso.guardar is not None:
+                caso.guardar(respuesta)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+    latencias.sort()
+    return {"rps": repeticiones / duracion, "p50": percentil(latencias, 0.5), "p95": percentil(latencias, 0.95),
+            "p99": percentil(latencias, 0.99), "errores": errores}
+
+
+def casos(datos, cabeceras):
+    from backend.generador import CONTRASENA, PALABRAS, filas_proyecto
+
+    proyectos, requisitos, casos_uso = datos["proyectos"], datos["requisitos"], datos["casos_uso"]
+    escenarios, actores, trabajo = datos["escenarios"], datos["actores"], datos["trabajo"]
+    creados = {"proyecto": [], "requisito": [], "caso_uso": [], "escenario": [], "actor": [], "relacion": []}
+
+    def elegir(lista, i):
+        return lista[i * 7919 % len(lista)]
+
+    def get(plantilla, ruta):
+        return Caso("GET", plantilla, lambda i: (ruta(i), {"headers": cabeceras}))
+
+    def crear(plantilla, entidad, ruta, cuerpo):
+        return Caso("POST", plantilla, lambda i: (ruta(i), {"headers": cabeceras, "json": cuerpo(i)}),
+                    guardar=lambda r: creados[entidad].append(r.json()["id"]), crea=entidad)
+
+    def sobre_creados(metodo, plantilla, entidad, ruta, cuerpo=None):
+        def peticion(i):
+            argumentos = {"headers": cabeceras}
+            if cuerpo is not None:
+                argumentos["json"] = cuerpo(i)
+            return ruta(creados[entidad][i % len(creados[entidad])]), argumentos
+        return Caso(metodo, plantilla, peticion, requiere=entidad)
+
+    def ndjson(filas):
+        return "".join(json.dumps(fila, ensure_ascii=False) + "\n" for _, fila in filas).encode()
+
+    def importacion(i):
+        # Filas de un proyecto pequeño sin la fila `proyecto`: van al proyecto de trabajo
+        filas = [f for f in filas_proyecto(i, 0, 0, f"imp{i}", 10, 1, 1, 0, 0) if f[1]["entidad"] != "proyecto"]
+        return f"/projects/{trabajo}/import", {"headers": {**cabeceras, "Content-Type": "application/x-ndjson"},
+                                               "content": ndjson(filas)}
+
+    def volcado(i):
+        filas = filas_proyecto(i, 0, 0, f"volcado{i}", 10, 1, 1, 0, 0)
+        return "/import/dump", {"headers": {**cabeceras, "Content-Type": "application/x-ndjson"},
+                                "content": ndjson(filas)}
+
+    requisito = lambda i: {"nombre": f"Requisito {i}", "descripcion": "Creado por la batería", "tipo": "FUNCIONAL",
+                           "prioridad": 1 + i % 5, "estado": "Aprobado"}
+    caso_uso = lambda i: {"titulo": f"Caso {i}", "categoria": "PRINCIPAL", "actores": "Cliente",
+                          "flujo_normal": "1. Paso", "requisito_id": elegir(requisitos[trabajo], i)}
+    escenario = lambda i: {"nombre": f"Escenario {i}", "tipo": "NORMAL", "caso_uso_id": elegir(casos_uso[trabajo], i)}
+    palabra = lambda i: PALABRAS[i % len(PALABRAS)]
+    proyecto = lambda i: elegir(proyectos, i)
+    req = lambda i: (proyecto(i), elegir(requisitos[proyecto(i)], i))
+    cu = lambda i: (proyecto(i), elegir(casos_uso[proyecto(i)], i))
+
+    return [
+        Caso("GET", "/", lambda i: ("/", {})),
+        # Lecturas
+        get("/projects/", lambda i: "/projects/"),
+        get("/projects/{project_id}", lambda i: f"/projects/{proyecto(i)}"),
+        get("/projects/{project_id}/bundle", lambda i: f"/projects/{proyecto(i)}/bundle"),
+        get("/projects/{project_id}/requisitos", lambda i: f"/projects/{proyecto(i)}/requisitos"),
+        get("/projects/{project_id}/requisitos?estado=", lambda i: f"/projects/{proyecto(i)}/requisitos?estado=Aprobado"),
+        get("/projects/{project_id}/requisitos/{requisito_id}", lambda i: "/projects/%d/requisitos/%d" % req(i)),
+        get("/projects/{project_id}/requisitos/{requisito_id}/subtree",
+            lambda i: "/projects/%d/requisitos/%d/subtree" % req(i)),
+        get("/projects/{project_id}/requisitos/{requisito_id}/ancestors",
+            lambda i: "/projects/%d/requisitos/%d/ancestors" % req(i)),
+        get("/projects/{project_id}/casos_uso", lambda i: f"/projects/{proyecto(i)}/casos_uso"),
+        get("/projects/{project_id}/casos_uso/{caso_uso_id}", lambda i: "/projects/%d/casos_uso/%d" % cu(i)),
+        get("/projects/{project_id}/casos_uso/{caso_uso_id}/escenarios",
+            lambda i: "/projects/%d/casos_uso/%d/escenarios" % cu(i)),
+        get("/projects/{project_id}/escenarios", lambda i: f"/projects/{proyecto(i)}/escenarios"),
+        get("/escenarios/", lambda i: "/escenarios/"),
+        get("/escenarios/{escenario_id}", lambda i: f"/escenarios/{elegir(escenarios, i)}"),
+        get("/actores/", lambda i: f"/actores/?proyecto_id={proyecto(i)}"),
+        get("/actores/{actor_id}", lambda i: f"/actores/{elegir(actores, i)}"),
+        get("/actores/{actor_id}/casos_uso", lambda i: f"/actores/{elegir(actores, i)}/casos_uso"),
+        get("/casos_uso/{caso_uso_id}/actores", lambda i: f"/casos_uso/{cu(i)[1]}/actores"),
+        get("/relaciones/relaciones/", lambda i: "/relaciones/relaciones/"),
+        get("/projects/{project_id}/search", lambda i: f"/projects/{proyecto(i)}/search?q={palabra(i)}"),
+        get("/search", lambda i: f"/search?q={palabra(i)}"),
+        get("/projects/{project_id}/traceability", lambda i: f"/projects/{proyecto(i)}/traceability"),
+        get("/projects/{project_id}/stats", lambda i: f"/projects/{proyecto(i)}/stats"),
+        get("/stats", lambda i: "/stats"),
+        get("/projects/{project_id}/changes", lambda i: f"/projects/{proyecto(i)}/changes?since=0"),
+        get("/projects/{project_id}/export?format=md", lambda i: f"/projects/{proyecto(i)}/export?format=md"),
+        get("/projects/{project_id}/export?format=html", lambda i: f"/projects/{proyecto(i)}/export?format=html"),
+        get("/export/dump", lambda i: "/export/dump"),
+        # Escrituras: primero se crea, después se modifica y se borra lo creado
+        crear("/projects/", "proyecto", lambda i: "/projects/", lambda i: {"nombre": f"Suite {i}"}),
+        crear("/projects/{project_id}/requisitos", "requisito", lambda i: f"/projects/{trabajo}/requisitos", requisito),
+        crear("/projects/{project_id}/casos_uso", "caso_uso", lambda i: f"/projects/{trabajo}/casos_uso", caso_uso),
+        crear("/escenarios/", "escenario", lambda i: "/escenarios/", escenario),
+        crear("/actores/", "actor", lambda i: "/actores/",
+              lambda i: {"nombre": f"Actor {i}", "tipo": "Humano", "proyecto_id": trabajo}),
+        crear("/relaciones/relaciones/", "relacion", lambda i: "/relaciones/relaciones/",
+              lambda i: {"requisito_id": elegir(requisitos[trabajo], i), "caso_uso_id": elegir(casos_uso[trabajo], i)}),
+        sobre_creados("PUT", "/projects/{project_id}", "proyecto", lambda id: f"/projects/{id}",
+                      lambda i: {"nombre": f"Suite {i} editado", "estado": "COMPLETADO"}),
+        sobre_creados("PUT", "/projects/{project_id}/requisitos/{requisito_id}", "requisito",
+                      lambda id: f"/projects/{trabajo}/requisitos/{id}", requisito),
+        sobre_creados("PUT", "/projects/{project_id}/casos_uso/{caso_uso_id}", "caso_uso",
+                      lambda id: f"/projects/{trabajo}/casos_uso/{id}", caso_uso),
+        sobre_creados("PUT", "/escenarios/{escenario_id}", "escenario", lambda id: f"/escenarios/{id}", escenario),
+        sobre_creados("PUT", "/actores/{actor_id}", "actor", lambda id: f"/actores/{id}",
+                      lambda i: {"nombre": f"Actor {i} editado", "tipo": "Sistema Externo", "proyecto_id": trabajo}),
+        Caso("POST", "/projects/{project_id}/import", importacion),
+        Caso("POST", "/import/dump", volcado),
+        sobre_creados("DELETE", "/relaciones/relaciones/{relacion_id}", "relacion",
+                      lambda id: f"/relaciones/relaciones/{id}"),
+        sobre_creados("DELETE", "/escenarios/{escenario_id}", "escenario", lambda id: f"/escenarios/{id}"),
+        sobre_creados("DELETE", "/actores/{actor_id}", "actor", lambda id: f"/actores/{id}"),
+        sobre_creados("DELETE", "/projects/{project_id}/casos_uso/{caso_uso_id}", "caso_uso",
+                      lambda id: f"/projects/{trabajo}/casos_uso/{id}"),
+        sobre_creados("DELETE", "/projects/{project_id}/requisitos/{requisito_id}", "requisito",
+                      lambda id: f"/projects/{trabajo}/requisitos/{id}"),
+        sobre_creados("DELETE", "/projects/{project_id}", "proyecto", lambda id: f"/projects/{id}"),
+        # Contraseñas
+        Caso("POST", "/auth/login", lambda i: ("/auth/login", {"data": {
+            "username": datos["username"], "password": CONTRASENA}}), repeticiones=REPETICIONES_CONTRASENAS),
+        Caso("POST", "/auth/register", lambda i: ("/auth/register", {"json": {
+            "username": f"registro{i}", "email": f"registro{i}@example.com", "password": CONTRASENA}}),
+            repeticiones=REPETICIONES_CONTRASENAS),
+    ]
+
+
+def filtrar(lista, filtro):
+    # Las rutas que modifican o borran filas creadas arrastran la ruta que las crea
+    elegidos = [c for c in lista if filtro in c.nombre]
+    requeridas = {c.requiere for c in elegidos if c.requiere}
+    return [c for c in lista if c in elegidos or c.crea in requeridas]
+
+
+def cargar_datos(db, prefijo):
+    # Ids de los datos del primer usuario generado, por proyecto
+    from sqlalchemy import select
+    from backend.models import Usuario, Proyecto, Requisito, CasoUso, Escenario, Actor
+
+    usuario = db.execute(select(Usuario.id, Usuario.username).where(Usuario.username == f"{prefijo}0")).one()
+    proyectos = db.scalars(select(Proyecto.id).where(Proyecto.usuario_id == usuario.id).order_by(Proyecto.id)).all()
+
+    def por_proyecto(modelo):
+        agrupados = {p: [] for p in proyectos}
+        for fila in db.execute(select(modelo.proyecto_id, modelo.id).where(modelo.proyecto_id.in_(proyectos))):
+            agrupados[fila.proyecto_id].append(fila.id)
+        return agrupados
+
+    return {
+        "username": usuario.username,
+        # El último proyecto recibe las escrituras; las lecturas usan el resto si los hay
+        "proyectos": proyectos[:-1] or proyectos,
+        "trabajo": proyectos[-1],
+        "requisitos": por_proyecto(Requisito),
+        "casos_uso": por_proyecto(CasoUso),
+        "escenarios": db.scalars(select(Escenario.id).join(CasoUso).where(CasoUso.proyecto_id.in_(proyectos))).all(),
+        "actores": db.scalars(select(Actor.id).where(Actor.proyecto_id.in_(proyectos))).all(),
+    }
+
+
+async def recorrer(app, lista, repeticiones, concurrencia):
+    import httpx
+
+    resultados = {}
+    transporte = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transporte, base_url="http://suite", timeout=None) as cliente:
+            for caso in lista:
+                n = caso.repeticiones or repeticiones
+                resultados[caso.nombre] = r = await ejecutar(cliente, caso, n, min(concurrencia, n))
+                print(f"{caso.nombre:70s} {r['rps']:8.1f} req/s  p50 {r['p50']:7.1f}  p95 {r['p95']:7.1f}  "
+                      f"p99 {r['p99']:7.1f} ms" + (f"  errores {r['errores']}" if r["errores"] else ""), flush=True)
+    return resultados
+
+
+def comparar(resultados, fichero, tolerancia):
+    with open(fichero) as f:
+        anteriores = json.load(f)["rutas"]
+    peores = []
+    for nombre, r in resultados.items():
+        if nombre in anteriores and r["p95"] > anteriores[nombre]["p95"] * (1 + tolerancia):
+            peores.append(f"{nombre}: p95 {anteriores[nombre]['p95']:.1f} -> {r['p95']:.1f} ms")
+    print(f"\ncomparación con {fichero} (tolerancia {tolerancia:.0%}): "
+          + (f"{len(peores)} ruta(s) más lentas" if peores else "sin regresiones"))
+    for linea in peores:
+        print(f"  {linea}")
+    return not peores
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batería de rendimiento de la API")
+    parser.add_argument("--usuarios", type=int, default=2)
+    parser.add_argument("--proyectos", type=int, default=3, help="por usuario")
+    parser.add_argument("--requisitos", type=int, default=500, help="por proyecto")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--repeticiones", type=int, default=200, help="por ruta")
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--filtro", help="solo las rutas que contengan este texto")
+    parser.add_argument("--guardar", help="fichero JSON donde guardar los resultados")
+    parser.add_argument("--comparar", help="fichero JSON de una ejecución anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="empeoramiento del p95 admitido")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
+        # La base de datos y la caché de documentos se eligen al importar el backend
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'suite.db')}"
+        os.environ["CACHE_DOCUMENTOS_DIR"] = os.path.join(tmp, "cache")
+        from backend import security
+        from backend.database import SessionLocal, engine
+        from backend.generador import generar
+        from backend.gestion import crear_tablas
+        from backend.main import create_app
+        from backend.models import PurgaPendiente
+
+        crear_tablas()
+        inicio = time.perf_counter()
+        with SessionLocal() as db:
+            totales = generar(db, args.usuarios, args.proyectos, args.requisitos, semilla=args.semilla, prefijo="suite")
+            datos = cargar_datos(db, "suite")
+        print(f"datos: {', '.join(f'{total} {entidad}' for entidad, total in totales.items())} "
+              f"({time.perf_counter() - inicio:.1f} s); {args.repeticiones} repeticiones por ruta, "
+              f"concurrencia {args.concurrencia}\n")
+
+        cabeceras = {"Authorization": f"Bearer {security.create_access_token({'sub': datos['username']})}"}
+        lista = casos(datos, cabeceras)
+        if args.filtro:
+            lista = filtrar(lista, args.filtro)
+        resultados = asyncio.run(recorrer(create_app(), lista, args.repeticiones, args.concurrencia))
+        # Los proyectos y requisitos borrados se purgan en segundo plano: se espera a que
+        # acabe antes de borrar la base de datos
+        with SessionLocal() as db:
+            limite = time.monotonic() + 60
+            while db.query(PurgaPendiente.id).first() is not None and time.monotonic() < limite:
+                db.rollback()
+                time.sleep(0.1)
+        engine.dispose()
+
+    if args.guardar:
+        with open(args.guardar, "w") as f:
+            json.dump({"parametros": vars(args), "rutas": resultados}, f, indent=1, ensure_ascii=False)
+    if args.comparar and not comparar(resultados, args.comparar, args.tolerancia):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
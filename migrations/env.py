@@ -5,6 +5,9 @@ from sqlalchemy import pool
 
 from alembic import context
 
+from backend.database import Base, DATABASE_URL
+from backend import models  # noqa: F401  (registra las tablas en Base.metadata)
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -14,11 +17,19 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# add your model's MetaData object here
-# for 'autogenerate' support
-# from myapp import mymodel
-# target_metadata = mymodel.Base.metadata
-target_metadata = None
+# La URL de la base de datos es la misma que usa la aplicación (DATABASE_URL)
+config.set_main_option("sqlalchemy.url", DATABASE_URL)
+
+target_metadata = Base.metadata
+
+
+def include_object(objeto, nombre, tipo, reflejado, comparado_con):
+    # La tabla FTS5 de búsqueda (y sus tablas internas busqueda_*) no está en los modelos.
+    # Ojo: recrear en modo batch requisitos, casos_uso, escenarios, proyectos, actores,
+    # relaciones_requisitos o casos_uso_actores borra sus triggers; tras una migración
+    # así hay que volver a llamar a busqueda.crear_indice, estadisticas.crear_triggers,
+    # cambios.crear_triggers, versiones.crear_triggers y versiones.crear_version_global.
+    return not (tipo == "table" and reflejado and nombre.startswith("busqueda"))
 
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
@@ -44,6 +55,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        render_as_batch=True,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -65,7 +78,11 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            # SQLite no admite la mayoría de ALTER TABLE: se recrean las tablas
+            render_as_batch=True,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,146 @@
+"""esquema inicial
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 10:00:00.000000
+
+Tablas tal y como las creaba Base.metadata.create_all antes de usar Alembic.
+Con if_not_exists, una base de datos ya creada por create_all se puede
+actualizar con `alembic upgrade head` sin tener que marcarla antes.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "usuarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(length=50), nullable=False),
+        sa.Column("email", sa.String(length=100), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("username"),
+        sa.UniqueConstraint("email"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_usuarios_id", "usuarios", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "actores",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sa.String(length=255), nullable=False),
+        sa.Column("tipo", sa.String(length=50), nullable=False),
+        sa.Column("descripcion", sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_actores_id", "actores", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "proyectos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sa.String(length=255), nullable=False),
+        sa.Column("descripcion", sa.Text(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("fecha_actualizacion", sa.DateTime(), nullable=False),
+        sa.Column("estado", sa.String(length=10), nullable=False),
+        sa.Column("usuario_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["usuario_id"], ["usuarios.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("nombre"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_proyectos_id", "proyectos", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "requisitos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sa.String(length=255), nullable=False),
+        sa.Column("descripcion", sa.Text(), nullable=False),
+        sa.Column("tipo", sa.String(length=12), nullable=False),
+        sa.Column("proyecto_id", sa.Integer(), nullable=True),
+        sa.Column("prioridad", sa.Integer(), nullable=False),
+        sa.Column("fuente", sa.String(length=255), nullable=True),
+        sa.Column("observaciones", sa.Text(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("fecha_actualizacion", sa.DateTime(), nullable=False),
+        sa.Column("estado", sa.String(length=12), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=True),
+        sa.Column("requisito_padre_id", sa.Integer(), nullable=True),
+        sa.CheckConstraint(
+            "estado IN ('Propuesto', 'Aprobado', 'Implementado', 'Verificado', 'Rechazado')",
+            name="estadorequisitoenum",
+        ),
+        sa.ForeignKeyConstraint(["proyecto_id"], ["proyectos.id"]),
+        sa.ForeignKeyConstraint(["requisito_padre_id"], ["requisitos.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_requisitos_id", "requisitos", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "casos_uso",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("titulo", sa.String(length=255), nullable=False),
+        sa.Column("descripcion", sa.Text(), nullable=True),
+        sa.Column("actores", sa.Text(), nullable=True),
+        sa.Column("precondiciones", sa.Text(), nullable=True),
+        sa.Column("postcondiciones", sa.Text(), nullable=True),
+        sa.Column("flujo_normal", sa.Text(), nullable=True),
+        sa.Column("flujo_alternativo", sa.Text(), nullable=True),
+        sa.Column("categoria", sa.String(length=11), nullable=False),
+        sa.Column("requisito_id", sa.Integer(), nullable=True),
+        sa.Column("proyecto_id", sa.Integer(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("fecha_actualizacion", sa.DateTime(), nullable=False),
+        sa.Column("estado", sa.String(length=13), nullable=False),
+        sa.ForeignKeyConstraint(["requisito_id"], ["requisitos.id"]),
+        sa.ForeignKeyConstraint(["proyecto_id"], ["proyectos.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_casos_uso_id", "casos_uso", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "relaciones_requisitos",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("requisito_id", sa.Integer(), nullable=True),
+        sa.Column("caso_uso_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["requisito_id"], ["requisitos.id"]),
+        sa.ForeignKeyConstraint(["caso_uso_id"], ["casos_uso.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_relaciones_requisitos_id", "relaciones_requisitos", ["id"], if_not_exists=True)
+
+    op.create_table(
+        "escenarios",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("nombre", sa.String(length=255), nullable=False),
+        sa.Column("descripcion", sa.Text(), nullable=True),
+        sa.Column("tipo", sa.String(length=11), nullable=False),
+        sa.Column("caso_uso_id", sa.Integer(), nullable=True),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.Column("fecha_actualizacion", sa.DateTime(), nullable=False),
+        sa.Column("resultado_esperado", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(["caso_uso_id"], ["casos_uso.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_escenarios_id", "escenarios", ["id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    for tabla in ("escenarios", "relaciones_requisitos", "casos_uso", "requisitos",
+                  "proyectos", "actores", "usuarios"):
+        op.drop_table(tabla)
@@ -0,0 +1,45 @@
+"""índices de claves ajenas
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 10:05:00.000000
+
+Las columnas proyecto_id / caso_uso_id se cubren con los índices compuestos de
+la paginación (su primera columna es la clave ajena); el resto de claves ajenas
+llevan un índice simple.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDICES = [
+    ("ix_proyectos_usuario_actualizacion", "proyectos", ["usuario_id", "fecha_actualizacion", "id"]),
+    ("ix_requisitos_proyecto_actualizacion", "requisitos", ["proyecto_id", "fecha_actualizacion", "id"]),
+    ("ix_requisitos_proyecto_prioridad", "requisitos", ["proyecto_id", "prioridad", "id"]),
+    ("ix_requisitos_requisito_padre_id", "requisitos", ["requisito_padre_id"]),
+    ("ix_casos_uso_proyecto_actualizacion", "casos_uso", ["proyecto_id", "fecha_actualizacion", "id"]),
+    ("ix_casos_uso_requisito_id", "casos_uso", ["requisito_id"]),
+    ("ix_escenarios_caso_uso_actualizacion", "escenarios", ["caso_uso_id", "fecha_actualizacion", "id"]),
+    ("ix_escenarios_actualizacion", "escenarios", ["fecha_actualizacion", "id"]),
+    ("ix_relaciones_requisitos_requisito_id", "relaciones_requisitos", ["requisito_id"]),
+    ("ix_relaciones_requisitos_caso_uso_id", "relaciones_requisitos", ["caso_uso_id"]),
+]
+
+
+def upgrade() -> None:
+    # if_not_exists: las bases creadas con create_all después de añadir los índices ya los tienen
+    for nombre, tabla, columnas in INDICES:
+        op.create_index(nombre, tabla, columnas, if_not_exists=True)
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla, if_exists=True)
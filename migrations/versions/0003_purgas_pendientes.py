@@ -0,0 +1,36 @@
+"""cola de purgas pendientes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "purgas_pendientes",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tabla", sa.String(length=20), nullable=False),
+        sa.Column("fila_id", sa.Integer(), nullable=False),
+        sa.Column("fecha_creacion", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_purgas_pendientes_tabla", "purgas_pendientes", ["tabla", "id"], if_not_exists=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_purgas_pendientes_tabla", table_name="purgas_pendientes")
+    op.drop_table("purgas_pendientes")
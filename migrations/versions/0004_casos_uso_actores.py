@@ -0,0 +1,107 @@
+"""actores por proyecto y vínculos caso de uso <-> actor
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIPO_POR_DEFECTO = "Humano"
+
+actores = sa.table(
+    "actores",
+    sa.column("id", sa.Integer), sa.column("nombre", sa.String), sa.column("tipo", sa.String),
+    sa.column("descripcion", sa.Text), sa.column("proyecto_id", sa.Integer),
+)
+casos_uso = sa.table("casos_uso", sa.column("id", sa.Integer), sa.column("proyecto_id", sa.Integer),
+                     sa.column("actores", sa.Text))
+vinculos = sa.table("casos_uso_actores", sa.column("caso_uso_id", sa.Integer), sa.column("actor_id", sa.Integer))
+
+
+def _nombres(texto):
+    nombres = []
+    for nombre in (texto or "").split(","):
+        nombre = nombre.strip()
+        if nombre and nombre not in nombres:
+            nombres.append(nombre)
+    return nombres
+
+
+def _migrar_textos():
+    # Cada nombre de la columna casos_uso.actores pasa a ser un actor del proyecto
+    # (con el tipo y la descripción del actor global homónimo, si existe) y un vínculo
+    conexion = op.get_bind()
+    casos = conexion.execute(
+        sa.select(casos_uso.c.id, casos_uso.c.proyecto_id, casos_uso.c.actores)
+        .where(casos_uso.c.proyecto_id.is_not(None), casos_uso.c.actores.is_not(None))
+    ).all()
+    ids = {(a.proyecto_id, a.nombre): a.id for a in conexion.execute(
+        sa.select(actores.c.id, actores.c.proyecto_id, actores.c.nombre).where(actores.c.proyecto_id.is_not(None))
+    )}
+    globales = {a.nombre: a for a in conexion.execute(
+        sa.select(actores.c.nombre, actores.c.tipo, actores.c.descripcion)
+        .where(actores.c.proyecto_id.is_(None)).order_by(actores.c.id.desc())
+    )}
+    existentes = set(conexion.execute(sa.select(vinculos.c.caso_uso_id, vinculos.c.actor_id)).all())
+
+    nuevos = []
+    for caso in casos:
+        for nombre in _nombres(caso.actores):
+            if (caso.proyecto_id, nombre) not in ids:
+                global_ = globales.get(nombre)
+                ids[caso.proyecto_id, nombre] = conexion.scalar(sa.insert(actores).returning(actores.c.id).values(
+                    nombre=nombre,
+                    tipo=global_.tipo if global_ else TIPO_POR_DEFECTO,
+                    descripcion=global_.descripcion if global_ else None,
+                    proyecto_id=caso.proyecto_id,
+                ))
+            vinculo = (caso.id, ids[caso.proyecto_id, nombre])
+            if vinculo not in existentes:
+                existentes.add(vinculo)
+                nuevos.append({"caso_uso_id": vinculo[0], "actor_id": vinculo[1]})
+    if nuevos:
+        conexion.execute(sa.insert(vinculos), nuevos)
+
+
+def upgrade() -> None:
+    # Las bases creadas con create_all ya tienen la columna, la tabla y los índices. SQLite
+    # no admite ADD COLUMN IF NOT EXISTS, así que la columna se comprueba con el inspector.
+    if "proyecto_id" not in {c["name"] for c in sa.inspect(op.get_bind()).get_columns("actores")}:
+        op.add_column("actores", sa.Column("proyecto_id", sa.Integer(), sa.ForeignKey("proyectos.id"), nullable=True),
+                      inline_references=True)
+    op.create_index("ix_actores_proyecto_nombre", "actores", ["proyecto_id", "nombre"], unique=True,
+                    if_not_exists=True)
+    op.create_table(
+        "casos_uso_actores",
+        sa.Column("caso_uso_id", sa.Integer(), nullable=False),
+        sa.Column("actor_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["caso_uso_id"], ["casos_uso.id"]),
+        sa.ForeignKeyConstraint(["actor_id"], ["actores.id"]),
+        sa.PrimaryKeyConstraint("caso_uso_id", "actor_id"),
+        if_not_exists=True,
+    )
+    op.create_index("ix_casos_uso_actores_actor", "casos_uso_actores", ["actor_id", "caso_uso_id"],
+                    if_not_exists=True)
+    _migrar_textos()
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    # La columna de texto casos_uso.actores se mantiene, así que no se pierde información
+    op.drop_index("ix_casos_uso_actores_actor", table_name="casos_uso_actores")
+    op.drop_table("casos_uso_actores")
+    op.execute(sa.delete(actores).where(actores.c.proyecto_id.is_not(None)))
+    op.drop_index("ix_actores_proyecto_nombre", table_name="actores")
+    with op.batch_alter_table("actores") as batch_op:
+        batch_op.drop_column("proyecto_id")
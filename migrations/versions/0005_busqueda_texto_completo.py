@@ -0,0 +1,35 @@
+"""índice de búsqueda de texto completo (FTS5)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend import busqueda
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+DISPARADORES = [f"{tabla}_busqueda_{sufijo}" for _, tabla, *_ in busqueda.FUENTES.values()
+                for sufijo in ("ai", "au", "ad")] + ["casos_uso_busqueda_proyecto"]
+
+
+def upgrade() -> None:
+    # Tabla FTS5 y triggers (IF NOT EXISTS) y carga de los datos ya existentes
+    conexion = op.get_bind()
+    busqueda.crear_indice(conexion)
+    busqueda.reconstruir(conexion)
+
+
+def downgrade() -> None:
+    for nombre in DISPARADORES:
+        op.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    op.execute(f"DROP TABLE IF EXISTS {busqueda.TABLA}")
@@ -0,0 +1,42 @@
+"""contadores materializados por proyecto (estadísticas del dashboard)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend import estadisticas
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "estadisticas_proyecto",
+        sa.Column("proyecto_id", sa.Integer(), nullable=False),
+        sa.Column("dimension", sa.String(length=30), nullable=False),
+        sa.Column("valor", sa.String(length=50), nullable=False),
+        sa.Column("total", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("proyecto_id", "dimension", "valor"),
+        if_not_exists=True,
+    )
+    # Triggers (IF NOT EXISTS) y contadores de los datos ya existentes
+    conexion = op.get_bind()
+    estadisticas.crear_triggers(conexion)
+    estadisticas.reconciliar(conexion)
+
+
+def downgrade() -> None:
+    for nombre in estadisticas.DISPARADORES:
+        op.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    op.drop_table("estadisticas_proyecto")
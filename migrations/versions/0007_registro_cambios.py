@@ -0,0 +1,50 @@
+"""registro de cambios por proyecto (sincronización incremental)
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend import cambios
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007"
+down_revision: Union[str, None] = "0006"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "registro_cambios",
+        sa.Column("seq", sa.Integer(), nullable=False),
+        sa.Column("proyecto_id", sa.Integer(), nullable=False),
+        sa.Column("entidad", sa.String(length=20), nullable=False),
+        sa.Column("entidad_id", sa.Integer(), nullable=False),
+        sa.Column("borrado", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("seq"),
+        sqlite_autoincrement=True,
+        if_not_exists=True,
+    )
+    op.create_index("ux_registro_cambios_entidad", "registro_cambios", ["proyecto_id", "entidad", "entidad_id"],
+                    unique=True, if_not_exists=True)
+    op.create_index("ix_registro_cambios_proyecto_seq", "registro_cambios", ["proyecto_id", "seq"],
+                    if_not_exists=True)
+    # Triggers (IF NOT EXISTS) y entradas de las filas ya existentes
+    conexion = op.get_bind()
+    cambios.crear_triggers(conexion)
+    cambios.registrar_existentes(conexion)
+
+
+def downgrade() -> None:
+    for nombre in cambios.DISPARADORES:
+        op.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    op.drop_index("ix_registro_cambios_proyecto_seq", table_name="registro_cambios")
+    op.drop_index("ux_registro_cambios_entidad", table_name="registro_cambios")
+    op.drop_table("registro_cambios")
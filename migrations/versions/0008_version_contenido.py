@@ -0,0 +1,32 @@
+"""versión de contenido por proyecto (clave de caché y ETag)
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend import versiones
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008"
+down_revision: Union[str, None] = "0007"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ADD COLUMN sin modo batch: recrear proyectos borraría sus triggers
+    op.add_column("proyectos", sa.Column("version_contenido", sa.Integer(), server_default="0", nullable=False))
+    versiones.crear_triggers(op.get_bind())
+
+
+def downgrade() -> None:
+    for nombre in versiones.DISPARADORES:
+        op.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    op.drop_column("proyectos", "version_contenido")
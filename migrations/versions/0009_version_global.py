@@ -0,0 +1,39 @@
+"""versión global de los datos (GET condicionales fuera de un proyecto)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend import versiones
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0009"
+down_revision: Union[str, None] = "0008"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "version_global",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("valor", sa.Integer(), nullable=False),
+        sa.Column("fecha_actualizacion", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        if_not_exists=True,
+    )
+    # Fila inicial y triggers (IF NOT EXISTS)
+    versiones.crear_version_global(op.get_bind())
+
+
+def downgrade() -> None:
+    for nombre in versiones.DISPARADORES_GLOBAL:
+        op.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+    op.drop_table("version_global")
@@ -0,0 +1,57 @@
+"""ids de proyecto no reutilizables (AUTOINCREMENT)
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend import busqueda, cambios, estadisticas, versiones
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0010"
+down_revision: Union[str, None] = "0009"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recrear_proyectos(autoincremento: bool):
+    # Los triggers que nombran proyectos impiden renombrar la tabla nueva y los de la
+    # propia tabla se pierden al recrearla: se quitan antes y se vuelven a crear después
+    conexion = op.get_bind()
+    triggers = conexion.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND sql LIKE '%proyectos%'"
+    ).scalars().all()
+    for nombre in triggers:
+        op.execute(f"DROP TRIGGER {nombre}")
+    with op.batch_alter_table("proyectos", recreate="always",
+                              table_kwargs={"sqlite_autoincrement": autoincremento}) as batch_op:
+        pass
+    busqueda.crear_indice(conexion)
+    estadisticas.crear_triggers(conexion)
+    cambios.crear_triggers(conexion)
+    versiones.crear_triggers(conexion)
+    versiones.crear_version_global(conexion)
+
+
+def upgrade() -> None:
+    _recrear_proyectos(True)
+    # La secuencia empieza después de cualquier id ya usado, también el de los proyectos
+    # borrados cuyas filas siguen pendientes de purga
+    op.execute("DELETE FROM sqlite_sequence WHERE name = 'proyectos'")
+    op.execute(
+        "INSERT INTO sqlite_sequence(name, seq) SELECT 'proyectos', coalesce(max(id), 0) FROM ("
+        "SELECT max(id) AS id FROM proyectos "
+        "UNION ALL SELECT max(fila_id) FROM purgas_pendientes WHERE tabla = 'proyectos' "
+        "UNION ALL SELECT max(proyecto_id) FROM requisitos "
+        "UNION ALL SELECT max(proyecto_id) FROM casos_uso "
+        "UNION ALL SELECT max(proyecto_id) FROM actores)"
+    )
+
+
+def downgrade() -> None:
+    _recrear_proyectos(False)
@@ -0,0 +1,62 @@
+# tests/conftest.py
+# La configuración se lee al importar backend, así que el entorno de las pruebas
+# (base de datos y caché en un directorio temporal, hash en el threadpool con coste
+# bajo) se fija antes de importar nada.
+import os
+import tempfile
+
+_DIRECTORIO = tempfile.mkdtemp(prefix="pruebas_")
+os.environ.update(
+    DATABASE_URL=f"sqlite:///{os.path.join(_DIRECTORIO, 'pruebas.db')}",
+    CACHE_DOCUMENTOS_DIR=os.path.join(_DIRECTORIO, "cache"),
+    DB_CREAR_TABLAS="1",
+    DB_DATOS_MOCK="0",
+    DB_ASYNC="0",
+    HASH_PROCESOS="0",
+    BCRYPT_COSTE="4",
+)
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.almacenamiento import crear_motor
+from backend.database import Base
+from backend import models  # noqa: F401  (registra las tablas en Base.metadata)
+
+
+@pytest.fixture
+def db(tmp_path):
+    # Base de datos propia de la prueba con el esquema de create_all (triggers incluidos)
+    engine = crear_motor(f"sqlite:///{tmp_path / 'prueba.db'}")
+    Base.metadata.create_all(engine)
+    with Session(engine) as sesion:
+        yield sesion
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def cliente():
+    from backend.main import create_app
+    with TestClient(create_app()) as cliente:
+        yield cliente
+
+
+@pytest.fixture(scope="session")
+def sembrar(cliente):
+    # Crea con el generador un usuario con un proyecto del tamaño indicado y devuelve el
+    # id del proyecto y las cabeceras con su token
+    from backend.database import SessionLocal
+    from backend.generador import CONTRASENA, generar
+    from backend.models import Proyecto, Usuario
+
+    def sembrar(prefijo, **tamanos):
+        with SessionLocal() as db:
+            generar(db, usuarios=1, proyectos=1, prefijo=prefijo, **tamanos)
+            usuario_id = db.scalar(select(Usuario.id).where(Usuario.username == f"{prefijo}0"))
+            proyecto_id = db.scalar(select(Proyecto.id).where(Proyecto.usuario_id == usuario_id))
+        r = cliente.post("/auth/login", data={"username": f"{prefijo}0", "password": CONTRASENA})
+        return proyecto_id, {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    return sembrar
@@ -0,0 +1,40 @@
+# tests/test_bundle.py
+# GET /projects/{id}/bundle hace un número fijo de consultas, sea cual sea el tamaño
+# del proyecto (sin N+1 al cargar ni al serializar).
+from sqlalchemy import event
+
+from backend.database import engine
+
+# Versión para el ETag, proyecto, requisitos, casos de uso, escenarios y actores
+SELECTS_BUNDLE = 6
+
+
+def _selects_del_bundle(cliente, proyecto_id, cabeceras):
+    # La primera petición resuelve el token; se cuenta la segunda
+    assert cliente.get(f"/projects/{proyecto_id}/bundle", headers=cabeceras).status_code == 200
+    sentencias = []
+
+    def anotar(conn, cursor, statement, parameters, context, executemany):
+        sentencias.append(statement)
+
+    event.listen(engine, "before_cursor_execute", anotar)
+    try:
+        respuesta = cliente.get(f"/projects/{proyecto_id}/bundle", headers=cabeceras)
+    finally:
+        event.remove(engine, "before_cursor_execute", anotar)
+    assert respuesta.status_code == 200
+    return respuesta.json(), [s for s in sentencias if s.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def test_bundle_con_consultas_fijas(cliente, sembrar):
+    pequeno = sembrar("bundlep", requisitos=2, casos_uso=1, escenarios=1, relaciones=0, actores=1)
+    grande = sembrar("bundleg", requisitos=60, casos_uso=2, escenarios=3, relaciones=1, actores=8)
+
+    datos_p, selects_p = _selects_del_bundle(cliente, *pequeno)
+    datos_g, selects_g = _selects_del_bundle(cliente, *grande)
+
+    assert (len(datos_p["requisitos"]), len(datos_p["casos_uso"]), len(datos_p["escenarios"])) == (2, 2, 2)
+    assert (len(datos_g["requisitos"]), len(datos_g["casos_uso"]), len(datos_g["escenarios"])) == (60, 120, 360)
+    assert len(datos_g["actores"]) > len(datos_p["actores"])
+    assert len(selects_p) == SELECTS_BUNDLE, "\n".join(selects_p)
+    assert len(selects_g) == SELECTS_BUNDLE, "\n".join(selects_g)
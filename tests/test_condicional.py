@@ -0,0 +1,48 @@
+# tests/test_condicional.py
+# Las lecturas devuelven ETag, responden 304 mientras los datos no cambian y dejan de
+# hacerlo tras una escritura, también si la hace otra conexión en el mismo segundo.
+import pytest
+from sqlalchemy import select
+
+from backend.database import SessionLocal
+from backend.models import Actor, CasoUso
+
+RUTAS = [
+    "/projects/",
+    "/projects/{proyecto}/requisitos",
+    "/actores/",
+    "/casos_uso/{caso_uso}/actores",
+    "/escenarios/",
+    "/relaciones/relaciones/",
+    "/search?q=usuario",
+    "/stats",
+]
+
+
+@pytest.fixture(scope="module")
+def proyecto(sembrar):
+    proyecto_id, cabeceras = sembrar("condicional", requisitos=5, casos_uso=1, escenarios=1, relaciones=1, actores=3)
+    with SessionLocal() as db:
+        caso_uso_id = db.scalar(select(CasoUso.id).where(CasoUso.proyecto_id == proyecto_id).limit(1))
+    return {"proyecto": proyecto_id, "caso_uso": caso_uso_id}, cabeceras
+
+
+@pytest.mark.parametrize("ruta", RUTAS)
+def test_get_condicional(cliente, proyecto, ruta):
+    ids, cabeceras = proyecto
+    url = ruta.format(**ids)
+    respuesta = cliente.get(url, headers=cabeceras)
+    assert respuesta.status_code == 200
+    etag = respuesta.headers["etag"]
+
+    respuesta = cliente.get(url, headers={**cabeceras, "If-None-Match": etag})
+    assert respuesta.status_code == 304
+    assert respuesta.headers["etag"] == etag
+
+    # Escritura fuera de la aplicación (como la de otro proceso): un actor del proyecto
+    with SessionLocal() as db:
+        db.add(Actor(nombre=f"Nuevo {ruta}", tipo="Humano", proyecto_id=ids["proyecto"]))
+        db.commit()
+    respuesta = cliente.get(url, headers={**cabeceras, "If-None-Match": etag})
+    assert respuesta.status_code == 200
+    assert respuesta.headers["etag"] != etag
@@ -0,0 +1,34 @@
+# tests/test_plan_consultas.py
+# Ninguna consulta frecuente (benchmarks/plan_consultas.py) puede recorrer una tabla
+# entera, ni con el esquema de create_all ni con el de las migraciones.
+import os
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+from backend.database import Base
+from benchmarks.plan_consultas import consultas, plan, recorridos
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module", params=["create_all", "alembic"])
+def conexion(request, tmp_path_factory):
+    ruta = tmp_path_factory.mktemp(request.param) / "plan.db"
+    if request.param == "alembic":
+        subprocess.run([sys.executable, "-m", "alembic", "upgrade", "head"], cwd=RAIZ, check=True,
+                       env=dict(os.environ, DATABASE_URL=f"sqlite:///{ruta}"), capture_output=True)
+    engine = create_engine(f"sqlite:///{ruta}")
+    if request.param == "create_all":
+        Base.metadata.create_all(engine)
+    with engine.connect() as conn:
+        yield conn
+    engine.dispose()
+
+
+@pytest.mark.parametrize("nombre", list(consultas()))
+def test_consulta_sin_recorrer_tablas(conexion, nombre):
+    pasos = plan(conexion, consultas()[nombre])
+    assert not recorridos(pasos), "; ".join(pasos)
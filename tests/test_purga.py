@@ -0,0 +1,34 @@
+# tests/test_purga.py
+# Un proyecto borrado desaparece en el acto pero sus filas esperan a la purga en
+# segundo plano: su id no puede pasar a otro proyecto mientras tanto, ni la purga
+# tocar las filas del proyecto nuevo.
+from sqlalchemy import func, select
+
+from backend import purga
+from backend.database import SessionLocal
+from backend.models import Requisito
+
+
+def test_borrar_y_crear_antes_de_la_purga(cliente, sembrar, monkeypatch):
+    # La purga se lanza a mano para crear el proyecto nuevo antes de que se ejecute
+    monkeypatch.setattr(purga.purgador, "avisar", lambda: None)
+    _, cabeceras_b = sembrar("purgab", requisitos=0, casos_uso=0, escenarios=0, relaciones=0, actores=0)
+    borrado, cabeceras_a = sembrar("purgaa", requisitos=3, casos_uso=1, escenarios=1, relaciones=1, actores=2)
+
+    assert cliente.delete(f"/projects/{borrado}", headers=cabeceras_a).status_code == 202
+    r = cliente.post("/projects/", json={"nombre": "Nuevo tras borrado"}, headers=cabeceras_b)
+    assert r.status_code == 201
+    nuevo = r.json()["id"]
+    assert nuevo != borrado
+    assert cliente.get(f"/projects/{nuevo}/requisitos", headers=cabeceras_b).json() == []
+    assert cliente.get(f"/projects/{borrado}/requisitos", headers=cabeceras_b).status_code == 404
+    r = cliente.post(f"/projects/{nuevo}/requisitos",
+                     json={"nombre": "Propio", "descripcion": "d", "tipo": "FUNCIONAL", "estado": "Propuesto"},
+                     headers=cabeceras_b)
+    assert r.status_code == 201
+
+    with SessionLocal() as db:
+        purga.purgar_todo(db)
+        assert db.scalar(select(func.count()).where(Requisito.proyecto_id == borrado)) == 0
+    requisitos = cliente.get(f"/projects/{nuevo}/requisitos", headers=cabeceras_b).json()
+    assert [r["nombre"] for r in requisitos] == ["Propio"]
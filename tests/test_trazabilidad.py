@@ -0,0 +1,29 @@
+# tests/test_trazabilidad.py
+# La caché de matrices se valida con la version_contenido del proyecto: una escritura
+# que no pasa por cache_documentos.invalidar_proyecto (otro proceso) también se ve.
+from sqlalchemy import insert, select
+
+from backend.models import Usuario, Proyecto, Requisito, TipoRequisitoEnum
+from backend.trazabilidad import CacheMatrices
+
+
+def _version(db, proyecto_id):
+    return db.scalar(select(Proyecto.version_contenido).where(Proyecto.id == proyecto_id))
+
+
+def test_la_matriz_sigue_a_la_version_del_proyecto(db):
+    proyecto = Proyecto(nombre="Reservas", usuario=Usuario(username="ana", email="ana@example.com",
+                                                            hashed_password="x"))
+    db.add(proyecto)
+    db.commit()
+    cache = CacheMatrices()
+    matriz = cache.obtener(db, proyecto.id, _version(db, proyecto.id))
+    assert matriz["cobertura"]["total_requisitos"] == 0
+    assert cache.obtener(db, proyecto.id, _version(db, proyecto.id)) is matriz
+
+    # Sin avisar a la caché, como haría una escritura de otro worker
+    db.execute(insert(Requisito).values(nombre="R1", descripcion="d", tipo=TipoRequisitoEnum.FUNCIONAL,
+                                        proyecto_id=proyecto.id))
+    db.commit()
+    matriz = cache.obtener(db, proyecto.id, _version(db, proyecto.id))
+    assert matriz["cobertura"]["total_requisitos"] == 1
@@ -0,0 +1,53 @@
+# tests/test_version_contenido.py
+# La versión del proyecto (clave de la caché de exportaciones y de los ETag) tiene que
+# cambiar con cada escritura aunque caiga en el mismo segundo y no cambie el número de
+# filas.
+from backend import cache_documentos
+from backend.models import (
+    Usuario, Proyecto, Requisito, CasoUso, Escenario, Actor, RelacionRequisito, TipoRequisitoEnum,
+    TipoEscenarioEnum, CategoriaCasoUsoEnum,
+)
+
+
+def _proyecto(db):
+    usuario = Usuario(username="ana", email="ana@example.com", hashed_password="x")
+    proyecto = Proyecto(nombre="Reservas", descripcion="Primera", usuario=usuario)
+    requisito = Requisito(nombre="R1", descripcion="d", tipo=TipoRequisitoEnum.FUNCIONAL, proyecto=proyecto)
+    caso_uso = CasoUso(titulo="CU1", descripcion="d", categoria=CategoriaCasoUsoEnum.PRINCIPAL, requisito=requisito, proyecto=proyecto)
+    db.add_all([usuario, proyecto, requisito, caso_uso])
+    db.commit()
+    return proyecto, requisito, caso_uso
+
+
+def test_cada_escritura_cambia_la_version(db):
+    proyecto, requisito, caso_uso = _proyecto(db)
+    vistas = [cache_documentos.version_proyecto(db, proyecto.id)]
+
+    def escribir(cambio):
+        cambio()
+        db.commit()
+        version = cache_documentos.version_proyecto(db, proyecto.id)
+        assert version not in vistas
+        vistas.append(version)
+
+    # Todas en el mismo segundo
+    escribir(lambda: setattr(proyecto, "descripcion", "Segunda"))
+    escribir(lambda: setattr(proyecto, "descripcion", "Tercera"))
+    escribir(lambda: setattr(requisito, "descripcion", "otra"))
+    escribir(lambda: db.add(RelacionRequisito(requisito=requisito, caso_uso=caso_uso)))
+    escribir(lambda: db.add(Actor(nombre="Cliente", tipo="Humano", proyecto=proyecto)))
+    escribir(lambda: caso_uso.actores_vinculados.append(Actor(nombre="Banco", tipo="Sistema Externo")))
+    escenario = Escenario(nombre="E1", tipo=TipoEscenarioEnum.NORMAL, caso_uso=caso_uso)
+    escribir(lambda: db.add(escenario))
+    escribir(lambda: db.delete(escenario))
+
+
+def test_la_version_no_depende_de_otros_proyectos(db):
+    proyecto, _, _ = _proyecto(db)
+    antes = cache_documentos.version_proyecto(db, proyecto.id)
+    otro = Proyecto(nombre="Otro", usuario_id=proyecto.usuario_id)
+    db.add(otro)
+    db.commit()
+    db.add(Requisito(nombre="R2", descripcion="d", tipo=TipoRequisitoEnum.FUNCIONAL, proyecto=otro))
+    db.commit()
+    assert cache_documentos.version_proyecto(db, proyecto.id) == antes